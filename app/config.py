@@ -0,0 +1,40 @@
+"""
+Cấu hình chung của ứng dụng
+"""
+
+# Cách tạo tiến trình con cho pool đánh giá fitness.
+# "spawn" an toàn khi server chạy nhiều thread (fork có thể treo lock)
+PROCESS_START_METHOD = "spawn"
+
+# Số cá thể tối thiểu để gửi sang pool (ít hơn thì đánh giá tại chỗ nhanh hơn)
+PARALLEL_MIN_BATCH = 8
+
+# Đo thời gian theo pha của GA (ScheduleResponse.profile, /metrics); tắt thì gần như không tốn chi phí
+PROFILING_ENABLED = True
+METRICS_ENABLED = True  # GET /metrics (Prometheus) và đếm request HTTP
+
+# Job xếp lịch chạy nền (POST /schedule/jobs)
+JOB_MAX_WORKERS = 2  # Số lần chạy GA đồng thời
+JOB_QUEUE_LIMIT = 16  # Số job tối đa đang chờ + đang chạy
+JOB_RETENTION_SECONDS = 3600  # Giữ kết quả job đã xong trong 1 giờ
+PROGRESS_STREAM_INTERVAL = 0.5  # Gửi tối đa 1 sự kiện tiến trình / 0.5 giây qua SSE
+PROGRESS_STREAM_KEEPALIVE = 15  # Gửi comment giữ kết nối nếu im lặng quá 15 giây
+
+# Rolling horizon (lịch dài): số ngày của 1 "tháng" khi chia min_hours_per_month / giờ kỳ vọng theo khối
+MONTH_DAYS = 30
+
+# Xếp lịch theo lô (POST /schedule/batch, python -m app.utils.batch)
+BATCH_MAX_WORKERS = None  # Số tiến trình của pool dùng chung (None = số lõi CPU)
+BATCH_MAX_ITEMS = 200  # Số request tối đa trong 1 lô
+
+# Cache kết quả xếp lịch (xem app/utils/result_cache.py)
+RESULT_CACHE_SIZE = 64  # Số kết quả giữ trong bộ nhớ (LRU)
+RESULT_CACHE_TTL_SECONDS = 24 * 3600  # Kết quả hết hạn sau 1 ngày
+RESULT_CACHE_DIR = None  # Thư mục lưu cache ra đĩa, ví dụ "data/cache" (None = chỉ bộ nhớ)
+RESULT_CACHE_UNSEEDED = False  # Request không có seed mặc định không dùng cache
+
+# File dữ liệu nhân viên / khoa (xem app/utils/repository.py)
+STAFF_CSV_PATH = "app/data/staff.csv"
+DEPARTMENTS_CSV_PATH = "app/data/departments.csv"
+CSV_BATCH_SIZE = 5000  # Số dòng mỗi lô khi đọc CSV (xem iter_staff_batches)
+DATA_SNAPSHOT_ENABLED = True  # Đọc qua snapshot nhị phân cạnh staff.csv (tự tạo lại khi CSV thay đổi)
@@ -0,0 +1,39 @@
+"""
+Dependency dùng chung cho các router (FastAPI Depends)
+"""
+from functools import lru_cache
+from app.utils.jobs import JobManager
+from app.utils.result_cache import ResultCache
+from app.utils.repository import DataRepository
+from app.utils.metrics import MetricsRegistry
+from app.utils.batch import BatchRunner
+
+
+@lru_cache()
+def get_result_cache() -> ResultCache:
+    """Cache kết quả dùng chung cho /schedule/generate và job nền"""
+    return ResultCache()
+
+
+@lru_cache()
+def get_metrics() -> MetricsRegistry:
+    """Số liệu Prometheus của tiến trình server"""
+    return MetricsRegistry()
+
+
+@lru_cache()
+def get_job_manager() -> JobManager:
+    """JobManager duy nhất của tiến trình server"""
+    return JobManager(cache=get_result_cache(), metrics=get_metrics())
+
+
+@lru_cache()
+def get_repository() -> DataRepository:
+    """Kho dữ liệu nhân viên / khoa dùng chung"""
+    return DataRepository()
+
+
+@lru_cache()
+def get_batch_runner() -> BatchRunner:
+    """Pool tiến trình dùng chung cho mọi lô xếp lịch"""
+    return BatchRunner(cache=get_result_cache(), metrics=get_metrics())
@@ -0,0 +1,313 @@
+"""
+Giải tách theo khoa (decomposition)
+Nhân viên chỉ làm ở khoa của mình nên bài toán tách thành các thành phần độc lập
+(nhóm khoa có chung nhân viên). Mỗi thành phần chạy 1 GA con với genome nhỏ,
+song song trên nhiều tiến trình; kết quả ghép lại và chấm bằng evaluator toàn cục.
+
+Điểm mềm toàn cục (độ lệch chuẩn giờ làm của mọi nhân viên, tổng giờ làm thêm...) không tách được:
+GA con tối ưu phiên bản cục bộ của các điểm này, lịch ghép luôn được chấm lại trên toàn bộ nhân viên,
+và tùy chọn decomposition_refine_generations chạy thêm GA toàn cục khởi tạo ấm từ lịch ghép
+"""
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from app.config import PROCESS_START_METHOD
+from app.schemas.schedule import ScheduleRequest
+from app.engine.genome import GenomeLayout, EMPTY_SLOT
+from app.engine.individual import Individual
+from app.engine.fitness import FitnessEvaluator
+from app.engine.ga_scheduler import BaseScheduler, GeneticScheduler, build_response
+
+# (chỉ số khoa, chỉ số nhân viên) của 1 thành phần, theo thứ tự trong request gốc
+Component = Tuple[List[int], List[int]]
+
+# Số giây giữa 2 lần kiểm tra yêu cầu dừng khi chờ kết quả từ pool
+STOP_POLL_INTERVAL = 0.1
+
+# Cờ dừng chung của pool (đặt trong mỗi worker khi khởi tạo)
+_stop_event = None
+
+
+def find_components(layout: GenomeLayout) -> List[Component]:
+    """Nhóm khoa có chung nhân viên đủ điều kiện (union-find); khoa không có slot bị bỏ qua"""
+    parent = list(range(len(layout.departments)))
+
+    def root(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    owner: Dict[int, int] = {}
+    for dept_idx, members in enumerate(layout.eligible):
+        for staff_idx in members.tolist():
+            if staff_idx in owner:
+                parent[root(dept_idx)] = root(owner[staff_idx])
+            else:
+                owner[staff_idx] = dept_idx
+
+    groups: Dict[int, List[int]] = {}
+    for dept_idx, slots in enumerate(layout.department_slots):
+        if slots.stop > slots.start:
+            groups.setdefault(root(dept_idx), []).append(dept_idx)
+
+    components = []
+    for departments in groups.values():
+        staff = sorted({s for d in departments for s in layout.eligible[d].tolist()})
+        components.append((departments, staff))
+    return components
+
+
+def _copy(config: ScheduleRequest, update: Dict) -> ScheduleRequest:
+    if hasattr(config, 'model_copy'):
+        return config.model_copy(update=update)
+    return config.copy(update=update)
+
+
+def component_request(config: ScheduleRequest, component: Component, component_id: int) -> ScheduleRequest:
+    """Request con: chỉ nhân viên và khoa của thành phần, seed riêng, chạy tuần tự"""
+    departments, staff = component
+    update = {
+        "staff": [config.staff[i] for i in staff],
+        "departments": [config.departments[i] for i in departments],
+        "seed": None if config.seed is None else config.seed + component_id,
+        "islands": 1,
+        "parallelism": 1,
+        "decompose": False,
+        "cache": False,
+    }
+    return _copy(config, update)
+
+
+def _run(scheduler: GeneticScheduler) -> Dict:
+    """Chạy GA con (verbose=False) và trả về kết quả gọn để gửi qua tiến trình"""
+    best = scheduler.evolve()
+    return {
+        "genome": best.genome,
+        "fitness": best.fitness_score,
+        "generations": len(scheduler.fitness_history) - 1,
+        "history": scheduler.fitness_history,
+        "stop_reason": scheduler.stop_reason,
+        "profile": (scheduler.profiler.totals, scheduler.profiler.counts),
+    }
+
+
+def _with_budget(config: ScheduleRequest, share: float, deadline: float) -> ScheduleRequest:
+    """Ngân sách thời gian của 1 GA con: phần chia share giây, không vượt deadline chung (None = không giới hạn)"""
+    if deadline is None:
+        return config
+    return _copy(config, {"time_limit_seconds": max(0.0, min(share, deadline - time.time()))})
+
+
+def _init_worker(stop_event):
+    global _stop_event
+    _stop_event = stop_event
+
+
+def _solve_component(config: ScheduleRequest, share: float, deadline: float) -> Dict:
+    """
+    Chạy GA con trong tiến trình worker (ngân sách tính từ lúc worker bắt đầu chạy)
+    GA con xem cờ dừng chung sau mỗi thế hệ → request_stop của bộ điều phối tới được worker đang chạy
+    """
+    scheduler = GeneticScheduler(_with_budget(config, share, deadline), verbose=False)
+    scheduler.add_listener(lambda event: _stop_event.is_set() and scheduler.request_stop())
+    if _stop_event.is_set():
+        scheduler.request_stop()
+    return _run(scheduler)
+
+
+class DecomposedScheduler(BaseScheduler):
+    """Điều phối các GA con theo thành phần; cùng giao diện evolve()/fitness_history với GeneticScheduler"""
+
+    def __init__(self, config: ScheduleRequest, verbose: bool = True):
+        super().__init__(config)
+        self.verbose = verbose
+        self.layout = GenomeLayout(config.staff, config.departments, config.shifts, config.days)
+        self.fitness_evaluator = FitnessEvaluator(
+            weights=config.weights,
+            min_hours_per_month=config.min_hours_per_month,
+            max_consecutive_shifts=config.max_consecutive_shifts
+        )
+        self.components = find_components(self.layout)
+        self.component_results: List[Dict] = []
+        # GA con / GA tinh chỉnh đang chạy tại chỗ (để chuyển tiếp request_stop)
+        self._active: BaseScheduler = None
+        # Fitness trung bình quần thể của GA tinh chỉnh (lịch ghép không có quần thể)
+        self._refined_mean: Optional[float] = None
+
+    def request_stop(self):
+        super().request_stop()
+        if self._active is not None:
+            self._active.request_stop()
+
+    def solve_components(self) -> List[Dict]:
+        """Chạy GA con: tại chỗ nếu parallelism = 1, ngược lại trên pool parallelism tiến trình"""
+        requests = [component_request(self.config, component, i)
+                    for i, component in enumerate(self.components)]
+
+        if self.config.parallelism <= 1 or len(requests) <= 1:
+            results = []
+            for i, request in enumerate(requests):
+                if self._stop_requested:
+                    break
+                # Thời gian còn lại chia đều cho các thành phần chưa chạy
+                share = None if self.deadline is None else (self.deadline - time.time()) / (len(requests) - i)
+                self._active = GeneticScheduler(_with_budget(request, share, self.deadline), verbose=False)
+                results.append(_run(self._active))
+                self._active = None
+            return results
+
+        # Thành phần lớn chạy trước để các worker xong gần cùng lúc
+        order = sorted(range(len(requests)),
+                       key=lambda i: -len(self.components[i][0]) * len(self.components[i][1]))
+        workers = min(self.config.parallelism, len(requests))
+        # Mỗi worker xử lý lần lượt khoảng len(requests) / workers thành phần
+        share = None if self.deadline is None else (self.deadline - time.time()) * workers / len(requests)
+        context = multiprocessing.get_context(PROCESS_START_METHOD)
+        stop_event = context.Event()
+        executor = ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                       initializer=_init_worker, initargs=(stop_event,))
+        try:
+            futures = {i: executor.submit(_solve_component, requests[i], share, self.deadline) for i in order}
+            results = []
+            for i in range(len(requests)):
+                while not self._stop_requested and not futures[i].done():
+                    wait([futures[i]], timeout=STOP_POLL_INTERVAL)
+                if self._stop_requested:
+                    # GA con đang chạy dừng ở cuối thế hệ hiện tại; thành phần chưa chạy bị bỏ
+                    stop_event.set()
+                    break
+                results.append(futures[i].result())
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        return results
+
+    def merge(self, results: List[Dict]) -> np.ndarray:
+        """
+        Ghép genome của các GA con vào genome toàn cục (đổi chỉ số nhân viên và vị trí slot)
+        results theo thứ tự thành phần; bị hủy giữa chừng thì chỉ có các thành phần đầu (các khoa còn lại để trống)
+        """
+        genome = np.full(self.layout.shape, EMPTY_SLOT, dtype=self.layout.dtype)
+        for (departments, staff), result in zip(self.components, results):
+            staff_map = np.append(np.asarray(staff, dtype=np.int64), EMPTY_SLOT)
+            offset = 0
+            for dept_idx in departments:
+                slots = self.layout.department_slots[dept_idx]
+                size = slots.stop - slots.start
+                genome[:, :, slots] = staff_map[result["genome"][:, :, offset:offset + size]]
+                offset += size
+        return genome
+
+    def mean_fitness(self) -> Optional[float]:
+        """Fitness trung bình quần thể của GA tinh chỉnh; None trước đó (các GA con chấm theo thang điểm riêng)"""
+        return self._refined_mean
+
+    def merge_history(self, results: List[Dict]) -> List[float]:
+        """
+        Lịch sử fitness theo thế hệ của lịch ghép, ước lượng từ lịch sử các GA con (GA con dừng sớm giữ giá trị cuối):
+        có thành phần vi phạm → tổng điểm phạt (số vi phạm cộng được), ngược lại trung bình điểm mềm theo số nhân viên
+        """
+        histories = [(result["history"], len(staff)) for (_, staff), result in zip(self.components, results)
+                     if result["history"]]
+        length = max((len(history) for history, _ in histories), default=0)
+        merged = []
+        for step in range(length):
+            scores = [(history[min(step, len(history) - 1)], size) for history, size in histories]
+            penalties = [score for score, _ in scores if score < 0]
+            if penalties:
+                merged.append(sum(penalties))
+            else:
+                merged.append(sum(score * size for score, size in scores) / sum(size for _, size in scores))
+        return merged
+
+    def stop_reason_of(self, results: List[Dict]) -> str:
+        """Lý do dừng chung: hủy / hết giờ nếu có GA con như vậy, ngược lại xét lịch ghép"""
+        if self._stop_requested:
+            return "cancelled"
+        reasons = [result["stop_reason"] for result in results]
+        if "time_limit" in reasons:
+            return "time_limit"
+        best = self.best_individual
+        if best.hard_violations == 0 and best.fitness_score >= self.config.target_fitness:
+            return "solved"
+        return max(sorted(set(reasons)), key=reasons.count) if reasons else "max_generations"
+
+    def refine(self):
+        """GA toàn cục ngắn khởi tạo ấm từ lịch ghép (xử lý phần điểm mềm liên khoa)"""
+        merged = build_response(self.best_individual, 0)
+        update = {
+            "max_generations": self.config.decomposition_refine_generations,
+            "warm_start_schedules": [merged.schedule],
+            "decompose": False,
+            "islands": 1,
+        }
+        if self.deadline is not None:
+            update["time_limit_seconds"] = max(0.0, self.deadline - time.time())
+        config = _copy(self.config, update)
+
+        self._active = GeneticScheduler(config, verbose=False)
+        best = self._active.evolve()
+        refined = self._active
+        self._active = None
+
+        self._refined_mean = refined.mean_fitness()
+        self.fitness_history.extend(refined.fitness_history[1:])
+        self.profiler.combine([self.profiler.totals, refined.profiler.totals],
+                              [self.profiler.counts, refined.profiler.counts])
+        if best.fitness_score > self.best_individual.fitness_score:
+            self.best_individual = best
+        self.stop_reason = refined.stop_reason
+
+    def evolve(self) -> Individual:
+        """
+        Giải các thành phần rồi ghép
+        Returns: Cá thể toàn cục (chấm lại bằng evaluator trên toàn bộ nhân viên)
+        """
+        start_time = time.time()
+        self.start_clock(start_time)
+        if self.verbose:
+            print(f"Tách thành {len(self.components)} thành phần độc lập "
+                  f"(lớn nhất: {max((len(s) for _, s in self.components), default=0)} nhân viên)")
+
+        results = self.solve_components()
+        self.component_results = results
+
+        self.best_individual = Individual(
+            self.config.staff, self.config.departments, self.config.shifts, self.config.days,
+            layout=self.layout
+        )
+        self.best_individual.genome[...] = self.merge(results)
+        self.best_individual.rebuild_counters()
+        self.fitness_evaluator.evaluate_population([self.best_individual])
+
+        # Thế hệ cuối: điểm của lịch ghép chấm lại trên toàn bộ nhân viên
+        self.fitness_history.extend(self.merge_history(results)[:-1])
+        self.fitness_history.append(self.best_individual.fitness_score)
+        if len(results) < len(self.components):
+            # Bị hủy trước khi giải hết: báo các khoa còn để trống trong lịch
+            unsolved = [self.config.departments[d].id for departments, _ in self.components[len(results):]
+                        for d in departments]
+            self.best_individual.stats = {**self.best_individual.stats, "unsolved_departments": unsolved}
+            if self.verbose:
+                print(f"⚠ Chưa giải {len(unsolved)} khoa (bị hủy): {', '.join(unsolved)}")
+        self.profiler.combine([result["profile"][0] for result in results],
+                              [result["profile"][1] for result in results])
+        self.stop_reason = self.stop_reason_of(results)
+        if self.verbose:
+            print(f"Ghép {len(results)} thành phần: Best Fitness = {self.best_individual.fitness_score:.2f}, "
+                  f"Violations = {self.best_individual.hard_violations}")
+        self.notify(len(self.fitness_history) - 1, start_time)
+
+        if (self.config.decomposition_refine_generations > 0
+                and self.stop_reason not in ("cancelled", "time_limit", "solved")):
+            self.refine()
+            if self.verbose:
+                print(f"Tinh chỉnh toàn cục: Best Fitness = {self.best_individual.fitness_score:.2f}")
+            self.notify(len(self.fitness_history) - 1, start_time)
+
+        computation_time = time.time() - start_time
+        if self.verbose:
+            print(f"\n✓ Hoàn thành trong {computation_time:.2f} giây")
+        return self.best_individual
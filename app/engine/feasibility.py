@@ -0,0 +1,148 @@
+"""
+Kiểm tra khả thi trước khi chạy GA (giải tích, không tìm kiếm)
+Với mỗi khoa tính cận trên những gì đạt được dưới giới hạn ngày làm liên tiếp:
+- HC1: giờ tối đa của từng nhân viên, và tổng số ca cần để mọi người đủ giờ so với số slot của khoa
+- HC2 + HC3: số người-ngày cần để phủ mọi ca so với số người-ngày tối đa của khoa
+Từ đó suy ra cận dưới số vi phạm cứng: GA đạt tới cận này thì không thể tốt hơn nữa
+Chỉ tiêu giờ HC1 giống chỉ tiêu evaluator dùng để chấm lịch (rolling horizon quy theo số ngày)
+"""
+import math
+from typing import List, Union
+import numpy as np
+from app.config import MONTH_DAYS
+from app.schemas.schedule import ScheduleRequest, FeasibilityIssue, FeasibilityReport
+from app.engine.genome import GenomeLayout
+
+
+class InfeasibleScheduleError(ValueError):
+    """Ràng buộc cứng chắc chắn không thỏa được (feasibility_check = "reject")"""
+
+    def __init__(self, report: FeasibilityReport):
+        self.report = report
+        details = "; ".join(issue.message for issue in report.issues)
+        super().__init__(f"Bài toán không khả thi (ít nhất {report.min_hard_violations} vi phạm cứng): {details}")
+
+
+def max_working_days(days: int, max_consecutive: int) -> int:
+    """Số ngày làm tối đa trong days ngày khi không làm quá max_consecutive ngày liên tiếp"""
+    if max_consecutive <= 0:
+        return 0
+    period = max_consecutive + 1
+    return (days // period) * max_consecutive + min(days % period, max_consecutive)
+
+
+def horizon_min_hours(min_hours_per_month: int, days: int) -> int:
+    """Chỉ tiêu giờ của cả lịch days ngày khi quy min_hours_per_month theo tháng MONTH_DAYS ngày"""
+    return math.ceil(min_hours_per_month * days / MONTH_DAYS)
+
+
+def min_hours_targets(payload: ScheduleRequest) -> int:
+    """Chỉ tiêu giờ mà evaluator của bộ xếp lịch (create_scheduler) chấm HC1 trên cả lịch"""
+    if not payload.multi_objective and payload.rolling_block_days and payload.days > payload.rolling_block_days:
+        return horizon_min_hours(payload.min_hours_per_month, payload.days)
+    return payload.min_hours_per_month
+
+
+def check_feasibility(payload: ScheduleRequest, layout: GenomeLayout = None,
+                      min_hours: Union[int, np.ndarray] = None) -> FeasibilityReport:
+    """
+    Các ràng buộc cứng chắc chắn bị vi phạm và cận dưới số vi phạm (O(số nhân viên + số khoa))
+    min_hours: chỉ tiêu giờ (số hoặc mảng theo nhân viên) như evaluator; None = min_hours_targets(payload)
+    """
+    layout = layout or GenomeLayout(payload.staff, payload.departments, payload.shifts, payload.days)
+    days = payload.days
+    num_shifts = len(payload.shifts)
+    if min_hours is None:
+        min_hours = min_hours_targets(payload)
+    targets = np.broadcast_to(np.asarray(min_hours, dtype=np.int64), (len(payload.staff),))
+    limit = payload.max_consecutive_shifts
+    work_days = max_working_days(days, limit)
+    issues: List[FeasibilityIssue] = []
+    lower_bound = 0
+
+    # Nhân viên không thuộc khoa nào có slot: không được xếp ca → thiếu giờ
+    assignable = set()
+    for members, slots in zip(layout.eligible, layout.department_slots):
+        if slots.stop > slots.start:
+            assignable.update(members.tolist())
+    idle = [i for i in range(len(payload.staff)) if i not in assignable and targets[i] > 0]
+    if idle:
+        lower_bound += len(idle)
+        required_hours = int(targets[idle].max())
+        issues.append(FeasibilityIssue(
+            constraint="HC1", department=None, required=required_hours, available=0,
+            message=f"{len(idle)} nhân viên không thuộc khoa nào cần người (vd. {payload.staff[idle[0]].staff_id}) "
+                    f"nên không thể đủ {required_hours} giờ"))
+
+    for department, members, slots in zip(payload.departments, layout.eligible, layout.department_slots):
+        required = slots.stop - slots.start
+        if required == 0:
+            continue
+        headcount = len(members)
+        name = department.name
+
+        # HC3: không đủ người cho 1 ca → mọi ca đều thiếu
+        if headcount < required:
+            short_cells = days * num_shifts
+            issues.append(FeasibilityIssue(
+                constraint="HC3", department=name, required=required, available=headcount,
+                message=f"Khoa {name} cần {required} người/ca nhưng chỉ có {headcount} nhân viên"))
+        else:
+            # HC2 + HC3: mỗi ngày cần required người làm, mỗi người tối đa work_days ngày;
+            # cho m người vượt giới hạn liên tiếp (mỗi người 1 vi phạm HC2) để làm đủ days ngày
+            demand = required * days
+            short_cells = None
+            for m in range(headcount + 1):
+                shortage = max(0, demand - (headcount - m) * work_days - m * days)
+                cost = m + num_shifts * math.ceil(shortage / required)
+                short_cells = cost if short_cells is None else min(short_cells, cost)
+                if shortage == 0:
+                    break
+            supply = headcount * work_days
+            if demand > supply:
+                issues.append(FeasibilityIssue(
+                    constraint="HC2", department=name, required=demand, available=supply,
+                    message=f"Khoa {name} cần {demand} người-ngày ({required} người × {days} ngày) nhưng "
+                            f"{headcount} nhân viên chỉ làm được tối đa {supply} người-ngày khi không quá "
+                            f"{limit} ngày liên tiếp (cần ít nhất "
+                            f"{math.ceil(required * days / max(work_days, 1))} nhân viên)"))
+        lower_bound += short_cells
+
+        member_targets = targets[members]
+        if headcount == 0 or not (member_targets > 0).any():
+            continue
+        required_hours = int(member_targets.max())
+
+        # HC1: giờ tối đa của từng người (1 slot mỗi ca, tối đa work_days ngày)
+        shift_hours = layout.staff_shift_hours[members]
+        max_hours = shift_hours * work_days * num_shifts
+        short = max_hours < member_targets
+        capped = int(short.sum())
+        if capped:
+            worst = int(max_hours[short].min())
+            issues.append(FeasibilityIssue(
+                constraint="HC1", department=name, required=required_hours, available=worst,
+                message=f"Khoa {name}: {capped} nhân viên làm tối đa {worst} giờ khi không quá {limit} "
+                        f"ngày liên tiếp, chưa đủ chỉ tiêu giờ (tới {required_hours} giờ)"))
+
+        # HC1: tổng số ca cần để mọi người đủ giờ so với số slot của khoa
+        capacity = days * num_shifts * required
+        per_staff = days * num_shifts
+        # Ca 0 giờ không bao giờ đủ giờ: coi như cần nhiều ca hơn số ca có thể làm
+        needs = sorted(0 if target <= 0 else math.ceil(target / h) if h > 0 else per_staff + 1
+                       for target, h in zip(member_targets.tolist(), shift_hours.tolist()))
+        # Cận dưới: dù mọi người được làm mọi ngày, chỉ xếp đủ giờ được cho người cần ít ca nhất trước
+        satisfied, used = 0, 0
+        for need in needs:
+            if need > per_staff or used + need > capacity:
+                break
+            used += need
+            satisfied += 1
+        lower_bound += headcount - satisfied
+        if sum(needs) > capacity:
+            issues.append(FeasibilityIssue(
+                constraint="HC1", department=name, required=sum(needs), available=capacity,
+                message=f"Khoa {name} cần ít nhất {sum(needs)} ca để {headcount} nhân viên đủ chỉ tiêu giờ "
+                        f"nhưng chỉ có {capacity} slot ({required} người × {num_shifts} ca × {days} ngày)"))
+
+    return FeasibilityReport(feasible=not issues, min_hard_violations=lower_bound, issues=issues)
@@ -2,10 +2,16 @@
 Fitness Function đơn giản
 Chỉ kiểm tra các ràng buộc cơ bản
 """
-from typing import Dict
+from typing import Dict, List
 from app.engine.individual import Individual
+from app.engine.genome import GenomeLayout
+from app.config import PARALLEL_MIN_BATCH
+import numpy as np
 import statistics
 
+# 4 điểm mềm (0-1, càng cao càng tốt), thứ tự cột của Individual.objectives
+SOFT_OBJECTIVES = ("workload_balance", "satisfaction", "experience_distribution", "minimize_overtime")
+
 class FitnessEvaluator:
     """Đánh giá fitness đơn giản"""
     
@@ -23,9 +29,19 @@ class FitnessEvaluator:
         self.penalty_hard = -1000
         self.min_hours_per_month = min_hours_per_month
         self.max_consecutive_shifts = max_consecutive_shifts
+        # Quá số thay đổi này thì đánh giá lại toàn bộ thay vì cập nhật delta
+        self.max_delta_changes = 64
+        # Pool tiến trình (ParallelEvaluator), nếu có
+        self.pool = None
+        # Số lần tính fitness (bỏ qua cá thể không thay đổi)
+        self.evaluations = 0
+        # Ngày làm của các ngày ngay trước lịch (ngày, S), để HC2 tính cả chuỗi nối từ lịch trước
+        # (chế độ rolling horizon); None = lịch bắt đầu từ trạng thái nghỉ
+        self.history: np.ndarray = None
     
     def evaluate(self, individual: Individual) -> float:
         """Đánh giá fitness"""
+        self.evaluations += 1
         individual.calculate_statistics()
         
         # Kiểm tra ràng buộc cứng
@@ -44,6 +60,310 @@ class FitnessEvaluator:
         
         return individual.fitness_score
     
+    def evaluate_population(self, population: List[Individual], incremental: bool = True) -> np.ndarray:
+        """
+        Đánh giá fitness cho cả quần thể bằng các phép toán mảng NumPy
+        Cho kết quả giống evaluate() (trừ sai số làm tròn dấu phẩy động)
+        
+        incremental=True: cá thể chỉ bị đổi vài slot (đột biến) được cập nhật
+        theo phần thay đổi; cá thể lai ghép ghép thành phần theo ngày từ cha mẹ;
+        còn lại (khởi tạo, thay đổi lớn) mới đánh giá đầy đủ.
+        Có pool và đủ PARALLEL_MIN_BATCH cá thể thay đổi: mọi cá thể thay đổi được đánh giá đầy đủ
+        trên pool (thành phần là số nguyên nên kết quả giống hệt cập nhật delta tuần tự)
+        """
+        if not population:
+            return np.empty(0)
+        
+        layout = population[0].layout
+        full = []
+        pending = []
+        stale_runs = []
+        
+        changed = [individual for individual in population
+                   if not (incremental and individual.fitness_valid and not individual.changed_cells)]
+        pooled = self.pool is not None and len(changed) >= PARALLEL_MIN_BATCH
+        
+        for individual in changed:
+            if (pooled or not incremental or not individual.components_valid
+                    or len(individual.changed_cells) > self.max_delta_changes):
+                full.append(individual)
+                continue
+            
+            self.apply_changes(individual)
+            if not individual.runs_valid:
+                stale_runs.append(individual)
+            pending.append(individual)
+        
+        # Đánh giá đầy đủ các thành phần theo lô
+        if full:
+            genomes = np.stack([individual.genome for individual in full])
+            day_load = np.stack([individual.day_load for individual in full])
+            if pooled:
+                components = self.pool.compute_components(genomes, day_load)
+            else:
+                components = self.compute_components(layout, genomes, day_load)
+            for p, individual in enumerate(full):
+                individual.short[...] = components["short"][p]
+                individual.diverse[...] = components["diverse"][p]
+                individual.long_windows[...] = components["long_windows"][p]
+                individual.clear_changes()
+            pending.extend(full)
+        
+        # Cá thể lai ghép: chỉ tính lại chuỗi ngày liên tiếp
+        if stale_runs:
+            long_windows = self.count_long_windows(
+                np.stack([individual.day_load for individual in stale_runs]) > 0
+            )
+            for p, individual in enumerate(stale_runs):
+                individual.long_windows[...] = long_windows[p]
+                individual.clear_changes()
+        
+        if pending:
+            self.evaluations += len(pending)
+            result = self.score_components(
+                layout,
+                np.stack([individual.shift_counts for individual in pending]),
+                np.stack([individual.short for individual in pending]),
+                np.stack([individual.diverse for individual in pending]),
+                np.stack([individual.long_windows for individual in pending])
+            )
+            objectives = np.stack([result["scores"][name] for name in SOFT_OBJECTIVES], axis=1)
+            for p, individual in enumerate(pending):
+                individual.objectives = objectives[p]
+                hard_violations = int(result["hard_violations"][p])
+                individual.hard_violations = hard_violations
+                individual.is_valid = hard_violations == 0
+                individual.fitness_score = float(result["fitness"][p])
+                individual.fitness_valid = True
+        
+        return np.array([individual.fitness_score for individual in population])
+    
+    def apply_changes(self, individual: Individual):
+        """Cập nhật thành phần fitness theo nhật ký thay đổi của cá thể (delta)"""
+        layout = individual.layout
+        
+        # HC3, SC3: chỉ tính lại các ô (ngày, ca, khoa) bị chạm
+        cells = {
+            (day_idx, shift_idx, int(layout.slot_department[slot]))
+            for day_idx, shift_idx, slot in individual.changed_cells
+        }
+        for day_idx, shift_idx, dept_idx in cells:
+            self.update_cell(individual, day_idx, shift_idx, dept_idx)
+        
+        # HC2: chỉ xét các cửa sổ quanh ngày bị đổi của nhân viên bị chạm
+        if individual.runs_valid and individual.worked_before:
+            touched: Dict[int, Dict[int, bool]] = {}
+            for (day_idx, staff_idx), before in individual.worked_before.items():
+                touched.setdefault(staff_idx, {})[day_idx] = before
+            
+            for staff_idx, days_before in touched.items():
+                self.update_runs(individual, staff_idx, days_before)
+        
+        if individual.runs_valid:
+            individual.clear_changes()
+        else:
+            individual.changed_cells = []
+    
+    def update_cell(self, individual: Individual, day_idx: int, shift_idx: int, dept_idx: int):
+        """Tính lại độ phủ và độ đa dạng kinh nghiệm của 1 ô (ngày, ca, khoa)"""
+        layout = individual.layout
+        slots = layout.department_slots[dept_idx]
+        assigned = individual.genome[day_idx, shift_idx, slots]
+        assigned = assigned[assigned >= 0]
+        
+        individual.short[day_idx, shift_idx, dept_idx] = len(assigned) < slots.stop - slots.start
+        
+        if len(assigned) < 2:
+            individual.diverse[day_idx, shift_idx, dept_idx] = -1
+        else:
+            experience = layout.staff_experience[assigned]
+            individual.diverse[day_idx, shift_idx, dept_idx] = int(experience.max() - experience.min() >= 5)
+    
+    def update_runs(self, individual: Individual, staff_idx: int, days_before: Dict[int, bool]):
+        """Cập nhật số cửa sổ làm liên tục của 1 nhân viên quanh các ngày bị đổi"""
+        window = self.max_consecutive_shifts + 1
+        # Ghép các ngày lịch sử phía trước: ngày d của lịch nằm ở vị trí d + offset
+        offset = 0 if self.history is None else len(self.history)
+        days = individual.days + offset
+        if window > days:
+            return
+        
+        worked_now = individual.day_load[:, staff_idx] > 0
+        if all(worked_now[day_idx] == before for day_idx, before in days_before.items()):
+            return
+        if offset:
+            worked_now = np.concatenate([self.history[:, staff_idx], worked_now])
+        
+        worked_then = worked_now.copy()
+        for day_idx, before in days_before.items():
+            worked_then[day_idx + offset] = before
+        
+        # Các cửa sổ [start, start + window) chứa ít nhất 1 ngày bị đổi
+        starts = set()
+        for day_idx in days_before:
+            day_idx += offset
+            starts.update(range(max(0, day_idx - window + 1), min(day_idx, days - window) + 1))
+        
+        delta = 0
+        for start in starts:
+            delta += int(worked_now[start:start + window].all()) - int(worked_then[start:start + window].all())
+        individual.long_windows[staff_idx] += delta
+    
+    def evaluate_genomes(self, layout: GenomeLayout, genomes: np.ndarray,
+                         shift_counts: np.ndarray = None, day_load: np.ndarray = None) -> Dict[str, np.ndarray]:
+        """
+        Tính vi phạm cứng và 4 điểm mềm cho lô genome (P, ngày, ca, slot)
+        shift_counts (P, S) và day_load (P, ngày, S) được đếm từ genome nếu không truyền vào
+        Trả về dict các mảng theo cá thể
+        """
+        num_individuals = genomes.shape[0]
+        num_staff = len(layout.staff)
+        days = layout.days
+        
+        # Số ca theo ngày của từng nhân viên: (P, ngày, S)
+        if day_load is None:
+            per_day = genomes.reshape(num_individuals, days, -1).astype(np.int64)
+            day_offsets = (np.arange(num_individuals * days, dtype=np.int64)
+                           .reshape(num_individuals, days, 1) * num_staff)
+            day_load = np.bincount(
+                (per_day + day_offsets)[per_day >= 0],
+                minlength=num_individuals * days * num_staff
+            ).reshape(num_individuals, days, num_staff)
+        
+        if shift_counts is None:
+            shift_counts = day_load.sum(axis=1)
+        
+        components = self.compute_components(layout, genomes, day_load)
+        result = self.score_components(layout, shift_counts, **components)
+        result.update(components)
+        result["shift_counts"] = shift_counts
+        return result
+    
+    def compute_components(self, layout: GenomeLayout, genomes: np.ndarray,
+                           day_load: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Thành phần fitness theo lô từ genome:
+        - short (P, ngày, ca, khoa): ô thiếu người (HC3)
+        - diverse (P, ngày, ca, khoa): -1 không tính, 0/1 chênh lệch kinh nghiệm < / >= 5 năm (SC3)
+        - long_windows (P, S): số cửa sổ làm liên tục dài hơn giới hạn (HC2)
+        """
+        num_individuals, days, num_shifts, _ = genomes.shape
+        num_departments = len(layout.departments)
+        
+        short = np.zeros((num_individuals, days, num_shifts, num_departments), dtype=bool)
+        diverse = np.full((num_individuals, days, num_shifts, num_departments), -1, dtype=np.int8)
+        
+        # Gộp các slot của từng khoa bằng reduceat (bỏ qua khoa không có slot)
+        nonempty = [i for i, s in enumerate(layout.department_slots) if s.stop > s.start]
+        if nonempty:
+            starts = [layout.department_slots[i].start for i in nonempty]
+            required = np.array([layout.department_slots[i].stop - layout.department_slots[i].start
+                                 for i in nonempty])
+            coverage = np.add.reduceat(genomes >= 0, starts, axis=-1, dtype=np.int64)
+            short[..., nonempty] = coverage < required
+            
+            # Slot trống (-1) trỏ vào phần tử cuối: -vô cùng cho max, +vô cùng cho min
+            big = np.iinfo(np.int64).max // 2
+            exp_max = np.append(layout.staff_experience, -big)[genomes]
+            exp_min = np.append(layout.staff_experience, big)[genomes]
+            exp_range = (np.maximum.reduceat(exp_max, starts, axis=-1)
+                         - np.minimum.reduceat(exp_min, starts, axis=-1))
+            diverse[..., nonempty] = np.where(coverage >= 2, exp_range >= 5, -1)
+        
+        return {
+            "short": short,
+            "diverse": diverse,
+            "long_windows": self.count_long_windows(day_load > 0),
+        }
+    
+    def score_components(self, layout: GenomeLayout, shift_counts: np.ndarray, short: np.ndarray,
+                         diverse: np.ndarray, long_windows: np.ndarray) -> Dict[str, np.ndarray]:
+        """Tính fitness từ bộ đếm và thành phần (mọi phép toán O(P × S + P × ô))"""
+        num_individuals = shift_counts.shape[0]
+        hours = shift_counts.astype(np.int64) * layout.staff_shift_hours
+        
+        # HC1, HC2, HC3
+        hard_violations = (
+            (hours < self.min_hours_per_month).sum(axis=1)
+            + (long_windows > 0).sum(axis=1)
+            + short.sum(axis=(1, 2, 3))
+        )
+        
+        counted = (diverse >= 0).sum(axis=(1, 2, 3))
+        well_distributed = (diverse == 1).sum(axis=(1, 2, 3))
+        
+        scores = {
+            "workload_balance": self.batch_workload_balance(hours),
+            "satisfaction": self.batch_satisfaction(hours, layout.expected_hours),
+            "experience_distribution": np.where(
+                counted > 0, well_distributed / np.maximum(counted, 1), 1.0
+            ),
+            "minimize_overtime": self.batch_minimize_overtime(hours, layout.expected_hours),
+        }
+        
+        soft = np.zeros(num_individuals)
+        for name in SOFT_OBJECTIVES:
+            soft = soft + scores[name] * self.weights[name]
+        soft = soft * 1000
+        
+        fitness = np.where(hard_violations > 0, self.penalty_hard * hard_violations, soft).astype(float)
+        
+        return {
+            "fitness": fitness,
+            "hard_violations": hard_violations,
+            "hours": hours,
+            "scores": scores,
+        }
+    
+    def count_long_windows(self, worked: np.ndarray) -> np.ndarray:
+        """Số cửa sổ (max_consecutive_shifts + 1) ngày làm liên tục của từng nhân viên: (P, ngày, S) → (P, S)"""
+        window = self.max_consecutive_shifts + 1
+        if self.history is not None:
+            history = np.broadcast_to(self.history, (worked.shape[0],) + self.history.shape)
+            worked = np.concatenate([history, worked], axis=1)
+        num_individuals, days, num_staff = worked.shape
+        
+        if window > days:
+            return np.zeros((num_individuals, num_staff), dtype=np.int32)
+        
+        cumsum = np.zeros((num_individuals, days + 1, num_staff), dtype=np.int32)
+        np.cumsum(worked, axis=1, out=cumsum[:, 1:])
+        window_sums = cumsum[:, window:] - cumsum[:, :-window]
+        return (window_sums == window).sum(axis=1).astype(np.int32)
+    
+    def count_long_runs(self, worked: np.ndarray) -> np.ndarray:
+        """Đếm số nhân viên có chuỗi ngày làm liên tiếp > max_consecutive_shifts (P, ngày, S)"""
+        # Chuỗi dài hơn giới hạn ⇔ có cửa sổ window ngày làm liên tục
+        return (self.count_long_windows(worked) > 0).sum(axis=1)
+    
+    def batch_workload_balance(self, hours: np.ndarray) -> np.ndarray:
+        """SC1 theo lô: độ lệch chuẩn mẫu tính bằng số nguyên rồi mới lấy căn"""
+        n = hours.shape[1]
+        if n <= 1:
+            return np.ones(hours.shape[0])
+        
+        total = hours.sum(axis=1)
+        total_sq = (hours * hours).sum(axis=1)
+        variance = (n * total_sq - total * total) / (n * (n - 1))
+        std_dev = np.sqrt(variance)
+        return np.maximum(0.0, 1.0 - np.minimum(1.0, std_dev / 100.0))
+    
+    def batch_satisfaction(self, hours: np.ndarray, expected: np.ndarray) -> np.ndarray:
+        """SC2 theo lô"""
+        mask = expected > 0
+        count = int(mask.sum())
+        if count == 0:
+            return np.zeros(hours.shape[0])
+        
+        ratio = hours[:, mask] / expected[mask]
+        satisfaction = np.maximum(0.0, 1.0 - np.abs(1.0 - ratio))
+        return satisfaction.sum(axis=1) / count
+    
+    def batch_minimize_overtime(self, hours: np.ndarray, expected: np.ndarray) -> np.ndarray:
+        """SC4 theo lô"""
+        total_overtime = np.maximum(hours - expected, 0).sum(axis=1)
+        return np.maximum(0.0, 1.0 - np.minimum(1.0, total_overtime / 500.0))
+    
     def check_hard_constraints(self, individual: Individual) -> int:
         """
         Kiểm tra ràng buộc cứng:
@@ -65,45 +385,19 @@ class FitnessEvaluator:
         return violations
     
     def check_minimum_hours(self, individual: Individual) -> int:
-        """HC1: Kiểm tra số giờ làm tối thiểu/tháng"""
-        violations = 0
-        
-        for staff_member in individual.staff:
-            staff_id = staff_member.staff_id
-            total_hours = individual.calculate_hours(staff_id)
-            
-            if total_hours < self.min_hours_per_month:
-                violations += 1
-        
-        return violations
+        """HC1: Kiểm tra số giờ làm tối thiểu/tháng (đọc bộ đếm, O(số nhân viên))"""
+        return int((individual.hours_per_staff() < self.min_hours_per_month).sum())
     
     def check_consecutive_shifts(self, individual: Individual) -> int:
-        """HC2: Không làm quá max_consecutive_shifts ca liên tiếp"""
-        violations = 0
-        
-        for staff_member in individual.staff:
-            staff_id = staff_member.staff_id
-            consecutive_count = 0
-            max_consecutive = 0
-            
-            for day_idx in range(individual.days):
-                if individual.is_working_on(staff_id, day_idx):
-                    consecutive_count += 1
-                    max_consecutive = max(max_consecutive, consecutive_count)
-                else:
-                    consecutive_count = 0
-            
-            if max_consecutive > self.max_consecutive_shifts:
-                violations += 1
-        
-        return violations
+        """HC2: Không làm quá max_consecutive_shifts ca liên tiếp (đọc bitmap ngày làm)"""
+        return int(self.count_long_runs(individual.worked_days()[None])[0])
     
     def check_minimum_coverage(self, individual: Individual) -> int:
         """HC3: Đủ nhân viên mỗi ca"""
         violations = 0
         
         for day in individual.schedule:
-            for shift_name in ["morning", "afternoon", "night"]:
+            for shift_name in individual.layout.shift_names:
                 departments_dict = day["shifts"].get(shift_name, {})
                 
                 for department in individual.departments:
@@ -170,7 +464,7 @@ class FitnessEvaluator:
         total_shifts = 0
         
         for day in individual.schedule:
-            for shift_name in ["morning", "afternoon", "night"]:
+            for shift_name in individual.layout.shift_names:
                 departments_dict = day["shifts"].get(shift_name, {})
                 
                 for department_name, staff_list in departments_dict.items():
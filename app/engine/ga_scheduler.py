@@ -4,49 +4,212 @@ Thuật toán Di truyền để tối ưu hóa lịch trực
 """
 import random
 import time
-from typing import List, Tuple
-from app.schemas.schedule import ScheduleRequest, ScheduleResponse, DaySchedule
+from typing import List, Tuple, Dict, Callable, Optional
+import numpy as np
+from app.schemas.schedule import (ScheduleRequest, ScheduleResponse, DaySchedule, FeasibilityReport,
+                                  ParetoSolution)
 from app.engine.individual import Individual
-from app.engine.fitness import FitnessEvaluator
+from app.engine.genome import GenomeLayout
+from app.engine.population import PopulationArena
+from app.engine.fitness import FitnessEvaluator, SOFT_OBJECTIVES
+from app.engine.parallel import ParallelEvaluator
+from app.engine.repair import RepairOperator
+from app.engine.local_search import LocalSearch
+from app.engine.profiler import PhaseProfiler
+from app.engine.feasibility import check_feasibility, InfeasibleScheduleError
+from app.config import PROFILING_ENABLED
+from app.utils.result_cache import ResultCache, request_key, is_cacheable
+from app.utils.metrics import MetricsRegistry
 
 
-class GeneticScheduler:
-    """Thuật toán Di truyền cho bài toán xếp lịch"""
+class BaseScheduler:
+    """Phần dùng chung của các bộ xếp lịch: theo dõi tiến trình và dừng theo yêu cầu"""
     
     def __init__(self, config: ScheduleRequest):
         self.config = config
-        self.population: List[Individual] = []
         self.best_individual: Individual = None
+        self.fitness_history = []
+        
+        # Hàm nhận sự kiện mỗi thế hệ (xem notify)
+        self.listeners: List[Callable[[Dict], None]] = []
+        self._stop_requested = False
+        self._last_notify = (0, None)  # (thế hệ, thời điểm) của lần notify trước
+        # Lý do dừng: "solved", "max_generations", "time_limit", "stagnation", "lower_bound", "cancelled"
+        self.stop_reason: str = None
+        # Cận dưới số vi phạm cứng từ kiểm tra khả thi: đạt tới thì không thể tốt hơn (0 = không biết)
+        self.hard_lower_bound = 0
+        # Thời điểm hết ngân sách time_limit_seconds (None = không giới hạn)
+        self.deadline: float = None
+        # Số vi phạm cứng đã sửa mỗi thế hệ theo loại (xem RepairOperator)
+        self.repair_history: List[Dict[str, int]] = []
+        # Thời gian theo pha (xem PhaseProfiler, tắt bằng PROFILING_ENABLED)
+        self.profiler = PhaseProfiler(PROFILING_ENABLED)
+        # Tập Pareto cuối (chỉ chế độ multi_objective, xem NSGAScheduler)
+        self.pareto: List[Individual] = []
+    
+    def add_listener(self, callback: Callable[[Dict], None]):
+        """Đăng ký hàm nhận sự kiện tiến trình mỗi thế hệ"""
+        self.listeners.append(callback)
+    
+    def request_stop(self):
+        """Yêu cầu dừng ở cuối thế hệ đang chạy (an toàn khi gọi từ thread khác)"""
+        self._stop_requested = True
+    
+    def start_clock(self, start_time: float):
+        """Bắt đầu tính ngân sách thời gian"""
+        limit = self.config.time_limit_seconds
+        self.deadline = None if limit is None else start_time + limit
+    
+    def check_stop(self) -> str:
+        """Lý do dừng trước thế hệ kế tiếp (None = chạy tiếp)"""
+        if self._stop_requested:
+            return "cancelled"
+        
+        if self.deadline is not None and time.time() >= self.deadline:
+            return "time_limit"
+        
+        # Còn vi phạm cứng thì fitness chỉ phụ thuộc số vi phạm → đạt cận dưới là tối ưu
+        best = self.best_individual
+        if best is not None and 0 < best.hard_violations <= self.hard_lower_bound:
+            return "lower_bound"
+        
+        window = self.config.stagnation_generations
+        if window and len(self.fitness_history) > window:
+            improvement = self.fitness_history[-1] - self.fitness_history[-1 - window]
+            if improvement <= self.config.stagnation_epsilon:
+                return "stagnation"
+        
+        return None
+    
+    def notify(self, generation: int, start_time: float):
+        """Gửi sự kiện tiến trình cho các listener"""
+        if not self.listeners:
+            return
+        
+        now = time.time()
+        last_generation, last_time = self._last_notify
+        self._last_notify = (generation, now)
+        steps = max(1, generation - last_generation)
+        
+        event = {
+            "generation": generation,
+            "best_fitness": self.best_individual.fitness_score,
+            "mean_fitness": self.mean_fitness(),
+            "hard_violations": self.best_individual.hard_violations,
+            "generation_time": (now - (last_time or start_time)) / steps,
+            "elapsed": now - start_time,
+            "repaired": self.repair_history[-1] if self.repair_history else {},
+            "phases": self.profiler.last_generation(),
+        }
+        for callback in self.listeners:
+            callback(event)
+    
+    def mean_fitness(self) -> Optional[float]:
+        """Fitness trung bình của quần thể hiện tại (None nếu bộ xếp lịch không có quần thể)"""
+        return None
+
+
+class GeneticScheduler(BaseScheduler):
+    """Thuật toán Di truyền cho bài toán xếp lịch"""
+    
+    def __init__(self, config: ScheduleRequest, verbose: bool = True):
+        super().__init__(config)
+        self.verbose = verbose
+        # RNG riêng cho mỗi lần chạy (seed cố định → kết quả lặp lại được)
+        self.random = random.Random(config.seed)
+        self.population: List[Individual] = []
+        
+        # Bố cục genome và vùng nhớ quần thể dùng chung cho cả lần chạy
+        self.layout = GenomeLayout(config.staff, config.departments, config.shifts, config.days)
+        self.arena = PopulationArena(self.layout, config.population_size)
+        # Ô nhớ tạm cho con thứ 2 khi thế hệ mới chỉ còn 1 chỗ
+        self._spare = self.new_individual()
         self.fitness_evaluator = FitnessEvaluator(
             weights=config.weights,
             min_hours_per_month=config.min_hours_per_month,
             max_consecutive_shifts=config.max_consecutive_shifts
         )
-        
-        # Lịch sử fitness qua các thế hệ
-        self.fitness_history = []
+        # Pool tiến trình đánh giá fitness (chỉ khi parallelism > 1)
+        self.pool: ParallelEvaluator = None
+        self.repair_operator = RepairOperator(
+            self.layout,
+            min_hours=config.min_hours_per_month,
+            max_consecutive_days=config.max_consecutive_shifts,
+            rng=self.random
+        )
+        self.local_search = LocalSearch(self.layout, self.fitness_evaluator, rng=self.random)
     
     def initialize_population(self):
         """Khởi tạo quần thể ban đầu"""
-        print(f"Khởi tạo quần thể với {self.config.population_size} cá thể...")
-        
-        for i in range(self.config.population_size):
-            individual = Individual(
-                staff=self.config.staff,
-                departments=self.config.departments,
-                shifts=self.config.shifts,
-                days=self.config.days
-            )
-            individual.initialize_random()
+        if self.verbose:
+            print(f"Khởi tạo quần thể với {self.config.population_size} cá thể...")
+        
+        # Khởi tạo ấm: num_seeded cá thể đầu lấy lần lượt từ các lịch có sẵn
+        seed_genomes = self.warm_start_genomes()
+        num_seeded = 0
+        if seed_genomes:
+            num_seeded = round(self.config.warm_start_fraction * self.config.population_size)
+            num_perturbed = max(1, round(self.config.warm_start_perturbation * self.genome_size()))
+        
+        for i, individual in enumerate(self.arena.front):
+            individual.reset_metadata()
+            if i < num_seeded:
+                # Phần không lấy từ lịch có sẵn khởi tạo theo config.initializer
+                individual.initialize_from(seed_genomes[i % len(seed_genomes)], self.random,
+                                           fill=self.initialize_individual)
+                # Bản sao đầu tiên của mỗi lịch giữ nguyên, các bản sau bị xáo trộn
+                if i >= len(seed_genomes):
+                    for _ in range(num_perturbed):
+                        self.mutate_slot(individual)
+            else:
+                self.initialize_individual(individual)
             self.population.append(individual)
             
-            if (i + 1) % 20 == 0:
+            if self.verbose and (i + 1) % 20 == 0:
                 print(f"  Đã khởi tạo {i + 1}/{self.config.population_size}")
     
+    def initialize_individual(self, individual: Individual):
+        """Khởi tạo 1 cá thể theo config.initializer"""
+        if self.config.initializer == "random":
+            individual.initialize_random(self.random)
+        else:
+            individual.initialize_greedy(
+                self.random,
+                max_consecutive_days=self.config.max_consecutive_shifts,
+                # Cùng chỉ tiêu với evaluator (mảng theo nhân viên ở khối rolling horizon)
+                min_hours=self.fitness_evaluator.min_hours_per_month,
+                noise=self.config.initializer_noise
+            )
+    
+    def warm_start_genomes(self) -> List[np.ndarray]:
+        """Mã hóa các lịch khởi tạo ấm theo layout hiện tại (căn theo chỉ số ngày)"""
+        genomes = []
+        for schedule in self.config.warm_start_schedules:
+            days = [day.model_dump() if hasattr(day, 'model_dump') else day.dict() for day in schedule]
+            genomes.append(self.layout.encode(days))
+        return genomes
+    
+    def genome_size(self) -> int:
+        """Số slot của 1 genome"""
+        return self.config.days * len(self.config.shifts) * self.layout.num_slots
+    
+    def new_individual(self) -> Individual:
+        """Tạo cá thể độc lập (ngoài arena) dùng chung layout"""
+        return Individual(
+            staff=self.config.staff,
+            departments=self.config.departments,
+            shifts=self.config.shifts,
+            days=self.config.days,
+            layout=self.layout
+        )
+    
+    def mean_fitness(self) -> float:
+        """Fitness trung bình của quần thể hiện tại"""
+        return sum(individual.fitness_score for individual in self.population) / len(self.population)
+    
     def evaluate_population(self):
-        """Đánh giá fitness cho toàn bộ quần thể"""
-        for individual in self.population:
-            self.fitness_evaluator.evaluate(individual)
+        """Đánh giá fitness cho toàn bộ quần thể (theo lô)"""
+        self.fitness_evaluator.evaluate_population(self.population)
         
         # Sắp xếp theo fitness (cao → thấp)
         self.population.sort(key=lambda x: x.fitness_score, reverse=True)
@@ -54,6 +217,7 @@ class GeneticScheduler:
         # Cập nhật best individual
         if not self.best_individual or self.population[0].fitness_score > self.best_individual.fitness_score:
             self.best_individual = self.population[0].copy()
+            self.profiler.count("copies")
     
     def selection(self) -> List[Individual]:
         """Chọn lọc - Tournament Selection"""
@@ -65,227 +229,407 @@ class GeneticScheduler:
         
         for _ in range(num_parents):
             # Chọn ngẫu nhiên tournament_size cá thể
-            tournament = random.sample(self.population, tournament_size)
+            tournament = self.random.sample(self.population, tournament_size)
             # Chọn cá thể tốt nhất trong tournament
             winner = max(tournament, key=lambda x: x.fitness_score)
             selected.append(winner)
         
         return selected
     
-    def crossover(self, parent1: Individual, parent2: Individual) -> Tuple[Individual, Individual]:
-        """Lai ghép - Single Point Crossover theo ngày"""
-        if random.random() > self.config.crossover_rate:
-            return parent1.copy(), parent2.copy()
+    def crossover(self, parent1: Individual, parent2: Individual,
+                  child1: Individual = None, child2: Individual = None) -> Tuple[Individual, Individual]:
+        """
+        Lai ghép - Single Point Crossover theo ngày
+        Nếu truyền child1/child2 thì ghi thẳng vào bộ nhớ của chúng (arena)
+        """
+        if child1 is None:
+            child1 = self.new_individual()
+        if child2 is None:
+            child2 = self.new_individual()
         
-        # Chọn điểm cắt ngẫu nhiên
-        crossover_point = random.randint(1, self.config.days - 1)
+        if self.random.random() > self.config.crossover_rate or self.config.days < 2:
+            parent1.copy_into(child1)
+            parent2.copy_into(child2)
+            return child1, child2
         
-        # Tạo 2 con
-        child1 = Individual(
-            staff=self.config.staff,
-            departments=self.config.departments,
-            shifts=self.config.shifts,
-            days=self.config.days
-        )
-        child2 = Individual(
-            staff=self.config.staff,
-            departments=self.config.departments,
-            shifts=self.config.shifts,
-            days=self.config.days
-        )
+        # Chọn điểm cắt ngẫu nhiên
+        crossover_point = self.random.randint(1, self.config.days - 1)
         
         # Child 1: Lấy crossover_point ngày đầu từ parent1, phần còn lại từ parent2
-        child1.schedule = parent1.schedule[:crossover_point] + parent2.schedule[crossover_point:]
+        child1.splice(parent1, parent2, crossover_point)
         
         # Child 2: Ngược lại
-        child2.schedule = parent2.schedule[:crossover_point] + parent1.schedule[crossover_point:]
+        child2.splice(parent2, parent1, crossover_point)
+        
+        for child in (child1, child2):
+            child.reset_metadata()
         
         return child1, child2
     
     def mutate(self, individual: Individual):
-        """Đột biến - Hoán đổi ngẫu nhiên nhân viên trong 1 ca"""
-        if random.random() > self.config.mutation_rate:
+        """Đột biến - Thay 1 nhân viên trong 1 ca của 1 khoa bằng người khác cùng khoa"""
+        if self.random.random() > self.config.mutation_rate:
             return
         
-        # Chọn ngẫu nhiên 1 ngày
-        day_idx = random.randint(0, self.config.days - 1)
-        day = individual.schedule[day_idx]
-        
-        # Chọn ngẫu nhiên 1 ca
-        shift_name = random.choice(["morning", "afternoon", "night"])
-        positions_dict = day["shifts"][shift_name]
-        
-        # Chọn ngẫu nhiên 1 vị trí
-        if not positions_dict:
-            return
-        
-        position_name = random.choice(list(positions_dict.keys()))
-        current_staff = positions_dict[position_name]
-        
-        if not current_staff:
+        self.mutate_slot(individual)
+    
+    def mutate_slot(self, individual: Individual):
+        """Thay 1 slot ngẫu nhiên bằng nhân viên cùng khoa chưa có trong ca"""
+        # Chọn ngẫu nhiên 1 ngày và 1 ca
+        day_idx = self.random.randint(0, self.config.days - 1)
+        shift_idx = self.random.randrange(len(self.config.shifts))
+        
+        # Chọn ngẫu nhiên 1 khoa có slot
+        if self.layout.num_slots == 0:
             return
         
-        # Tìm vị trí tương ứng
-        position = None
-        for p in self.config.positions:
-            if p.name == position_name:
-                position = p
-                break
-        
-        if not position:
-            return
+        dept_idx = int(self.layout.slot_department[self.random.randrange(self.layout.num_slots)])
+        slots = self.layout.department_slots[dept_idx]
+        current_staff = individual.genome[day_idx, shift_idx, slots]
         
-        # Lọc nhân viên phù hợp chuyên môn và không nghỉ phép
+        # Nhân viên cùng khoa chưa có mặt trong ca này
         eligible_staff = [
-            s for s in self.config.staff
-            if (s.specialty == position.specialty_required and
-                day["date"] not in s.leave_dates)
+            s for s in self.layout.eligible[dept_idx].tolist()
+            if s not in current_staff
         ]
         
         if not eligible_staff:
             return
         
         # Chọn ngẫu nhiên nhân viên mới
-        # Lọc theo role hiện tại đang thiếu
-        doctors_needed = position.required_doctors
-        nurses_needed = position.required_nurses
-        
-        current_doctors = [s for s in current_staff 
-                          if individual.get_staff_by_name(s).role == "BacSi"]
-        current_nurses = [s for s in current_staff 
-                         if individual.get_staff_by_name(s).role == "DieuDuong"]
-        
-        new_staff = []
-        
-        # Thêm bác sĩ nếu thiếu
-        if len(current_doctors) < doctors_needed:
-            available_doctors = [s for s in eligible_staff if s.role == "BacSi"]
-            if available_doctors:
-                new_doctor = random.choice(available_doctors)
-                new_staff.append(new_doctor.name)
-        
-        # Thêm điều dưỡng nếu thiếu
-        if len(current_nurses) < nurses_needed:
-            available_nurses = [s for s in eligible_staff if s.role == "DieuDuong"]
-            if available_nurses:
-                new_nurse = random.choice(available_nurses)
-                new_staff.append(new_nurse.name)
-        
-        # Cập nhật
-        if new_staff:
-            individual.schedule[day_idx]["shifts"][shift_name][position_name] = new_staff
+        slot = self.random.randrange(slots.start, slots.stop)
+        individual.set_slot(day_idx, shift_idx, slot, self.random.choice(eligible_staff))
     
     def evolve(self) -> Individual:
         """
         Chạy thuật toán Di truyền
         Returns: Cá thể tốt nhất
         """
+        if self.config.parallelism > 1:
+            with ParallelEvaluator(self.config, self.config.parallelism, self.fitness_evaluator) as pool:
+                self.pool = pool
+                self.fitness_evaluator.pool = pool
+                try:
+                    return self._evolve()
+                finally:
+                    self.fitness_evaluator.pool = None
+                    self.pool = None
+        
+        return self._evolve()
+    
+    def _evolve(self) -> Individual:
+        """Vòng lặp tiến hóa"""
         start_time = time.time()
+        self.start_clock(start_time)
         
-        # Bước 1: Khởi tạo quần thể
-        self.initialize_population()
+        # Bước 1, 2: Khởi tạo và đánh giá quần thể ban đầu
+        self.start()
         
-        # Bước 2: Đánh giá ban đầu
-        print("\nĐánh giá quần thể ban đầu...")
-        self.evaluate_population()
-        self.fitness_history.append(self.best_individual.fitness_score)
-        
-        print(f"Thế hệ 0: Best Fitness = {self.best_individual.fitness_score:.2f}, "
-              f"Violations = {self.best_individual.hard_violations}")
+        if self.verbose:
+            print(f"Thế hệ 0: Best Fitness = {self.best_individual.fitness_score:.2f}, "
+                  f"Violations = {self.best_individual.hard_violations}")
+        self.notify(0, start_time)
+        self.stop_reason = "max_generations"
         
         # Bước 3: Tiến hóa qua các thế hệ
         for generation in range(1, self.config.max_generations + 1):
-            # 3.1 Chọn lọc
-            parents = self.selection()
-            
-            # 3.2 Lai ghép và tạo thế hệ mới
-            new_population = []
-            
-            # Giữ lại 10% cá thể tốt nhất (Elitism)
-            elite_size = self.config.population_size // 10
-            new_population.extend([ind.copy() for ind in self.population[:elite_size]])
-            
-            # Tạo con từ lai ghép
-            while len(new_population) < self.config.population_size:
-                parent1 = random.choice(parents)
-                parent2 = random.choice(parents)
-                
-                child1, child2 = self.crossover(parent1, parent2)
-                
-                # 3.3 Đột biến
-                self.mutate(child1)
-                self.mutate(child2)
-                
-                new_population.append(child1)
-                if len(new_population) < self.config.population_size:
-                    new_population.append(child2)
-            
-            # 3.4 Thay thế quần thể
-            self.population = new_population
+            reason = self.check_stop()
+            if reason:
+                if self.verbose:
+                    print(f"\nDừng tại thế hệ {generation - 1} ({reason})")
+                self.stop_reason = reason
+                break
             
-            # 3.5 Đánh giá thế hệ mới
-            self.evaluate_population()
-            self.fitness_history.append(self.best_individual.fitness_score)
+            self.step()
+            self.notify(generation, start_time)
             
             # Log tiến trình
-            if generation % 50 == 0 or generation == self.config.max_generations:
+            if self.verbose and (generation % 50 == 0 or generation == self.config.max_generations):
                 print(f"Thế hệ {generation}: "
                       f"Best Fitness = {self.best_individual.fitness_score:.2f}, "
                       f"Hard Violations = {self.best_individual.hard_violations}, "
-                      f"Soft Violations = {self.best_individual.soft_violations}")
+                      f"Soft Violations = {self.best_individual.soft_violations}, "
+                      f"Đã sửa = {sum(self.repair_history[-1].values())}")
             
             # Dừng sớm nếu đã đạt được lịch hoàn hảo
-            if self.best_individual.hard_violations == 0 and self.best_individual.fitness_score >= 950:
-                print(f"\nĐạt được lịch trực tối ưu tại thế hệ {generation}!")
+            if self.is_solved():
+                if self.verbose:
+                    print(f"\nĐạt được lịch trực tối ưu tại thế hệ {generation}!")
+                self.stop_reason = "solved"
                 break
         
-        computation_time = time.time() - start_time
-        print(f"\n✓ Hoàn thành trong {computation_time:.2f} giây")
+        if self.verbose:
+            print(f"\n✓ Hoàn thành trong {time.time() - start_time:.2f} giây")
         
         return self.best_individual
-
-
-def generate_schedule(payload: ScheduleRequest) -> ScheduleResponse:
-    """
-    API endpoint chính để tạo lịch trực
-    """
-    print("\n" + "="*60)
-    print("BẮT ĐẦU TẠO LỊCH TRỰC")
-    print("="*60)
-    print(f"Nhân viên: {len(payload.staff)}")
-    print(f"Vị trí: {len(payload.positions)}")
-    print(f"Số ngày: {payload.days}")
-    print(f"Quần thể: {payload.population_size}")
-    print(f"Thế hệ: {payload.max_generations}")
-    print("="*60 + "\n")
-    
-    # Tạo scheduler
-    scheduler = GeneticScheduler(payload)
     
-    # Chạy GA
-    best_individual = scheduler.evolve()
+    def start(self):
+        """Khởi tạo và đánh giá quần thể ban đầu (thế hệ 0)"""
+        profiler = self.profiler
+        t = profiler.now()
+        self.initialize_population()
+        t = profiler.lap("initialization", t)
+        
+        if self.verbose:
+            print("\nĐánh giá quần thể ban đầu...")
+        self.evaluate_population()
+        profiler.lap("evaluation", t)
+        self.fitness_history.append(self.best_individual.fitness_score)
+        self.end_generation()
+    
+    def end_generation(self):
+        """Chốt số liệu profiler của thế hệ vừa xong"""
+        self.profiler.counts["evaluations"] = self.fitness_evaluator.evaluations
+        self.profiler.end_generation()
+    
+    def step(self):
+        """Tạo và đánh giá 1 thế hệ mới"""
+        profiler = self.profiler
+        t = profiler.now()
+        
+        # 3.1 Chọn lọc
+        parents = self.selection()
+        t = profiler.lap("selection", t)
+        
+        # 3.2 Lai ghép và tạo thế hệ mới (ghi vào bộ đệm back của arena)
+        slots = self.arena.back
+        new_population = []
+        
+        # Giữ lại 10% cá thể tốt nhất (Elitism)
+        elite_size = self.config.population_size // 10
+        for individual in self.population[:elite_size]:
+            target = slots[len(new_population)]
+            individual.copy_into(target)
+            new_population.append(target)
+        profiler.count("copies", elite_size)
+        t = profiler.lap("copy", t)
+        
+        # Tạo con từ lai ghép
+        while len(new_population) < self.config.population_size:
+            parent1 = self.random.choice(parents)
+            parent2 = self.random.choice(parents)
+            
+            target1 = slots[len(new_population)]
+            if len(new_population) + 1 < self.config.population_size:
+                target2 = slots[len(new_population) + 1]
+            else:
+                target2 = self._spare
+            
+            child1, child2 = self.crossover(parent1, parent2, target1, target2)
+            t = profiler.lap("crossover", t)
+            
+            # 3.3 Đột biến
+            self.mutate(child1)
+            self.mutate(child2)
+            t = profiler.lap("mutation", t)
+            
+            new_population.append(child1)
+            if len(new_population) < self.config.population_size:
+                new_population.append(child2)
+        
+        # 3.4 Sửa vi phạm cứng cho 1 phần thế hệ mới
+        self.repair(new_population)
+        t = profiler.lap("repair", t)
+        
+        # 3.5 Thay thế quần thể
+        self.arena.swap()
+        self.population = new_population
+        
+        # 3.6 Đánh giá thế hệ mới
+        self.evaluate_population()
+        t = profiler.lap("evaluation", t)
+        
+        # 3.7 Pha memetic: leo đồi trên các cá thể tốt nhất
+        generation = len(self.fitness_history)
+        if self.config.memetic_top_k > 0 and generation % max(1, self.config.memetic_interval) == 0:
+            self.polish()
+            profiler.lap("memetic", t)
+        
+        self.fitness_history.append(self.best_individual.fitness_score)
+        self.end_generation()
+    
+    def polish(self):
+        """Leo đồi trên memetic_top_k cá thể tốt nhất trong ngân sách memetic_time_budget giây"""
+        deadline = time.time() + self.config.memetic_time_budget
+        if self.deadline is not None:
+            deadline = min(deadline, self.deadline)
+        for individual in self.population[:self.config.memetic_top_k]:
+            self.local_search.improve(individual, self.config.memetic_steps, deadline)
+        
+        # Fitness đã cập nhật tăng dần → chỉ sắp xếp lại và cập nhật best
+        self.evaluate_population()
+    
+    def repair(self, population: List[Individual]):
+        """Sửa repair_fraction cá thể chọn ngẫu nhiên, ghi số vi phạm đã sửa vào repair_history"""
+        count = min(len(population), round(self.config.repair_fraction * len(population)))
+        fixed = {"coverage": 0, "runs": 0, "hours": 0}
+        
+        for individual in self.random.sample(population, count):
+            for name, value in self.repair_operator.repair(individual).items():
+                fixed[name] += value
+        
+        self.repair_history.append(fixed)
+    
+    def is_solved(self) -> bool:
+        """Đã đạt lịch không vi phạm với điểm mềm đủ cao"""
+        return (self.best_individual.hard_violations == 0
+                and self.best_individual.fitness_score >= self.config.target_fitness)
+    
+    def emigrants(self, count: int) -> List[np.ndarray]:
+        """Genome của count cá thể tốt nhất (quần thể đã sắp xếp) để di cư"""
+        return [individual.genome.copy() for individual in self.population[:count]]
     
-    # Chuyển đổi sang response format
-    schedule_days = []
-    for day_data in best_individual.schedule:
-        day_schedule = DaySchedule(
+    def immigrate(self, genomes: List[np.ndarray]):
+        """Thay các cá thể kém nhất bằng cá thể nhập cư rồi đánh giá lại"""
+        if not genomes:
+            return
+        
+        for individual, genome in zip(reversed(self.population), genomes):
+            individual.genome[...] = genome
+            individual.rebuild_counters()
+            individual.reset_metadata()
+        
+        self.evaluate_population()
+
+
+def build_schedule(individual: Individual) -> List[DaySchedule]:
+    """Giải mã genome → danh sách DaySchedule (chỉ 1 lần khi tạo response)"""
+    return [
+        DaySchedule(
             date=day_data["date"],
             day_of_week=day_data["day_of_week"],
             is_weekend=day_data["is_weekend"],
-            is_holiday=day_data["is_holiday"],
             shifts=day_data["shifts"]
         )
-        schedule_days.append(day_schedule)
+        for day_data in individual.schedule
+    ]
+
+
+def build_response(best_individual: Individual, generation: int,
+                   computation_time: float = 0.0, stop_reason: str = None,
+                   profile: Dict = None, feasibility: FeasibilityReport = None,
+                   pareto: List[Individual] = None) -> ScheduleResponse:
+    """Chuyển cá thể tốt nhất (và tập Pareto nếu có) sang ScheduleResponse"""
+    pareto_front = None
+    if pareto:
+        pareto_front = [
+            ParetoSolution(
+                schedule=build_schedule(individual),
+                scores=dict(zip(SOFT_OBJECTIVES, individual.objectives.tolist())),
+                fitness_score=individual.fitness_score,
+                hard_violations=individual.hard_violations
+            )
+            for individual in pareto
+        ]
     
-    # Tạo response
-    response = ScheduleResponse(
-        schedule=schedule_days,
+    return ScheduleResponse(
+        schedule=build_schedule(best_individual),
         fitness_score=best_individual.fitness_score,
         hard_violations=best_individual.hard_violations,
         soft_violations=best_individual.soft_violations,
         statistics=best_individual.stats,
-        generation=len(scheduler.fitness_history),
-        computation_time=0.0  # Sẽ được cập nhật
+        generation=generation,
+        computation_time=computation_time,
+        stop_reason=stop_reason,
+        profile=profile,
+        feasibility=feasibility,
+        pareto_front=pareto_front
     )
+
+
+def create_scheduler(payload: ScheduleRequest, verbose: bool = True) -> BaseScheduler:
+    """
+    Chọn bộ xếp lịch theo cấu hình
+    multi_objective → NSGA-II; rolling_block_days → giải lần lượt từng khối ngày (lịch dài);
+    decompose → GA con theo nhóm khoa; nhiều đảo → mô hình đảo trên nhiều tiến trình
+    verbose=False: không in log tiến trình
+    """
+    if payload.multi_objective:
+        from app.engine.nsga import NSGAScheduler
+        return NSGAScheduler(payload, verbose)
+    if payload.rolling_block_days and payload.days > payload.rolling_block_days:
+        from app.engine.rolling import RollingHorizonScheduler
+        return RollingHorizonScheduler(payload, verbose)
+    if payload.decompose:
+        from app.engine.decomposition import DecomposedScheduler
+        return DecomposedScheduler(payload, verbose)
+    if payload.islands > 1:
+        from app.engine.islands import IslandScheduler
+        return IslandScheduler(payload, verbose)
+    return GeneticScheduler(payload, verbose)
+
+
+def generate_schedule(payload: ScheduleRequest, scheduler: BaseScheduler = None,
+                      cache: ResultCache = None, metrics: MetricsRegistry = None,
+                      verbose: bool = True) -> ScheduleResponse:
+    """
+    API endpoint chính để tạo lịch trực
+    cache: nếu có, trả ngay kết quả của request giống hệt trước đó (cache_hit=True)
+    metrics: nếu có, ghi lần chạy (thời gian, lý do dừng, thời gian theo pha) cho /metrics
+    verbose=False: không in log (bộ xếp lịch tạo ở đây cũng chạy im lặng)
+    Raises: InfeasibleScheduleError nếu feasibility_check = "reject" và chắc chắn có vi phạm cứng
+    """
+    key = None
+    if cache is not None and is_cacheable(payload):
+        key = request_key(payload)
+        cached = cache.get(key)
+        if cached is not None:
+            if verbose:
+                print(f"Lấy lịch từ cache ({key[:12]})")
+            if metrics is not None:
+                metrics.record_cache_hit()
+            update = {"cache_hit": True}
+            if hasattr(cached, 'model_copy'):
+                return cached.model_copy(update=update)
+            return cached.copy(update=update)
+    
+    if verbose:
+        print("\n" + "="*60)
+        print("BẮT ĐẦU TẠO LỊCH TRỰC")
+        print("="*60)
+        print(f"Nhân viên: {len(payload.staff)}")
+        print(f"Khoa: {len(payload.departments)}")
+        print(f"Số ngày: {payload.days}")
+        print(f"Quần thể: {payload.population_size}")
+        print(f"Thế hệ: {payload.max_generations}")
+        print("="*60 + "\n")
+    
+    start_time = time.time()
+    
+    # Kiểm tra khả thi trước khi chạy GA (vài ms): báo sớm ràng buộc cứng không thể thỏa
+    report = None
+    if payload.feasibility_check != "off":
+        report = check_feasibility(payload, getattr(scheduler, "layout", None))
+        if verbose:
+            for issue in report.issues:
+                print(f"⚠ {issue.constraint}: {issue.message}")
+        if not report.feasible and payload.feasibility_check == "reject":
+            raise InfeasibleScheduleError(report)
+    
+    # Tạo scheduler (có thể truyền sẵn để theo dõi tiến trình / hủy)
+    scheduler = scheduler or create_scheduler(payload, verbose)
+    if report is not None:
+        scheduler.hard_lower_bound = report.min_hard_violations
+    
+    # Chạy GA
+    best_individual = scheduler.evolve()
+    
+    # Tạo response
+    generation = len(scheduler.fitness_history)
+    response = build_response(
+        best_individual,
+        generation=generation,
+        computation_time=time.time() - start_time,
+        stop_reason=scheduler.stop_reason,
+        profile=scheduler.profiler.summary(max(0, generation - 1)),
+        feasibility=report,
+        pareto=scheduler.pareto
+    )
+    if metrics is not None:
+        metrics.record_run(response.stop_reason, response.computation_time, response.profile)
+    
+    # Kết quả bị hủy giữa chừng không đưa vào cache
+    if key is not None and scheduler.stop_reason != "cancelled":
+        cache.put(key, response)
     
-    return response
\ No newline at end of file
+    return response
@@ -0,0 +1,154 @@
+"""
+Bộ gen dạng mảng (genome) cho lịch trực
+Mỗi cá thể là 1 tensor số nguyên: ngày × ca × vị trí (slot) của các khoa,
+giá trị là chỉ số nhân viên (-1 = bỏ trống)
+"""
+from datetime import datetime, timedelta
+from typing import List, Dict, Tuple
+import numpy as np
+from app.schemas.schedule import Staff, Department, Shift
+
+EMPTY_SLOT = -1
+START_DATE = datetime(2025, 12, 1)
+
+
+class GenomeLayout:
+    """
+    Bố cục bộ gen dùng chung cho mọi cá thể của 1 request
+    Mỗi khoa chiếm required_staff_per_shift slot liên tiếp trên trục cuối
+    """
+
+    def __init__(self, staff: List[Staff], departments: List[Department],
+                 shifts: List[Shift], days: int = 30):
+        self.staff = staff
+        self.departments = departments
+        self.shifts = shifts
+        self.days = days
+
+        # Chỉ mục nhân viên dùng chung: staff_id → chỉ số / đối tượng Staff
+        self.staff_ids = [s.staff_id for s in staff]
+        self.staff_index: Dict[str, int] = {sid: i for i, sid in enumerate(self.staff_ids)}
+        self.staff_by_id: Dict[str, Staff] = {s.staff_id: s for s in staff}
+        self.shift_names = [shift.name for shift in shifts]
+
+        # int16 đủ cho < 32767 nhân viên, giảm một nửa bộ nhớ so với int32
+        self.dtype = np.int16 if len(staff) < np.iinfo(np.int16).max else np.int32
+
+        # Slot của từng khoa trên trục cuối của genome
+        self.department_slots: List[slice] = []
+        offset = 0
+        for department in departments:
+            size = max(0, department.required_staff_per_shift)
+            self.department_slots.append(slice(offset, offset + size))
+            offset += size
+        self.num_slots = offset
+        self.slot_department = np.repeat(
+            np.arange(len(departments), dtype=np.int32),
+            [s.stop - s.start for s in self.department_slots]
+        )
+
+        # Nhân viên thuộc từng khoa (chỉ tính 1 lần cho cả request)
+        self.eligible: List[np.ndarray] = [
+            np.array([i for i, s in enumerate(staff) if s.department == department.name],
+                     dtype=np.int32)
+            for department in departments
+        ]
+
+        # Khoa của từng nhân viên (len(departments) = không thuộc khoa nào trong request)
+        self.staff_department = np.full(len(staff), len(departments), dtype=np.int32)
+        for dept_idx, members in enumerate(self.eligible):
+            self.staff_department[members] = dept_idx
+        
+        self.shape: Tuple[int, int, int] = (days, len(shifts), self.num_slots)
+
+        # Thuộc tính nhân viên dạng mảng (dùng cho đánh giá theo lô)
+        self.staff_shift_hours = np.array([s.shift_duration_hours for s in staff], dtype=np.int64)
+        self.staff_experience = np.array([s.years_of_experience for s in staff], dtype=np.int64)
+        self.expected_hours = np.array(
+            [s.workdays_per_month * s.shift_duration_hours for s in staff], dtype=np.int64
+        )
+
+        # Lịch ngày: (date, day_of_week, is_weekend)
+        self.calendar = []
+        for day_idx in range(days):
+            current_date = START_DATE + timedelta(days=day_idx)
+            day_of_week = current_date.strftime("%A")
+            self.calendar.append((
+                current_date.strftime("%Y-%m-%d"),
+                day_of_week,
+                day_of_week in ["Saturday", "Sunday"]
+            ))
+
+    def buffer_specs(self) -> Dict[str, Tuple[tuple, type]]:
+        """Các mảng lưu trữ của 1 cá thể: tên → (shape, dtype)"""
+        num_staff = len(self.staff)
+        return {
+            "genome": (self.shape, self.dtype),
+            # Bộ đếm của cá thể (xem Individual.set_slot)
+            "day_load": ((self.days, num_staff), np.uint8),
+            "shift_counts": ((num_staff,), np.int32),
+            # Thành phần fitness (xem FitnessEvaluator.compute_components)
+            "short": ((self.days, len(self.shifts), len(self.departments)), np.bool_),
+            "diverse": ((self.days, len(self.shifts), len(self.departments)), np.int8),
+            "long_windows": ((num_staff,), np.int32),
+        }
+
+    def allocate(self) -> Dict[str, np.ndarray]:
+        """Cấp phát bộ nhớ cho 1 cá thể độc lập (ngoài arena)"""
+        storage = {
+            name: np.zeros(shape, dtype=dtype)
+            for name, (shape, dtype) in self.buffer_specs().items()
+        }
+        storage["genome"].fill(EMPTY_SLOT)
+        return storage
+
+    def bytes_per_individual(self) -> int:
+        """Số byte bộ nhớ của 1 cá thể"""
+        return sum(
+            int(np.prod(shape)) * np.dtype(dtype).itemsize
+            for shape, dtype in self.buffer_specs().values()
+        )
+
+    def decode(self, genome: np.ndarray) -> List[Dict]:
+        """Chuyển genome về dạng dict (dùng khi tạo DaySchedule)"""
+        schedule = []
+        rows = genome.tolist()
+
+        for day_idx, (date, day_of_week, is_weekend) in enumerate(self.calendar):
+            shifts_dict = {}
+            for shift_idx, shift_name in enumerate(self.shift_names):
+                row = rows[day_idx][shift_idx]
+                shifts_dict[shift_name] = {
+                    department.name: [
+                        self.staff_ids[s] for s in row[slots] if s != EMPTY_SLOT
+                    ]
+                    for department, slots in zip(self.departments, self.department_slots)
+                }
+
+            schedule.append({
+                "date": date,
+                "day_of_week": day_of_week,
+                "is_weekend": is_weekend,
+                "shifts": shifts_dict
+            })
+
+        return schedule
+
+    def encode(self, schedule: List[Dict]) -> np.ndarray:
+        """Chuyển lịch dạng dict sang genome (bỏ qua nhân viên không xác định)"""
+        genome = np.full(self.shape, EMPTY_SLOT, dtype=self.dtype)
+
+        for day_idx, day in enumerate(schedule[:self.days]):
+            for shift_idx, shift_name in enumerate(self.shift_names):
+                departments_dict = day["shifts"].get(shift_name, {})
+
+                for department, slots in zip(self.departments, self.department_slots):
+                    staff_list = [
+                        self.staff_index[sid]
+                        for sid in departments_dict.get(department.name, [])
+                        if sid in self.staff_index
+                    ]
+                    staff_list = staff_list[:slots.stop - slots.start]
+                    genome[day_idx, shift_idx, slots.start:slots.start + len(staff_list)] = staff_list
+
+        return genome
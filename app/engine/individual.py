@@ -3,177 +3,372 @@
 Một phương án lịch trực hoàn chỉnh
 """
 import random
-from typing import List, Dict
-from datetime import datetime, timedelta
+from typing import Callable, List, Dict, Optional, Tuple
+import numpy as np
 from app.schemas.schedule import Staff, Department, Shift
+from app.engine.genome import GenomeLayout, EMPTY_SLOT
 
 class Individual:
     """
-    Cá thể = Vector 30 chiều (30 ngày)
-    Mỗi ngày chứa thông tin phân công cho 3 ca
+    Cá thể = Tensor ngày × ca × slot (xem GenomeLayout)
+    Dạng dict (schedule) chỉ được tạo khi cần
     """
     
     def __init__(self, staff: List[Staff], departments: List[Department], 
-                 shifts: List[Shift], days: int = 30):
+                 shifts: List[Shift], days: int = 30,
+                 layout: GenomeLayout = None, storage: Dict[str, np.ndarray] = None):
         self.staff = staff
         self.departments = departments
         self.shifts = shifts
         self.days = days
         
-        # Lịch trực: List[Dict]
-        self.schedule: List[Dict] = []
+        # Bố cục bộ gen dùng chung (truyền vào để không phải tính lại)
+        self.layout = layout or GenomeLayout(staff, departments, shifts, days)
+        
+        # Bộ gen: ngày × ca × slot, giá trị là chỉ số nhân viên
+        # storage có thể là view vào PopulationArena
+        self._storage = storage if storage is not None else self.layout.allocate()
+        self.genome: np.ndarray = self._storage["genome"]
+        self._schedule_cache: Optional[List[Dict]] = None
+        
+        # Bộ đếm theo nhân viên, cập nhật cùng genome:
+        # day_load[ngày, nhân viên] = số ca trong ngày, shift_counts[nhân viên] = tổng số ca
+        self.day_load: np.ndarray = self._storage["day_load"]
+        self.shift_counts: np.ndarray = self._storage["shift_counts"]
+        
+        # Thành phần fitness theo ô (ngày, ca, khoa) và theo nhân viên,
+        # giữ lại để đánh giá tăng dần (xem FitnessEvaluator.evaluate_population)
+        self.short: np.ndarray = self._storage["short"]
+        self.diverse: np.ndarray = self._storage["diverse"]
+        self.long_windows: np.ndarray = self._storage["long_windows"]
+        
+        # Nhật ký thay đổi kể từ lần đánh giá gần nhất
+        self.changed_cells: List[Tuple[int, int, int]] = []
+        self.worked_before: Dict[Tuple[int, int], bool] = {}
+        self.components_valid: bool = False  # short/diverse đúng (trừ changed_cells)
+        self.runs_valid: bool = False        # long_windows đúng (trừ worked_before)
+        self.fitness_valid: bool = False
         
         # Metadata
         self.fitness_score: float = 0.0
         self.hard_violations: int = 0
         self.soft_violations: int = 0
         self.is_valid: bool = False
+        # 4 điểm mềm theo SOFT_OBJECTIVES (do evaluate_population ghi, không sửa tại chỗ)
+        self.objectives: Optional[np.ndarray] = None
         
-        # Thống kê
-        self.stats = {
-            "total_shifts": 0,
-            "hours_per_staff": {},
-            "shifts_per_staff": {}
-        }
+        # Thống kê (dựng lười từ bộ đếm)
+        self._stats: Optional[Dict] = None
+    
+    @property
+    def stats(self) -> Dict:
+        """Thống kê số ca/giờ theo nhân viên"""
+        if self._stats is None:
+            counts = self.shift_counts.tolist()
+            self._stats = {
+                "total_shifts": sum(counts),
+                "hours_per_staff": dict(zip(self.layout.staff_ids, self.hours_per_staff().tolist())),
+                "shifts_per_staff": dict(zip(self.layout.staff_ids, counts))
+            }
+        return self._stats
+    
+    @stats.setter
+    def stats(self, value: Dict):
+        self._stats = value
     
-    def initialize_random(self):
+    @property
+    def schedule(self) -> List[Dict]:
+        """Lịch trực dạng dict, chỉ giải mã từ genome khi cần"""
+        if self._schedule_cache is None:
+            self._schedule_cache = self.layout.decode(self.genome)
+        return self._schedule_cache
+    
+    @schedule.setter
+    def schedule(self, value: List[Dict]):
+        self.genome[...] = self.layout.encode(value)
+        self.rebuild_counters()
+    
+    def invalidate(self):
+        """Gọi sau khi genome hoặc bộ đếm thay đổi"""
+        self._schedule_cache = None
+        self._stats = None
+    
+    def clear_changes(self):
+        """Xóa nhật ký thay đổi sau khi các thành phần fitness đã cập nhật"""
+        self.changed_cells = []
+        self.worked_before = {}
+        self.components_valid = True
+        self.runs_valid = True
+    
+    def discard_components(self):
+        """Thành phần fitness không còn dùng được → lần sau đánh giá đầy đủ"""
+        self.changed_cells = []
+        self.worked_before = {}
+        self.components_valid = False
+        self.runs_valid = False
+        self.fitness_valid = False
+    
+    def rebuild_counters(self):
+        """Tính lại bộ đếm từ genome (sau khi ghi trực tiếp vào genome)"""
+        num_staff = len(self.layout.staff)
+        per_day = self.genome.reshape(self.days, -1).astype(np.int64)
+        mask = per_day >= 0
+        day_offsets = np.arange(self.days, dtype=np.int64)[:, None] * num_staff
+        
+        self.day_load[...] = np.bincount(
+            (per_day + day_offsets)[mask], minlength=self.days * num_staff
+        ).reshape(self.days, num_staff)
+        self.shift_counts[...] = self.day_load.sum(axis=0)
+        self.discard_components()
+        self.invalidate()
+    
+    def reset_metadata(self):
+        """Xóa kết quả đánh giá cũ (khi tái sử dụng ô nhớ trong arena)"""
+        self.fitness_score = 0.0
+        self.hard_violations = 0
+        self.soft_violations = 0
+        self.is_valid = False
+        self.fitness_valid = False
+        self.objectives = None
+        self._stats = None
+    
+    def initialize_random(self, rng: random.Random = None):
         """Khởi tạo lịch trực ngẫu nhiên"""
-        start_date = datetime(2025, 12, 1)
+        rng = rng or random
+        self.genome.fill(EMPTY_SLOT)
         
         for day_idx in range(self.days):
-            current_date = start_date + timedelta(days=day_idx)
-            day_of_week = current_date.strftime("%A")
-            is_weekend = day_of_week in ["Saturday", "Sunday"]
-            
-            day_schedule = {
-                "date": current_date.strftime("%Y-%m-%d"),
-                "day_of_week": day_of_week,
-                "is_weekend": is_weekend,
-                "shifts": {}
-            }
-            
-            # Khởi tạo 3 ca
-            for shift in self.shifts:
-                shift_assignments = {}
-                
+            for shift_idx in range(len(self.shifts)):
                 # Phân công cho từng khoa
-                for department in self.departments:
-                    # Lọc nhân viên thuộc khoa này
-                    eligible_staff = [
-                        s for s in self.staff
-                        if s.department == department.name
-                    ]
+                for dept_idx, slots in enumerate(self.layout.department_slots):
+                    # Nhân viên thuộc khoa này (đã lọc sẵn trong layout)
+                    eligible_staff = self.layout.eligible[dept_idx]
                     
-                    if not eligible_staff:
-                        shift_assignments[department.name] = []
+                    if len(eligible_staff) == 0:
                         continue
                     
                     # Chọn ngẫu nhiên số lượng nhân viên cần thiết
-                    num_needed = department.required_staff_per_shift
-                    selected = random.sample(
-                        eligible_staff,
+                    num_needed = slots.stop - slots.start
+                    selected = rng.sample(
+                        range(len(eligible_staff)),
                         min(num_needed, len(eligible_staff))
                     )
                     
-                    shift_assignments[department.name] = [s.staff_id for s in selected]
+                    self.genome[day_idx, shift_idx, slots.start:slots.start + len(selected)] = \
+                        eligible_staff[selected]
+        
+        self.rebuild_counters()
+    
+    def initialize_greedy(self, rng: random.Random = None, max_consecutive_days: int = 2,
+                          min_hours=0, noise: float = 1.0):
+        """
+        Khởi tạo tham lam có ngẫu nhiên: mỗi (ngày, ca), mỗi khoa chọn những người
+        có tỉ lệ số ca đã xếp / chỉ tiêu thấp nhất (chỉ tiêu = workdays_per_month quy theo số ngày,
+        không dưới số ca cần để đủ min_hours). Tránh người đã làm trong ngày và người đã làm
+        max_consecutive_days ngày liền; chỉ dùng họ khi khoa không còn ai khác.
+        min_hours: số hoặc mảng theo nhân viên
+        noise: nhiễu cộng vào số ca đã xếp (đơn vị ca) để các cá thể khác nhau
+        """
+        rng = rng or random
+        layout = self.layout
+        noise_rng = np.random.default_rng(rng.getrandbits(64))
+        num_staff = len(layout.staff)
+        
+        self.genome.fill(EMPTY_SLOT)
+        if num_staff == 0:
+            self.rebuild_counters()
+            return
+        num_departments = len(layout.departments)
+        
+        workdays = np.array([s.workdays_per_month for s in layout.staff], dtype=np.float64)
+        min_shifts = np.ceil(min_hours / np.maximum(layout.staff_shift_hours, 1))
+        target = np.maximum(np.maximum(workdays * self.days / 30, min_shifts), 1.0)
+        
+        # Sắp xếp theo (khoa, ưu tiên) → nhân viên khoa d nằm ở [offsets[d], offsets[d + 1])
+        members = np.bincount(layout.staff_department, minlength=num_departments + 1)
+        offsets = np.concatenate(([0], np.cumsum(members)))
+        slot_dept = layout.slot_department
+        slot_rank = np.arange(layout.num_slots) - np.array(
+            [layout.department_slots[d].start for d in slot_dept], dtype=np.int64
+        )
+        slot_valid = slot_rank < members[slot_dept]
+        slot_pos = np.where(slot_valid, offsets[slot_dept] + slot_rank, 0)
+        
+        assigned = np.zeros(num_staff, dtype=np.float64)
+        run_length = np.zeros(num_staff, dtype=np.int64)
+        
+        for day_idx in range(self.days):
+            worked_today = np.zeros(num_staff, dtype=bool)
+            blocked = run_length >= max_consecutive_days
+            
+            for shift_idx in range(len(self.shifts)):
+                priority = (assigned + noise * noise_rng.random(num_staff)) / target
+                priority += 1e3 * worked_today + 1e6 * blocked
+                order = np.lexsort((priority, layout.staff_department))
                 
-                day_schedule["shifts"][shift.name] = shift_assignments
+                chosen = np.where(slot_valid, order[slot_pos], EMPTY_SLOT)
+                self.genome[day_idx, shift_idx] = chosen
+                picked = chosen[chosen != EMPTY_SLOT]
+                assigned[picked] += 1
+                worked_today[picked] = True
             
-            self.schedule.append(day_schedule)
+            run_length = np.where(worked_today, run_length + 1, 0)
+        
+        self.rebuild_counters()
+    
+    def initialize_from(self, seed_genome: np.ndarray, rng: random.Random = None,
+                        fill: Callable[["Individual"], None] = None):
+        """
+        Khởi tạo từ lịch có sẵn: giữ nguyên các nhóm (ngày, ca, khoa) của seed
+        có đủ nhân viên hợp lệ, phần còn lại lấy từ fill (mặc định khởi tạo ngẫu nhiên)
+        """
+        if fill is None:
+            self.initialize_random(rng)
+        else:
+            fill(self)
+        
+        for dept_idx, slots in enumerate(self.layout.department_slots):
+            block = seed_genome[:, :, slots]
+            keep = np.isin(block, self.layout.eligible[dept_idx]).all(axis=-1)
+            self.genome[:, :, slots][keep] = block[keep]
+        
+        self.rebuild_counters()
+    
+    def set_slot(self, day_idx: int, shift_idx: int, slot: int, staff_idx: int):
+        """Gán nhân viên (theo chỉ số) vào 1 slot, cập nhật bộ đếm O(1)"""
+        old_staff = int(self.genome[day_idx, shift_idx, slot])
+        if old_staff == staff_idx:
+            return
+        
+        # Ghi nhật ký cho đánh giá tăng dần
+        if self.components_valid:
+            self.changed_cells.append((day_idx, shift_idx, slot))
+        if self.runs_valid:
+            for s in (old_staff, staff_idx):
+                if s != EMPTY_SLOT:
+                    self.worked_before.setdefault((day_idx, s), bool(self.day_load[day_idx, s] > 0))
+        self.fitness_valid = False
+        
+        if old_staff != EMPTY_SLOT:
+            self.day_load[day_idx, old_staff] -= 1
+            self.shift_counts[old_staff] -= 1
+        if staff_idx != EMPTY_SLOT:
+            self.day_load[day_idx, staff_idx] += 1
+            self.shift_counts[staff_idx] += 1
+        
+        self.genome[day_idx, shift_idx, slot] = staff_idx
+        self.invalidate()
+    
+    def splice(self, head: "Individual", tail: "Individual", cut: int):
+        """Ghép [0, cut) ngày từ head và [cut, days) từ tail (bộ đếm theo ngày ghép theo)"""
+        self.genome[:cut] = head.genome[:cut]
+        self.genome[cut:] = tail.genome[cut:]
+        self.day_load[:cut] = head.day_load[:cut]
+        self.day_load[cut:] = tail.day_load[cut:]
+        self.shift_counts[...] = self.day_load.sum(axis=0)
+        
+        # Thành phần theo ngày ghép được trực tiếp từ 2 cha mẹ đã đánh giá;
+        # chuỗi ngày liên tiếp cắt qua điểm nối thì phải tính lại
+        self.discard_components()
+        if (head.components_valid and tail.components_valid
+                and not head.changed_cells and not tail.changed_cells):
+            self.short[:cut] = head.short[:cut]
+            self.short[cut:] = tail.short[cut:]
+            self.diverse[:cut] = head.diverse[:cut]
+            self.diverse[cut:] = tail.diverse[cut:]
+            self.components_valid = True
+        self.invalidate()
+    
+    def hours_per_staff(self) -> np.ndarray:
+        """Số giờ làm của từng nhân viên (theo thứ tự layout.staff)"""
+        return self.shift_counts * self.layout.staff_shift_hours
+    
+    def worked_days(self) -> np.ndarray:
+        """Bitmap ngày làm việc: (ngày, nhân viên)"""
+        return self.day_load > 0
     
     def get_staff_by_id(self, staff_id: str) -> Staff:
         """Lấy thông tin nhân viên theo ID"""
-        for s in self.staff:
-            if s.staff_id == staff_id:
-                return s
-        return None
+        return self.layout.staff_by_id.get(staff_id)
     
     def get_staff_schedule(self, staff_id: str) -> List[Dict]:
         """Lấy tất cả ca trực của 1 nhân viên"""
-        result = []
+        staff_idx = self.layout.staff_index.get(staff_id)
+        if staff_idx is None:
+            return []
         
-        for day_idx, day in enumerate(self.schedule):
-            for shift_name, departments_dict in day["shifts"].items():
-                for department_name, staff_list in departments_dict.items():
-                    if staff_id in staff_list:
-                        result.append({
-                            "day": day_idx + 1,
-                            "date": day["date"],
-                            "shift": shift_name,
-                            "department": department_name
-                        })
+        result = []
+        for day_idx, shift_idx, slot in zip(*np.nonzero(self.genome == staff_idx)):
+            result.append({
+                "day": int(day_idx) + 1,
+                "date": self.layout.calendar[day_idx][0],
+                "shift": self.layout.shift_names[shift_idx],
+                "department": self.departments[self.layout.slot_department[slot]].name
+            })
         
         return result
     
     def count_shifts(self, staff_id: str) -> int:
         """Đếm tổng số ca trực của nhân viên"""
-        return len(self.get_staff_schedule(staff_id))
+        staff_idx = self.layout.staff_index.get(staff_id)
+        return int(self.shift_counts[staff_idx]) if staff_idx is not None else 0
     
     def calculate_hours(self, staff_id: str) -> int:
         """Tính tổng số giờ làm việc của nhân viên"""
-        schedule = self.get_staff_schedule(staff_id)
-        staff_obj = self.get_staff_by_id(staff_id)
+        staff_idx = self.layout.staff_index.get(staff_id)
         
-        if not staff_obj:
+        if staff_idx is None:
             return 0
         
-        total_hours = len(schedule) * staff_obj.shift_duration_hours
-        return total_hours
+        return int(self.shift_counts[staff_idx]) * self.staff[staff_idx].shift_duration_hours
     
     def is_working_on(self, staff_id: str, day_idx: int, shift_name: str = None) -> bool:
         """Kiểm tra nhân viên có làm việc vào ngày/ca cụ thể không"""
-        if day_idx >= len(self.schedule):
+        staff_idx = self.layout.staff_index.get(staff_id)
+        if staff_idx is None or day_idx >= self.days:
             return False
         
-        day = self.schedule[day_idx]
-        
         if shift_name:
             # Kiểm tra ca cụ thể
-            departments_dict = day["shifts"].get(shift_name, {})
-            for department_name, staff_list in departments_dict.items():
-                if staff_id in staff_list:
-                    return True
-        else:
-            # Kiểm tra cả ngày
-            for shift_name, departments_dict in day["shifts"].items():
-                for department_name, staff_list in departments_dict.items():
-                    if staff_id in staff_list:
-                        return True
+            if shift_name not in self.layout.shift_names:
+                return False
+            shift_idx = self.layout.shift_names.index(shift_name)
+            return bool((self.genome[day_idx, shift_idx] == staff_idx).any())
         
-        return False
+        # Kiểm tra cả ngày
+        return bool(self.day_load[day_idx, staff_idx] > 0)
     
     def calculate_statistics(self):
-        """Tính toán thống kê"""
-        total_shifts = 0
-        hours_per_staff = {}
-        shifts_per_staff = {}
-        
-        for staff_member in self.staff:
-            staff_id = staff_member.staff_id
-            shifts_per_staff[staff_id] = self.count_shifts(staff_id)
-            hours_per_staff[staff_id] = self.calculate_hours(staff_id)
-            total_shifts += shifts_per_staff[staff_id]
-        
-        self.stats = {
-            "total_shifts": total_shifts,
-            "hours_per_staff": hours_per_staff,
-            "shifts_per_staff": shifts_per_staff
-        }
+        """Tính toán thống kê (đọc từ bộ đếm, O(số nhân viên))"""
+        self._stats = None
+        return self.stats
     
     def copy(self):
-        """Tạo bản sao của cá thể"""
-        new_individual = Individual(self.staff, self.departments, self.shifts, self.days)
-        
-        import copy
-        new_individual.schedule = copy.deepcopy(self.schedule)
-        new_individual.fitness_score = self.fitness_score
-        new_individual.hard_violations = self.hard_violations
-        new_individual.soft_violations = self.soft_violations
-        new_individual.is_valid = self.is_valid
-        new_individual.stats = copy.deepcopy(self.stats)
-        
+        """Tạo bản sao của cá thể (bộ nhớ riêng, không thuộc arena)"""
+        new_individual = Individual(self.staff, self.departments, self.shifts, self.days,
+                                    layout=self.layout)
+        self.copy_into(new_individual)
         return new_individual
     
+    def copy_into(self, target: "Individual"):
+        """Sao chép genome và metadata sang cá thể khác có sẵn bộ nhớ"""
+        for name, array in self._storage.items():
+            np.copyto(target._storage[name], array)
+        
+        target._schedule_cache = None
+        target.fitness_score = self.fitness_score
+        target.hard_violations = self.hard_violations
+        target.soft_violations = self.soft_violations
+        target.is_valid = self.is_valid
+        target.objectives = self.objectives
+        target.changed_cells = list(self.changed_cells)
+        target.worked_before = dict(self.worked_before)
+        target.components_valid = self.components_valid
+        target.runs_valid = self.runs_valid
+        target.fitness_valid = self.fitness_valid
+        # stats không bị sửa tại chỗ nên có thể dùng chung
+        target._stats = self._stats
+    
     def __repr__(self):
         return (f"Individual(fitness={self.fitness_score:.2f}, "
                 f"violations={self.hard_violations})")
\ No newline at end of file
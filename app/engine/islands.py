@@ -0,0 +1,254 @@
+"""
+Mô hình đảo (Island Model)
+K quần thể tiến hóa độc lập trên K tiến trình, cứ migration_interval thế hệ
+lại gửi migration_size cá thể tốt nhất sang đảo khác (vòng hoặc ngẫu nhiên)
+"""
+import multiprocessing
+import random
+import threading
+import time
+import traceback
+from typing import List, Dict
+import numpy as np
+from app.config import PROCESS_START_METHOD
+from app.schemas.schedule import ScheduleRequest
+from app.engine.genome import GenomeLayout
+from app.engine.individual import Individual
+from app.engine.fitness import FitnessEvaluator
+from app.engine.ga_scheduler import BaseScheduler, GeneticScheduler
+
+# Lệnh dừng gửi xuống đảo bất kỳ lúc nào (kể cả giữa chặng), đảo kiểm tra mỗi thế hệ
+STOP = "stop"
+
+
+def _report(scheduler: GeneticScheduler, history: List[float], migration_size: int) -> Dict:
+    """Kết quả 1 chặng gửi về tiến trình điều phối"""
+    return {
+        "history": history,
+        "best_genome": scheduler.best_individual.genome.copy(),
+        "best_fitness": scheduler.best_individual.fitness_score,
+        "mean_fitness": scheduler.mean_fitness(),
+        "emigrants": scheduler.emigrants(migration_size),
+        "solved": scheduler.is_solved(),
+        # Số liệu profiler tích lũy của đảo (điều phối cộng lại)
+        "profile": (scheduler.profiler.totals, scheduler.profiler.counts),
+    }
+
+
+def _island_main(conn, config: ScheduleRequest, migration_size: int):
+    """Vòng lặp của 1 đảo trong tiến trình con"""
+    try:
+        scheduler = GeneticScheduler(config, verbose=False)
+        scheduler.start()
+        conn.send(_report(scheduler, list(scheduler.fitness_history), migration_size))
+
+        stopped = False
+        while True:
+            command = conn.recv()
+            if command is None:
+                break
+            if command == STOP:
+                stopped = True
+                continue
+
+            generations, immigrants, deadline = command
+            scheduler.immigrate(immigrants)
+
+            history = []
+            for _ in range(generations):
+                # Lệnh dừng có thể tới giữa chặng: kiểm tra mỗi thế hệ, không đợi hết migration_interval
+                while conn.poll():
+                    if conn.recv() is None:
+                        return
+                    stopped = True
+                if stopped or (deadline is not None and time.time() >= deadline):
+                    break
+                scheduler.step()
+                history.append(scheduler.best_individual.fitness_score)
+                if scheduler.is_solved():
+                    break
+
+            conn.send(_report(scheduler, history, migration_size))
+    except Exception:
+        conn.send({"error": traceback.format_exc()})
+    finally:
+        conn.close()
+
+
+class IslandScheduler(BaseScheduler):
+    """Điều phối các đảo; cùng giao diện evolve()/fitness_history với GeneticScheduler"""
+
+    def __init__(self, config: ScheduleRequest, verbose: bool = True):
+        super().__init__(config)
+        self.verbose = verbose
+        self.random = random.Random(config.seed)
+        self.layout = GenomeLayout(config.staff, config.departments, config.shifts, config.days)
+        self.fitness_evaluator = FitnessEvaluator(
+            weights=config.weights,
+            min_hours_per_month=config.min_hours_per_month,
+            max_consecutive_shifts=config.max_consecutive_shifts
+        )
+        self.best_genome: np.ndarray = None
+        self.best_fitness = float("-inf")
+        self.island_means: List[float] = []
+        # Kết nối tới các đảo đang chạy (request_stop gửi STOP từ thread khác → khóa khi gửi)
+        self._connections = []
+        self._send_lock = threading.Lock()
+
+    def send(self, conn, message):
+        with self._send_lock:
+            conn.send(message)
+
+    def request_stop(self):
+        """Dừng ngay trong chặng đang chạy: mỗi đảo dừng ở cuối thế hệ hiện tại rồi gửi kết quả"""
+        super().request_stop()
+        for conn in list(self._connections):
+            try:
+                self.send(conn, STOP)
+            except (BrokenPipeError, OSError):
+                pass
+
+    def island_config(self, island_id: int) -> ScheduleRequest:
+        """Cấu hình cho 1 đảo: seed riêng, chạy tuần tự trong tiến trình của nó"""
+        update = {
+            "seed": None if self.config.seed is None else self.config.seed + island_id,
+            "islands": 1,
+            "parallelism": 1,
+        }
+        if hasattr(self.config, 'model_copy'):
+            return self.config.model_copy(update=update)
+        return self.config.copy(update=update)
+
+    def route(self, emigrants: List[List[np.ndarray]]) -> List[List[np.ndarray]]:
+        """Phân cá thể di cư theo topology: vòng (i → i+1) hoặc ngẫu nhiên"""
+        num_islands = len(emigrants)
+        immigrants = [[] for _ in range(num_islands)]
+
+        for source, genomes in enumerate(emigrants):
+            if self.config.migration_topology == "random":
+                target = self.random.choice([i for i in range(num_islands) if i != source])
+            else:
+                target = (source + 1) % num_islands
+            immigrants[target].extend(genomes)
+
+        return immigrants
+
+    def merge(self, reports: List[Dict]) -> bool:
+        """Gộp lịch sử và cá thể tốt nhất của các đảo; trả về True nếu đã đạt lịch tối ưu"""
+        for report in reports:
+            if "error" in report:
+                raise RuntimeError(f"Lỗi trong tiến trình đảo:\n{report['error']}")
+
+        # Các đảo có thể dừng sớm khác nhau → giữ giá trị cuối cho đảo đã dừng
+        length = max(len(report["history"]) for report in reports)
+        for step in range(length):
+            best = max(
+                report["history"][min(step, len(report["history"]) - 1)]
+                for report in reports if report["history"]
+            )
+            previous = self.fitness_history[-1] if self.fitness_history else float("-inf")
+            self.fitness_history.append(max(previous, best))
+
+        self.island_means = [report["mean_fitness"] for report in reports]
+        self.profiler.combine([report["profile"][0] for report in reports],
+                              [report["profile"][1] for report in reports])
+        for report in reports:
+            if report["best_fitness"] > self.best_fitness:
+                self.best_fitness = report["best_fitness"]
+                self.best_genome = report["best_genome"]
+
+        return any(report["solved"] for report in reports)
+
+    def mean_fitness(self) -> float:
+        """Trung bình fitness trung bình của các đảo"""
+        return sum(self.island_means) / len(self.island_means)
+
+    def update_best(self):
+        """Dựng lại cá thể tốt nhất trong tiến trình chính để có thống kê đầy đủ"""
+        if self.best_individual is not None and self.best_individual.fitness_score >= self.best_fitness:
+            return
+
+        self.best_individual = Individual(
+            self.config.staff, self.config.departments, self.config.shifts, self.config.days,
+            layout=self.layout
+        )
+        self.best_individual.genome[...] = self.best_genome
+        self.best_individual.rebuild_counters()
+        self.fitness_evaluator.evaluate_population([self.best_individual])
+
+    def evolve(self) -> Individual:
+        """
+        Chạy mô hình đảo
+        Returns: Cá thể tốt nhất trên mọi đảo
+        """
+        start_time = time.time()
+        self.start_clock(start_time)
+        context = multiprocessing.get_context(PROCESS_START_METHOD)
+        connections = self._connections = []
+        processes = []
+
+        if self.verbose:
+            print(f"Khởi tạo {self.config.islands} đảo, mỗi đảo {self.config.population_size} cá thể...")
+
+        try:
+            for island_id in range(self.config.islands):
+                parent_conn, child_conn = context.Pipe()
+                process = context.Process(
+                    target=_island_main,
+                    args=(child_conn, self.island_config(island_id), self.config.migration_size),
+                    daemon=True
+                )
+                process.start()
+                child_conn.close()
+                connections.append(parent_conn)
+                processes.append(process)
+
+            reports = [conn.recv() for conn in connections]
+            solved = self.merge(reports)
+            if self.verbose:
+                print(f"Thế hệ 0: Best Fitness = {self.best_fitness:.2f}")
+            self.update_best()
+            self.notify(0, start_time)
+
+            generation = 0
+            self.stop_reason = "solved" if solved else "max_generations"
+            while generation < self.config.max_generations and not solved:
+                reason = self.check_stop()
+                if reason:
+                    self.stop_reason = reason
+                    break
+
+                generations = min(self.config.migration_interval,
+                                  self.config.max_generations - generation)
+                immigrants = self.route([report["emigrants"] for report in reports])
+
+                for conn, genomes in zip(connections, immigrants):
+                    self.send(conn, (generations, genomes, self.deadline))
+
+                reports = [conn.recv() for conn in connections]
+                generation += max(len(report["history"]) for report in reports)
+                solved = self.merge(reports)
+                if solved:
+                    self.stop_reason = "solved"
+
+                if self.verbose:
+                    print(f"Thế hệ {generation}: Best Fitness = {self.best_fitness:.2f} (di cư)")
+                self.update_best()
+                self.notify(generation, start_time)
+        finally:
+            self._connections = []
+            for conn in connections:
+                try:
+                    self.send(conn, None)
+                except (BrokenPipeError, OSError):
+                    pass
+            for process in processes:
+                process.join(timeout=5)
+                if process.is_alive():
+                    process.terminate()
+
+        computation_time = time.time() - start_time
+        if self.verbose:
+            print(f"\n✓ Hoàn thành trong {computation_time:.2f} giây")
+
+        return self.best_individual
@@ -0,0 +1,102 @@
+"""
+Tìm kiếm cục bộ (pha memetic)
+Leo đồi có giới hạn trên các cá thể tốt nhất, mỗi bước đánh giá bằng fitness tăng dần:
+- move: thay 1 người trong ô (ngày, ca, khoa) bằng người cùng khoa ít ca hơn
+- swap: đổi 2 người của cùng khoa, cùng ca giữa 2 ngày khác nhau
+"""
+import random
+import time
+from typing import List, Tuple
+from app.engine.genome import GenomeLayout, EMPTY_SLOT
+from app.engine.individual import Individual
+from app.engine.fitness import FitnessEvaluator
+
+# (ngày, ca, slot, nhân viên mới)
+Change = Tuple[int, int, int, int]
+
+
+class LocalSearch:
+    """Leo đồi first-improvement: chỉ giữ bước làm fitness tăng, bước khác được hoàn tác"""
+
+    # Số ứng viên bốc ngẫu nhiên cho move, chọn người ít ca nhất (nghiêng về cân bằng tải)
+    move_sample = 3
+
+    def __init__(self, layout: GenomeLayout, evaluator: FitnessEvaluator, rng: random.Random = None):
+        self.layout = layout
+        self.evaluator = evaluator
+        self.random = rng or random.Random()
+
+    def propose_move(self, individual: Individual) -> List[Change]:
+        """Thay 1 slot ngẫu nhiên bằng người cùng khoa chưa có trong ô, ưu tiên người ít ca nhất trong mẫu"""
+        day_idx = self.random.randrange(individual.days)
+        shift_idx = self.random.randrange(len(individual.shifts))
+        slot = self.random.randrange(self.layout.num_slots)
+        slots = self.layout.department_slots[int(self.layout.slot_department[slot])]
+
+        current = individual.genome[day_idx, shift_idx, slots].tolist()
+        eligible = [s for s in self.layout.eligible[int(self.layout.slot_department[slot])].tolist()
+                    if s not in current]
+        if not eligible:
+            return []
+
+        sample = self.random.sample(eligible, min(self.move_sample, len(eligible)))
+        staff_idx = min(sample, key=lambda s: individual.shift_counts[s])
+        return [(day_idx, shift_idx, slot, staff_idx)]
+
+    def propose_swap(self, individual: Individual) -> List[Change]:
+        """Đổi người giữa 2 ngày ở cùng ca và cùng khoa (không tạo người trùng trong 1 ô)"""
+        if individual.days < 2:
+            return []
+
+        day1, day2 = self.random.sample(range(individual.days), 2)
+        shift_idx = self.random.randrange(len(individual.shifts))
+        slot1 = self.random.randrange(self.layout.num_slots)
+        slots = self.layout.department_slots[int(self.layout.slot_department[slot1])]
+        slot2 = self.random.randrange(slots.start, slots.stop)
+
+        staff1 = int(individual.genome[day1, shift_idx, slot1])
+        staff2 = int(individual.genome[day2, shift_idx, slot2])
+        if staff1 == staff2:
+            return []
+        # Không để 1 người xuất hiện 2 lần trong cùng ô
+        if (staff2 != EMPTY_SLOT and staff2 in individual.genome[day1, shift_idx, slots]) or \
+                (staff1 != EMPTY_SLOT and staff1 in individual.genome[day2, shift_idx, slots]):
+            return []
+
+        return [(day1, shift_idx, slot1, staff2), (day2, shift_idx, slot2, staff1)]
+
+    def improve(self, individual: Individual, max_steps: int, deadline: float) -> int:
+        """
+        Leo đồi trên cá thể đã được đánh giá (thành phần fitness hợp lệ)
+        Dừng sau max_steps bước thử hoặc khi quá deadline; trả về số bước được giữ
+        """
+        if self.layout.num_slots == 0:
+            return 0
+
+        accepted = 0
+        for _ in range(max_steps):
+            if time.time() >= deadline:
+                break
+
+            if self.random.random() < 0.5:
+                changes = self.propose_move(individual)
+            else:
+                changes = self.propose_swap(individual)
+            if not changes:
+                continue
+
+            before = individual.fitness_score
+            undo = [(d, sh, slot, int(individual.genome[d, sh, slot])) for d, sh, slot, _ in changes]
+            for change in changes:
+                individual.set_slot(*change)
+            self.evaluator.evaluate_population([individual])
+
+            if individual.fitness_score > before:
+                accepted += 1
+                continue
+
+            for change in reversed(undo):
+                individual.set_slot(*change)
+            self.evaluator.evaluate_population([individual])
+
+        return accepted
@@ -0,0 +1,191 @@
+"""
+Chế độ đa mục tiêu NSGA-II
+Tối ưu đồng thời 4 điểm mềm (SOFT_OBJECTIVES) thay vì tổng có trọng số:
+sắp xếp không trội nhanh + khoảng cách đám đông, chọn lọc (μ + λ) giữa cha mẹ và con.
+Ràng buộc cứng xử lý theo kiểu trội có ràng buộc (Deb): lịch hợp lệ trội lịch vi phạm,
+giữa các lịch vi phạm thì ít vi phạm hơn trội, cùng số vi phạm thì so Pareto như lịch hợp lệ.
+Kết thúc trả về tập Pareto gọn: đổi trọng số sau đó chỉ cần chọn lại trong tập, không chạy lại GA
+"""
+from typing import List, Tuple
+import numpy as np
+from app.schemas.schedule import ScheduleRequest
+from app.engine.individual import Individual
+from app.engine.ga_scheduler import GeneticScheduler
+
+
+def non_dominated_fronts(objectives: np.ndarray, violations: np.ndarray) -> List[np.ndarray]:
+    """
+    Chia các cá thể thành các front theo quan hệ trội có ràng buộc (mục tiêu càng cao càng tốt)
+    objectives (N, M), violations (N,) → danh sách chỉ số theo front, front 0 là không bị trội
+    """
+    n = len(objectives)
+    better_or_equal = (objectives[:, None, :] >= objectives[None, :, :]).all(axis=2)
+    better = (objectives[:, None, :] > objectives[None, :, :]).any(axis=2)
+    # dominates[a, b]: a trội b (ít vi phạm hơn, hoặc cùng số vi phạm và trội Pareto)
+    dominates = (violations[:, None] < violations[None, :]) \
+        | ((violations[:, None] == violations[None, :]) & better_or_equal & better)
+
+    dominated_by = dominates.sum(axis=0)
+    fronts = []
+    current = np.flatnonzero(dominated_by == 0)
+    while current.size:
+        fronts.append(current)
+        # Đã xếp front thì đánh dấu âm để không bị chọn lại
+        dominated_by[current] = -n - 1
+        dominated_by -= dominates[current].sum(axis=0)
+        current = np.flatnonzero(dominated_by == 0)
+    return fronts
+
+
+def crowding_distance(objectives: np.ndarray) -> np.ndarray:
+    """Khoảng cách đám đông trong 1 front (N, M) → (N,); 2 đầu mút mỗi mục tiêu = vô cùng"""
+    n, num_objectives = objectives.shape
+    if n <= 2:
+        return np.full(n, np.inf)
+
+    distance = np.zeros(n)
+    for k in range(num_objectives):
+        order = np.argsort(objectives[:, k], kind="stable")
+        values = objectives[order, k]
+        distance[order[0]] = distance[order[-1]] = np.inf
+        span = values[-1] - values[0]
+        if span > 0:
+            distance[order[1:-1]] += (values[2:] - values[:-2]) / span
+    return distance
+
+
+def rank_individuals(individuals: List[Individual]) -> Tuple[np.ndarray, np.ndarray]:
+    """Hạng front và khoảng cách đám đông của từng cá thể"""
+    objectives = np.stack([individual.objectives for individual in individuals])
+    violations = np.array([individual.hard_violations for individual in individuals])
+    rank = np.zeros(len(individuals), dtype=np.int64)
+    crowding = np.zeros(len(individuals))
+    for level, front in enumerate(non_dominated_fronts(objectives, violations)):
+        rank[front] = level
+        crowding[front] = crowding_distance(objectives[front])
+    return rank, crowding
+
+
+class NSGAScheduler(GeneticScheduler):
+    """NSGA-II trên cùng genome, toán tử lai ghép / đột biến / sửa lỗi với GeneticScheduler"""
+
+    def __init__(self, config: ScheduleRequest, verbose: bool = True):
+        super().__init__(config, verbose)
+        # Hạng front và khoảng cách đám đông, cùng thứ tự với self.population
+        self.rank = np.zeros(0, dtype=np.int64)
+        self.crowding = np.zeros(0)
+
+    def evaluate_population(self):
+        """Đánh giá, xếp hạng front và sắp xếp quần thể (front tốt trước, thưa trước)"""
+        self.fitness_evaluator.evaluate_population(self.population)
+        rank, crowding = rank_individuals(self.population)
+        order = np.lexsort((-crowding, rank))
+        self.population = [self.population[i] for i in order]
+        self.rank, self.crowding = rank[order], crowding[order]
+        self.update_best(self.population)
+
+    def update_best(self, individuals: List[Individual]):
+        """Lịch tốt nhất theo weights của request (dùng cho schedule chính của response)"""
+        best = max(individuals, key=lambda x: x.fitness_score)
+        if not self.best_individual or best.fitness_score > self.best_individual.fitness_score:
+            self.best_individual = best.copy()
+            self.profiler.count("copies")
+
+    def tournament(self) -> Individual:
+        """Binary tournament: hạng thấp hơn thắng, cùng hạng thì thưa hơn thắng"""
+        a = self.random.randrange(len(self.population))
+        b = self.random.randrange(len(self.population))
+        if (self.rank[a], -self.crowding[a]) <= (self.rank[b], -self.crowding[b]):
+            return self.population[a]
+        return self.population[b]
+
+    def step(self):
+        """1 thế hệ NSGA-II: tạo N con, chọn N cá thể sống sót trong 2N cha mẹ + con"""
+        profiler = self.profiler
+        t = profiler.now()
+        size = self.config.population_size
+
+        # Tạo con vào bộ đệm back của arena
+        slots = self.arena.back
+        offspring = []
+        while len(offspring) < size:
+            parent1, parent2 = self.tournament(), self.tournament()
+            t = profiler.lap("selection", t)
+
+            target2 = slots[len(offspring) + 1] if len(offspring) + 1 < size else self._spare
+            child1, child2 = self.crossover(parent1, parent2, slots[len(offspring)], target2)
+            t = profiler.lap("crossover", t)
+
+            self.mutate(child1)
+            self.mutate(child2)
+            t = profiler.lap("mutation", t)
+
+            offspring.append(child1)
+            if len(offspring) < size:
+                offspring.append(child2)
+
+        self.repair(offspring)
+        t = profiler.lap("repair", t)
+
+        self.fitness_evaluator.evaluate_population(offspring)
+        t = profiler.lap("evaluation", t)
+
+        # Chọn sống sót: lấp đầy theo front, front cuối cắt theo khoảng cách đám đông
+        combined = self.population + offspring
+        rank, crowding = rank_individuals(combined)
+        order = np.lexsort((-crowding, rank))
+        survivors = order[:size].tolist()
+        t = profiler.lap("selection", t)
+
+        # Con sống sót được chép vào chỗ của cha mẹ bị loại (quần thể vẫn nằm trong bộ đệm front)
+        kept = {i for i in survivors if i < size}
+        free = iter([i for i in range(size) if i not in kept])
+        location = {}
+        for i in survivors:
+            if i < size:
+                location[i] = i
+            else:
+                location[i] = next(free)
+                combined[i].copy_into(self.population[location[i]])
+        profiler.count("copies", size - len(kept))
+
+        self.population = [self.population[location[i]] for i in survivors]
+        self.rank, self.crowding = rank[survivors], crowding[survivors]
+        self.update_best(self.population)
+        profiler.lap("copy", t)
+
+        self.fitness_history.append(self.best_individual.fitness_score)
+        self.end_generation()
+
+    def is_solved(self) -> bool:
+        """Không dừng theo target_fitness: cần cả front, không chỉ 1 lịch theo weights"""
+        return False
+
+    def pareto_front(self) -> List[Individual]:
+        """
+        Tập Pareto gọn của quần thể cuối: front 0 (chỉ lịch hợp lệ nếu có), bỏ trùng điểm,
+        giữ tối đa pareto_max_solutions lịch có khoảng cách đám đông lớn nhất (luôn giữ các đầu mút)
+        """
+        front = [i for i in range(len(self.population)) if self.rank[i] == 0]
+        unique = {}
+        for i in front:
+            key = tuple(np.round(self.population[i].objectives, 9).tolist())
+            unique.setdefault(key, i)
+        members = list(unique.values())
+
+        limit = max(1, self.config.pareto_max_solutions)
+        if len(members) > limit:
+            objectives = np.stack([self.population[i].objectives for i in members])
+            crowding = crowding_distance(objectives)
+            members = [members[i] for i in np.argsort(-crowding, kind="stable")[:limit]]
+
+        solutions = [self.population[i].copy() for i in members]
+        solutions.sort(key=lambda x: x.fitness_score, reverse=True)
+        return solutions
+
+    def evolve(self) -> Individual:
+        best = super().evolve()
+        self.pareto = self.pareto_front()
+        if self.verbose:
+            print(f"Tập Pareto: {len(self.pareto)} lịch")
+        return best
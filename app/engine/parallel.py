@@ -0,0 +1,79 @@
+"""
+Đánh giá fitness song song bằng pool tiến trình
+Dữ liệu bài toán (nhân viên, khoa, ca, chỉ tiêu giờ, lịch sử HC2) chỉ gửi 1 lần khi khởi tạo worker;
+mỗi lần đánh giá chỉ gửi genome và bộ đếm dạng mảng numpy
+"""
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict
+import numpy as np
+from app.config import PROCESS_START_METHOD
+from app.schemas.schedule import ScheduleRequest
+from app.engine.genome import GenomeLayout
+from app.engine.fitness import FitnessEvaluator
+
+# Ngữ cảnh bài toán trong mỗi worker (layout, evaluator)
+_worker_context = None
+
+
+def _init_worker(staff, departments, shifts, days, weights, min_hours_per_month, max_consecutive_shifts,
+                 history):
+    """Chạy 1 lần trong mỗi worker: dựng layout và evaluator dùng cho mọi lô"""
+    global _worker_context
+    evaluator = FitnessEvaluator(weights=weights,
+                                 min_hours_per_month=min_hours_per_month,
+                                 max_consecutive_shifts=max_consecutive_shifts)
+    evaluator.history = history
+    _worker_context = (GenomeLayout(staff, departments, shifts, days), evaluator)
+
+
+def _compute_chunk(genomes: np.ndarray, day_load: np.ndarray) -> Dict[str, np.ndarray]:
+    """Tính thành phần fitness cho 1 lô genome trong worker"""
+    layout, evaluator = _worker_context
+    return evaluator.compute_components(layout, genomes, day_load)
+
+
+class ParallelEvaluator:
+    """Pool tiến trình sống suốt 1 lần chạy GA"""
+
+    def __init__(self, config: ScheduleRequest, workers: int, evaluator: FitnessEvaluator = None):
+        # evaluator: evaluator của scheduler → worker chấm cùng chỉ tiêu giờ (số hoặc mảng theo nhân viên)
+        # và cùng lịch sử HC2 (rolling horizon); None = lấy từ config
+        if evaluator is None:
+            evaluator = FitnessEvaluator(weights=config.weights,
+                                         min_hours_per_month=config.min_hours_per_month,
+                                         max_consecutive_shifts=config.max_consecutive_shifts)
+        self.workers = workers
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context(PROCESS_START_METHOD),
+            initializer=_init_worker,
+            initargs=(config.staff, config.departments, config.shifts, config.days,
+                      evaluator.weights, evaluator.min_hours_per_month, evaluator.max_consecutive_shifts,
+                      evaluator.history)
+        )
+
+    def compute_components(self, genomes: np.ndarray, day_load: np.ndarray) -> Dict[str, np.ndarray]:
+        """Chia lô theo số worker, tính song song rồi ghép lại theo thứ tự ban đầu"""
+        chunks = min(self.workers, len(genomes))
+        bounds = np.linspace(0, len(genomes), chunks + 1).astype(int)
+
+        futures = [
+            self.executor.submit(_compute_chunk, genomes[lo:hi], day_load[lo:hi])
+            for lo, hi in zip(bounds[:-1], bounds[1:])
+        ]
+        results = [future.result() for future in futures]
+
+        return {
+            name: np.concatenate([result[name] for result in results])
+            for name in results[0]
+        }
+
+    def close(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,59 @@
+"""
+Vùng nhớ quần thể (Population Arena)
+Cấp phát sẵn 2 bộ đệm cho cả quần thể: thế hệ hiện tại (front)
+và thế hệ đang tạo (back), đổi vai trò sau mỗi thế hệ
+"""
+from typing import List
+import numpy as np
+from app.engine.genome import GenomeLayout, EMPTY_SLOT
+from app.engine.individual import Individual
+
+
+class PopulationArena:
+    """Quần thể lưu trong 1 mảng liên tục, double-buffered"""
+
+    def __init__(self, layout: GenomeLayout, size: int):
+        self.layout = layout
+        self.size = size
+
+        # Mỗi trường: mảng (2, size, *shape)
+        self._buffers = {
+            name: np.zeros((2, size) + shape, dtype=dtype)
+            for name, (shape, dtype) in layout.buffer_specs().items()
+        }
+        self._buffers["genome"].fill(EMPTY_SLOT)
+
+        # Cá thể là view cố định vào từng hàng, được tái sử dụng mỗi thế hệ
+        self._individuals: List[List[Individual]] = [
+            [
+                Individual(layout.staff, layout.departments, layout.shifts, layout.days,
+                           layout=layout,
+                           storage={name: buffer[side, i] for name, buffer in self._buffers.items()})
+                for i in range(size)
+            ]
+            for side in (0, 1)
+        ]
+        self._front = 0
+
+    @property
+    def front(self) -> List[Individual]:
+        """Thế hệ hiện tại"""
+        return self._individuals[self._front]
+
+    @property
+    def back(self) -> List[Individual]:
+        """Bộ đệm để ghi thế hệ kế tiếp"""
+        return self._individuals[1 - self._front]
+
+    def front_genomes(self) -> np.ndarray:
+        """Toàn bộ genome của thế hệ hiện tại: (size, ngày, ca, slot)"""
+        return self._buffers["genome"][self._front]
+
+    def swap(self):
+        """Đổi front/back sau khi đã ghi xong thế hệ mới"""
+        self._front = 1 - self._front
+
+    @property
+    def nbytes(self) -> int:
+        """Tổng bộ nhớ của cả 2 bộ đệm"""
+        return sum(buffer.nbytes for buffer in self._buffers.values())
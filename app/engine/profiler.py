@@ -0,0 +1,73 @@
+"""
+Đo thời gian theo pha của vòng lặp GA
+Mỗi pha cộng dồn thời gian (perf_counter) vào tổng và vào thế hệ hiện tại;
+khi tắt, now()/lap() trả về ngay nên chi phí chỉ là vài lời gọi hàm mỗi thế hệ
+"""
+import time
+from typing import Dict, List, Optional
+
+PHASES = ("initialization", "evaluation", "selection", "crossover", "mutation", "copy", "repair", "memetic")
+COUNTERS = ("evaluations", "copies")
+
+
+class PhaseProfiler:
+    """Thời gian tích lũy và theo từng thế hệ của các pha, cùng số lần đánh giá / sao chép"""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.totals: Dict[str, float] = dict.fromkeys(PHASES, 0.0)
+        self.counts: Dict[str, int] = dict.fromkeys(COUNTERS, 0)
+        # Thời gian các pha của từng thế hệ (thế hệ 0 = khởi tạo)
+        self.history: List[Dict[str, float]] = []
+        self._current: Dict[str, float] = {}
+
+    def now(self) -> float:
+        return time.perf_counter() if self.enabled else 0.0
+
+    def lap(self, phase: str, start: float) -> float:
+        """Cộng thời gian từ start vào phase; trả về thời điểm hiện tại làm mốc cho pha kế tiếp"""
+        if not self.enabled:
+            return 0.0
+        now = time.perf_counter()
+        elapsed = now - start
+        self.totals[phase] += elapsed
+        self._current[phase] = self._current.get(phase, 0.0) + elapsed
+        return now
+
+    def count(self, name: str, amount: int = 1):
+        if self.enabled:
+            self.counts[name] += amount
+
+    def end_generation(self):
+        """Chốt thời gian các pha của thế hệ vừa xong"""
+        if self.enabled:
+            self.history.append(self._current)
+            self._current = {}
+
+    def last_generation(self) -> Dict[str, float]:
+        return self.history[-1] if self.history else {}
+
+    def combine(self, totals: List[Dict[str, float]], counts: List[Dict[str, int]]):
+        """Thay số liệu bằng tổng của nhiều profiler khác (các đảo gửi số liệu tích lũy về)"""
+        if not self.enabled:
+            return
+        self.totals = {phase: sum(t.get(phase, 0.0) for t in totals) for phase in PHASES}
+        self.counts = {name: sum(c.get(name, 0) for c in counts) for name in COUNTERS}
+
+    def summary(self, generations: int) -> Optional[Dict]:
+        """Tóm tắt cho ScheduleResponse.profile (None khi tắt)"""
+        if not self.enabled:
+            return None
+        steps = max(1, generations)
+        return {
+            "generations": generations,
+            "phases": {
+                phase: {
+                    "total": round(total, 6),
+                    # Khởi tạo chỉ chạy 1 lần nên không chia theo thế hệ
+                    "per_generation": round(total if phase == "initialization" else total / steps, 6),
+                }
+                for phase, total in self.totals.items()
+            },
+            "counts": dict(self.counts),
+        }
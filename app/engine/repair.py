@@ -0,0 +1,220 @@
+"""
+Toán tử sửa chữa (Repair Operator)
+Sửa trực tiếp vi phạm cứng bằng hoán đổi có mục tiêu thay vì chờ đột biến ngẫu nhiên:
+- HC3: lấp slot trống bằng người cùng khoa đang rảnh
+- HC2: cắt chuỗi ngày làm quá dài bằng cách nhường ca cho đồng nghiệp
+- HC1: chuyển ca từ người nhiều giờ sang người thiếu giờ
+Mọi thay đổi đi qua Individual.set_slot nên bộ đếm và nhật ký đánh giá tăng dần vẫn đúng
+"""
+import random
+from typing import Dict, Optional
+import numpy as np
+from app.engine.genome import GenomeLayout, EMPTY_SLOT
+from app.engine.individual import Individual
+
+
+class RepairOperator:
+    """
+    Sửa vi phạm cứng của 1 cá thể, chỉ đọc bộ đếm day_load / shift_counts
+    Mặt nạ free (ngày, nhân viên) = có thể nhận thêm ca mà không tạo chuỗi quá dài,
+    tính 1 lần mỗi lần sửa và cập nhật theo cột khi gán
+    """
+
+    # Số lần thử gán tối đa cho mỗi loại vi phạm trong 1 lần sửa (giữ chi phí mỗi thế hệ có giới hạn)
+    max_moves = 200
+
+    def __init__(self, layout: GenomeLayout, min_hours, max_consecutive_days: int,
+                 rng: random.Random = None, history: np.ndarray = None):
+        self.layout = layout
+        # Số giờ tối thiểu theo từng nhân viên (min_hours là số hoặc mảng theo nhân viên)
+        self.min_hours = np.broadcast_to(np.asarray(min_hours), (len(layout.staff),))
+        self.max_consecutive_days = max_consecutive_days
+        self.random = rng or random.Random()
+        # Ngày làm ngay trước lịch (ngày, S), như FitnessEvaluator.history; lead = số ngày làm liên tiếp
+        # tính đến hết history của từng nhân viên (chuỗi nối tiếp vào ngày đầu lịch)
+        self.history = history
+        self.lead = np.zeros(len(layout.staff), dtype=np.int64)
+        if history is not None and len(history):
+            reverse = history[::-1]
+            self.lead = np.where(reverse.all(axis=0), len(history), reverse.argmin(axis=0))
+        self._starts = [s.start for s in layout.department_slots if s.stop > s.start]
+        self.free: np.ndarray = None
+
+    def count_violations(self, individual: Individual) -> Dict[str, int]:
+        """Số vi phạm theo loại (cùng cách đếm với FitnessEvaluator)"""
+        coverage = 0
+        if self._starts:
+            empty = individual.genome == EMPTY_SLOT
+            coverage = int(np.logical_or.reduceat(empty, self._starts, axis=-1).sum())
+
+        window = self.max_consecutive_days + 1
+        runs = 0
+        worked = individual.day_load > 0
+        if self.history is not None:
+            worked = np.concatenate([self.history, worked])
+        if window <= len(worked):
+            cumsum = np.zeros((len(worked) + 1, len(self.layout.staff)), dtype=np.int32)
+            np.cumsum(worked, axis=0, out=cumsum[1:])
+            runs = int(((cumsum[window:] - cumsum[:-window]) == window).any(axis=0).sum())
+
+        hours = individual.shift_counts * self.layout.staff_shift_hours
+        return {
+            "coverage": coverage,
+            "runs": runs,
+            "hours": int((hours < self.min_hours).sum()),
+        }
+
+    def repair(self, individual: Individual) -> Dict[str, int]:
+        """Sửa cá thể tại chỗ; trả về số vi phạm đã sửa theo loại"""
+        before = self.count_violations(individual)
+        if not any(before.values()):
+            return {name: 0 for name in before}
+
+        self.free = self.free_mask(individual.day_load > 0)
+        if before["coverage"]:
+            self.fill_empty_slots(individual)
+        if before["runs"]:
+            self.break_long_runs(individual)
+        if before["hours"]:
+            self.move_hours(individual)
+        self.free = None
+
+        after = self.count_violations(individual)
+        return {name: max(0, before[name] - after[name]) for name in before}
+
+    def free_mask(self, worked: np.ndarray) -> np.ndarray:
+        """(ngày, N) ngày làm → (ngày, N) ngày có thể nhận thêm ca mà không tạo chuỗi quá dài"""
+        days = worked.shape[0]
+        left = np.zeros(worked.shape, dtype=np.int32)
+        right = np.zeros(worked.shape, dtype=np.int32)
+        left[0] = self.lead
+        for day_idx in range(1, days):
+            left[day_idx] = (left[day_idx - 1] + 1) * worked[day_idx - 1]
+        for day_idx in range(days - 2, -1, -1):
+            right[day_idx] = (right[day_idx + 1] + 1) * worked[day_idx + 1]
+
+        return ~worked & (left + right + 1 <= self.max_consecutive_days)
+
+    def free_days(self, worked: np.ndarray, lead: int = 0) -> np.ndarray:
+        """Như free_mask cho 1 nhân viên (vòng lặp Python trên list nhanh hơn numpy với mảng nhỏ)"""
+        worked = worked.tolist()
+        days = len(worked)
+        left = [0] * days
+        left[0] = lead
+        right = [0] * days
+        for day_idx in range(1, days):
+            left[day_idx] = left[day_idx - 1] + 1 if worked[day_idx - 1] else 0
+        for day_idx in range(days - 2, -1, -1):
+            right[day_idx] = right[day_idx + 1] + 1 if worked[day_idx + 1] else 0
+
+        return np.array([
+            not worked[day_idx] and left[day_idx] + right[day_idx] + 1 <= self.max_consecutive_days
+            for day_idx in range(days)
+        ])
+
+    def assign(self, individual: Individual, day_idx: int, shift_idx: int, slot: int, staff_idx: int):
+        """set_slot + cập nhật mặt nạ free của người cũ và người mới"""
+        old_staff = int(individual.genome[day_idx, shift_idx, slot])
+        individual.set_slot(day_idx, shift_idx, slot, staff_idx)
+        for s in (old_staff, staff_idx):
+            if s != EMPTY_SLOT:
+                self.free[:, s] = self.free_days(individual.day_load[:, s] > 0, int(self.lead[s]))
+
+    def pick(self, individual: Individual, dept_idx: int, day_idx: int) -> Optional[int]:
+        """Người cùng khoa nhận thêm được ca ngày day_idx, ít giờ nhất (ngẫu nhiên nếu bằng nhau)"""
+        candidates = self.layout.eligible[dept_idx]
+        candidates = candidates[self.free[day_idx, candidates]]
+        if len(candidates) == 0:
+            return None
+
+        hours = individual.shift_counts[candidates] * self.layout.staff_shift_hours[candidates]
+        best = np.flatnonzero(hours == hours.min())
+        return int(candidates[best[self.random.randrange(len(best))]])
+
+    def fill_empty_slots(self, individual: Individual):
+        """HC3: lấp slot trống"""
+        empty = np.argwhere(individual.genome == EMPTY_SLOT)
+        for day_idx, shift_idx, slot in empty[:self.max_moves].tolist():
+            staff_idx = self.pick(individual, int(self.layout.slot_department[slot]), day_idx)
+            if staff_idx is not None:
+                self.assign(individual, day_idx, shift_idx, slot, staff_idx)
+
+    def break_long_runs(self, individual: Individual):
+        """HC2: ngày làm thứ max_consecutive_days + 1 liên tiếp → nhường mọi ca ngày đó cho người khác"""
+        attempts = 0
+        # Khoa còn người rảnh theo ngày; False → bỏ qua không thử (cập nhật khi tìm người thất bại)
+        has_free = np.stack([self.free[:, members].any(axis=1) for members in self.layout.eligible]
+                            + [np.zeros(individual.days, dtype=bool)], axis=1)
+        worked = individual.day_load > 0
+        long_staff = np.flatnonzero(worked.sum(axis=0) + self.lead > self.max_consecutive_days)
+
+        for staff_idx in long_staff.tolist():
+            staff_dept = int(self.layout.staff_department[staff_idx])
+            run = int(self.lead[staff_idx])
+            for day_idx, load in enumerate(individual.day_load[:, staff_idx].tolist()):
+                if load == 0:
+                    run = 0
+                    continue
+
+                run += 1
+                if run <= self.max_consecutive_days:
+                    continue
+                if attempts >= self.max_moves:
+                    return
+                if not has_free[day_idx, staff_dept]:
+                    continue
+
+                # Nhường lần lượt các ca trong ngày; chuỗi chỉ bị cắt khi nhường được hết
+                for shift_idx, slot in np.argwhere(individual.genome[day_idx] == staff_idx).tolist():
+                    attempts += 1
+                    dept_idx = int(self.layout.slot_department[slot])
+                    replacement = self.pick(individual, dept_idx, day_idx)
+                    if replacement is None:
+                        has_free[day_idx, dept_idx] = False
+                        break
+                    self.assign(individual, day_idx, shift_idx, slot, replacement)
+
+                if individual.day_load[day_idx, staff_idx] == 0:
+                    run = 0
+
+    def move_hours(self, individual: Individual):
+        """HC1: chuyển ca của người dư giờ nhất (vẫn đủ giờ sau khi chuyển) sang người thiếu giờ trong cùng khoa"""
+        layout = self.layout
+        shift_hours = layout.staff_shift_hours
+        moves = 0
+
+        for members, slots in zip(layout.eligible, layout.department_slots):
+            if slots.stop == slots.start or len(members) == 0:
+                continue
+
+            hours = individual.shift_counts[members] * shift_hours[members]
+            short = hours < self.min_hours[members]
+            under = members[short][np.argsort(hours[short], kind="stable")]
+
+            for staff_idx in under.tolist():
+                while individual.shift_counts[staff_idx] * shift_hours[staff_idx] < self.min_hours[staff_idx]:
+                    if moves >= self.max_moves:
+                        return
+
+                    free_days = np.flatnonzero(self.free[:, staff_idx])
+                    if len(free_days) == 0:
+                        break
+
+                    # Giờ còn lại của người đang giữ slot nếu nhường đi 1 ca (-1 = không được lấy)
+                    block = individual.genome[free_days, :, slots].astype(np.int64)
+                    occupied = block != EMPTY_SLOT
+                    donor = np.where(occupied, block, 0)
+                    remaining = (individual.shift_counts[donor] - 1) * shift_hours[donor]
+                    remaining = np.where(occupied & (remaining >= self.min_hours[donor]), remaining, -1)
+                    if remaining.max() < 0:
+                        break
+
+                    day_pos, shift_idx, offset = np.unravel_index(int(remaining.argmax()), remaining.shape)
+                    self.assign(individual, int(free_days[day_pos]), int(shift_idx),
+                                slots.start + int(offset), staff_idx)
+                    moves += 1
+
+                # Khoa không còn ai dư giờ để nhường → các người thiếu giờ còn lại cũng không sửa được
+                spare = (individual.shift_counts[members] - 1) * shift_hours[members] >= self.min_hours[members]
+                if not spare.any():
+                    break
@@ -0,0 +1,244 @@
+"""
+Xếp lại cục bộ khi có thay đổi đột xuất (ốm, nghỉ phép)
+Giữ nguyên mọi slot ngoài cửa sổ quanh các ngày bị ảnh hưởng; trong cửa sổ:
+1. Bỏ nhân viên vắng khỏi các slot của họ
+2. Lấp từng slot trống bằng người thay thế tốt nhất (tham lam)
+3. Leo đồi trong cửa sổ với mục tiêu fitness - change_penalty × số slot khác lịch cũ
+Fitness luôn chấm trên cả lịch nên HC1 (tổng giờ) và HC2 (chuỗi ngày cắt qua mép cửa sổ) vẫn được kiểm tra
+"""
+import random
+import time
+from typing import List, Tuple
+import numpy as np
+from app.schemas.schedule import RescheduleRequest, RescheduleResponse, ScheduleChange
+from app.engine.genome import GenomeLayout, EMPTY_SLOT
+from app.engine.individual import Individual
+from app.engine.fitness import FitnessEvaluator
+from app.engine.ga_scheduler import build_response
+
+# (ngày, ca, slot, nhân viên mới)
+Change = Tuple[int, int, int, int]
+
+
+class Rescheduler:
+    """Tìm kiếm cục bộ chỉ trong cửa sổ bị ảnh hưởng, ít thay đổi nhất có thể"""
+
+    # Số ứng viên tối đa thử cho mỗi slot trống khi lấp tham lam
+    fill_candidates = 32
+    # Số bước thử liên tiếp không cải thiện thì dừng
+    patience = 500
+
+    def __init__(self, config: RescheduleRequest):
+        self.config = config
+        self.random = random.Random(config.seed)
+        self.layout = GenomeLayout(config.staff, config.departments, config.shifts, config.days)
+        self.evaluator = FitnessEvaluator(
+            weights=config.weights,
+            min_hours_per_month=config.min_hours_per_month,
+            max_consecutive_shifts=config.max_consecutive_shifts
+        )
+        days = [day.model_dump() if hasattr(day, 'model_dump') else day.dict() for day in config.schedule]
+        self.original = self.layout.encode(days)
+
+        # Ô (ngày, ca, nhân viên) không được xếp và các ngày được phép thay đổi
+        shape = (config.days, len(config.shifts), len(config.staff))
+        self.unavailable = np.zeros(shape, dtype=bool)
+        self.in_window = np.zeros(config.days, dtype=bool)
+        margin = max(0, config.window_margin)
+        for disruption in config.disruptions:
+            staff_idx = self.layout.staff_index.get(disruption.staff_id)
+            if staff_idx is None:
+                raise ValueError(f"Không tìm thấy nhân viên {disruption.staff_id}")
+            unknown = [name for name in disruption.shifts if name not in self.layout.shift_names]
+            if unknown:
+                raise ValueError(f"Ca không hợp lệ: {', '.join(unknown)}")
+            shifts = [self.layout.shift_names.index(name) for name in disruption.shifts] \
+                or list(range(len(config.shifts)))
+            for day_idx in disruption.days:
+                if not 0 <= day_idx < config.days:
+                    raise ValueError(f"Ngày {day_idx} nằm ngoài lịch ({config.days} ngày)")
+                self.unavailable[day_idx, shifts, staff_idx] = True
+                self.in_window[max(0, day_idx - margin):day_idx + margin + 1] = True
+        self.window = np.flatnonzero(self.in_window).tolist()
+
+        self.individual = Individual(config.staff, config.departments, config.shifts, config.days,
+                                     layout=self.layout)
+        self.individual.genome[...] = self.original
+        self.individual.rebuild_counters()
+        # Số slot khác lịch cũ (chỉ có thể nằm trong cửa sổ)
+        self.changes = 0
+        self.steps = 0
+        self.stop_reason: str = None
+
+    def objective(self) -> float:
+        return self.individual.fitness_score - self.config.change_penalty * self.changes
+
+    def assign(self, day_idx: int, shift_idx: int, slot: int, staff_idx: int):
+        """Gán slot và cập nhật số thay đổi so với lịch cũ"""
+        original = int(self.original[day_idx, shift_idx, slot])
+        self.changes -= int(self.individual.genome[day_idx, shift_idx, slot]) != original
+        self.individual.set_slot(day_idx, shift_idx, slot, staff_idx)
+        self.changes += staff_idx != original
+
+    def evaluate(self) -> float:
+        self.evaluator.evaluate_population([self.individual])
+        return self.objective()
+
+    def candidates(self, day_idx: int, shift_idx: int, slot: int) -> List[int]:
+        """Nhân viên cùng khoa, có thể làm ca này và chưa có trong ô"""
+        slots = self.layout.department_slots[int(self.layout.slot_department[slot])]
+        current = self.individual.genome[day_idx, shift_idx, slots].tolist()
+        blocked = self.unavailable[day_idx, shift_idx]
+        return [s for s in self.layout.eligible[int(self.layout.slot_department[slot])].tolist()
+                if s not in current and not blocked[s]]
+
+    def try_changes(self, changes: List[Change], best: float) -> float:
+        """Áp dụng changes; giữ nếu mục tiêu tăng, ngược lại hoàn tác. Trả về mục tiêu hiện tại"""
+        undo = [(d, sh, slot, int(self.individual.genome[d, sh, slot])) for d, sh, slot, _ in changes]
+        for change in changes:
+            self.assign(*change)
+        value = self.evaluate()
+        if value > best:
+            return value
+
+        for change in reversed(undo):
+            self.assign(*change)
+        self.evaluate()
+        return best
+
+    def vacate(self) -> List[Tuple[int, int, int]]:
+        """Bỏ nhân viên vắng khỏi slot của họ; trả về các slot vừa trống"""
+        vacated = []
+        genome = self.individual.genome
+        for day_idx in self.window:
+            for shift_idx in range(len(self.config.shifts)):
+                for slot, staff_idx in enumerate(genome[day_idx, shift_idx].tolist()):
+                    if staff_idx != EMPTY_SLOT and self.unavailable[day_idx, shift_idx, staff_idx]:
+                        self.assign(day_idx, shift_idx, slot, EMPTY_SLOT)
+                        vacated.append((day_idx, shift_idx, slot))
+        return vacated
+
+    def fill(self, vacated: List[Tuple[int, int, int]], best: float) -> float:
+        """Lấp mỗi slot trống bằng ứng viên cho mục tiêu cao nhất (để trống nếu không ai tốt hơn)"""
+        for day_idx, shift_idx, slot in vacated:
+            candidates = self.candidates(day_idx, shift_idx, slot)
+            if len(candidates) > self.fill_candidates:
+                candidates = self.random.sample(candidates, self.fill_candidates)
+
+            choice, choice_value = None, best
+            for staff_idx in candidates:
+                self.assign(day_idx, shift_idx, slot, staff_idx)
+                value = self.evaluate()
+                if value > choice_value:
+                    choice, choice_value = staff_idx, value
+                self.assign(day_idx, shift_idx, slot, EMPTY_SLOT)
+            if choice is None:
+                self.evaluate()
+                continue
+            self.assign(day_idx, shift_idx, slot, choice)
+            best = self.evaluate()
+        return best
+
+    def propose(self) -> List[Change]:
+        """Bước ngẫu nhiên trong cửa sổ: hoàn tác 1 thay đổi, thay 1 người, hoặc đổi 2 người giữa 2 ngày"""
+        day_idx = self.random.choice(self.window)
+        shift_idx = self.random.randrange(len(self.config.shifts))
+        slot = self.random.randrange(self.layout.num_slots)
+        genome = self.individual.genome
+        roll = self.random.random()
+
+        if roll < 0.2:
+            original = int(self.original[day_idx, shift_idx, slot])
+            if original == int(genome[day_idx, shift_idx, slot]) or (
+                    original != EMPTY_SLOT and original not in self.candidates(day_idx, shift_idx, slot)):
+                return []
+            return [(day_idx, shift_idx, slot, original)]
+
+        if roll < 0.6 or len(self.window) < 2:
+            candidates = self.candidates(day_idx, shift_idx, slot)
+            return [(day_idx, shift_idx, slot, self.random.choice(candidates))] if candidates else []
+
+        other_day = self.random.choice(self.window)
+        slots = self.layout.department_slots[int(self.layout.slot_department[slot])]
+        other_slot = self.random.randrange(slots.start, slots.stop)
+        staff1 = int(genome[day_idx, shift_idx, slot])
+        staff2 = int(genome[other_day, shift_idx, other_slot])
+        if other_day == day_idx or staff1 == staff2:
+            return []
+        # Không để 1 người xuất hiện 2 lần trong cùng ô hoặc làm ca đã báo vắng
+        if staff2 != EMPTY_SLOT and (staff2 in genome[day_idx, shift_idx, slots]
+                                     or self.unavailable[day_idx, shift_idx, staff2]):
+            return []
+        if staff1 != EMPTY_SLOT and (staff1 in genome[other_day, shift_idx, slots]
+                                     or self.unavailable[other_day, shift_idx, staff1]):
+            return []
+        return [(day_idx, shift_idx, slot, staff2), (other_day, shift_idx, other_slot, staff1)]
+
+    def run(self) -> Individual:
+        """Xếp lại trong cửa sổ; trả về cá thể kết quả (đã đánh giá)"""
+        start_time = time.time()
+        limit = self.config.time_limit_seconds
+        deadline = None if limit is None else start_time + limit
+
+        if not self.window or self.layout.num_slots == 0:
+            self.evaluate()
+            self.stop_reason = "solved"
+            return self.individual
+
+        vacated = self.vacate()
+        best = self.fill(vacated, self.evaluate())
+
+        self.stop_reason = "max_generations"
+        idle = 0
+        for step in range(1, self.config.search_steps + 1):
+            self.steps = step
+            if deadline is not None and time.time() >= deadline:
+                self.stop_reason = "time_limit"
+                break
+            if idle >= self.patience:
+                self.stop_reason = "stagnation"
+                break
+
+            changes = self.propose()
+            if not changes:
+                idle += 1
+                continue
+            value = self.try_changes(changes, best)
+            idle = 0 if value > best else idle + 1
+            best = value
+
+        print(f"Xếp lại {len(self.window)} ngày: {self.changes} thay đổi, "
+              f"Fitness = {self.individual.fitness_score:.2f}, Violations = {self.individual.hard_violations} "
+              f"({time.time() - start_time:.3f} giây)")
+        return self.individual
+
+    def change_list(self) -> List[ScheduleChange]:
+        """Các slot khác lịch cũ"""
+        changes = []
+        genome = self.individual.genome
+        for day_idx, shift_idx, slot in np.argwhere(genome != self.original).tolist():
+            before, after = int(self.original[day_idx, shift_idx, slot]), int(genome[day_idx, shift_idx, slot])
+            changes.append(ScheduleChange(
+                day=day_idx,
+                date=self.layout.calendar[day_idx][0],
+                shift=self.layout.shift_names[shift_idx],
+                department=self.config.departments[int(self.layout.slot_department[slot])].name,
+                removed=None if before == EMPTY_SLOT else self.layout.staff_ids[before],
+                added=None if after == EMPTY_SLOT else self.layout.staff_ids[after],
+            ))
+        return changes
+
+
+def reschedule(payload: RescheduleRequest) -> RescheduleResponse:
+    """
+    Xếp lại lịch có sẵn quanh các thay đổi đột xuất
+    Raises: ValueError nếu disruption trỏ tới nhân viên / ca / ngày không có trong lịch
+    """
+    start_time = time.time()
+    rescheduler = Rescheduler(payload)
+    best = rescheduler.run()
+    response = build_response(best, generation=rescheduler.steps,
+                              computation_time=time.time() - start_time,
+                              stop_reason=rescheduler.stop_reason)
+    data = response.model_dump() if hasattr(response, 'model_dump') else response.dict()
+    return RescheduleResponse(**data, window=rescheduler.window, changes=rescheduler.change_list())
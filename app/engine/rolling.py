@@ -0,0 +1,244 @@
+"""
+Rolling horizon cho lịch dài (90-365 ngày)
+Giải lần lượt các khối rolling_block_days ngày, mỗi khối giải thêm rolling_overlap_days ngày gối đầu
+(phần gối đầu không được chốt, khối sau giải lại và khởi tạo ấm từ đó). Các khối đã chốt giữ cố định.
+Mỗi khối mang trạng thái biên từ phần đã chốt:
+- HC2: các ngày làm ngay trước khối (FitnessEvaluator.history) → chuỗi ngày liên tiếp nối qua biên vẫn bị tính
+- HC1 / giờ kỳ vọng: phần giờ còn thiếu của mỗi tháng (MONTH_DAYS ngày) chia đều cho số ngày còn lại của tháng
+Mỗi khối có kích thước cố định nên thời gian và bộ nhớ tăng tuyến tính theo số ngày
+"""
+import time
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from app.config import MONTH_DAYS
+from app.schemas.schedule import ScheduleRequest
+from app.engine.genome import GenomeLayout, EMPTY_SLOT
+from app.engine.individual import Individual
+from app.engine.fitness import FitnessEvaluator
+from app.engine.feasibility import horizon_min_hours
+from app.engine.repair import RepairOperator
+from app.engine.ga_scheduler import BaseScheduler, GeneticScheduler
+
+# (ngày đầu, ngày cuối được chốt, ngày cuối được giải) của 1 khối
+Block = Tuple[int, int, int]
+
+
+class BlockScheduler(GeneticScheduler):
+    """GA của 1 khối: chỉ tiêu giờ theo từng nhân viên và lịch sử ngày làm từ các khối đã chốt"""
+
+    def __init__(self, config: ScheduleRequest, history: np.ndarray, min_hours: np.ndarray,
+                 expected_hours: np.ndarray, seed_genome: np.ndarray = None):
+        # seed_genome: các ngày đầu khối đã giải ở khối trước (phần gối đầu)
+        super().__init__(config, verbose=False)
+        self.fitness_evaluator.history = history
+        self.fitness_evaluator.min_hours_per_month = min_hours
+        self.repair_operator = RepairOperator(
+            self.layout,
+            min_hours=min_hours,
+            max_consecutive_days=config.max_consecutive_shifts,
+            rng=self.random,
+            history=history
+        )
+        # Layout riêng của khối: giờ kỳ vọng là phần của khối, không phải cả tháng
+        self.layout.expected_hours = expected_hours
+        self.seed_genome = seed_genome
+
+    def warm_start_genomes(self) -> List[np.ndarray]:
+        """Lịch khởi tạo ấm: phần gối đầu của khối trước (chưa chốt), các ngày sau khởi tạo tham lam"""
+        if self.seed_genome is None:
+            return []
+        individual = self.new_individual()
+        self.initialize_individual(individual)
+        genome = individual.genome.copy()
+        genome[:len(self.seed_genome)] = self.seed_genome
+        return [genome]
+
+
+class RollingHorizonScheduler(BaseScheduler):
+    """Điều phối các khối; cùng giao diện evolve()/fitness_history với GeneticScheduler"""
+
+    def __init__(self, config: ScheduleRequest, verbose: bool = True):
+        super().__init__(config)
+        self.verbose = verbose
+        self.layout = GenomeLayout(config.staff, config.departments, config.shifts, config.days)
+        days = config.days
+        block = max(1, config.rolling_block_days)
+        overlap = max(0, config.rolling_overlap_days)
+        self.blocks: List[Block] = [
+            (start, min(start + block, days), min(start + block + overlap, days))
+            for start in range(0, days, block)
+        ]
+
+        # Chỉ tiêu theo tháng của từng nhân viên
+        num_staff = len(config.staff)
+        self.monthly_min_hours = np.full(num_staff, float(config.min_hours_per_month))
+        self.monthly_expected_hours = self.layout.expected_hours.astype(np.float64)
+
+        # Chấm lịch cả horizon: chỉ tiêu tháng quy theo số ngày
+        self.layout.expected_hours = np.round(self.monthly_expected_hours * days / MONTH_DAYS).astype(np.int64)
+        self.fitness_evaluator = FitnessEvaluator(
+            weights=config.weights,
+            min_hours_per_month=horizon_min_hours(config.min_hours_per_month, days),
+            max_consecutive_shifts=config.max_consecutive_shifts
+        )
+
+        # Phần đã chốt: genome và số ca theo ngày của từng nhân viên
+        self.genome = np.full(self.layout.shape, EMPTY_SLOT, dtype=self.layout.dtype)
+        self.day_load = np.zeros((days, num_staff), dtype=np.int64)
+        self.block_results: List[Dict] = []
+        # GA của khối đang chạy (để chuyển tiếp request_stop)
+        self._active: BaseScheduler = None
+
+    def request_stop(self):
+        super().request_stop()
+        if self._active is not None:
+            self._active.request_stop()
+
+    def mean_fitness(self) -> Optional[float]:
+        """Fitness trung bình quần thể của khối vừa giải (cùng thang điểm với best_fitness trong sự kiện của khối)"""
+        return self.block_results[-1]["mean_fitness"] if self.block_results else None
+
+    def block_targets(self, monthly: np.ndarray, start: int, stop: int) -> np.ndarray:
+        """
+        Chỉ tiêu giờ của khối [start, stop) theo từng nhân viên: với mỗi tháng khối chạm tới,
+        phần còn thiếu (chỉ tiêu tháng - giờ đã chốt trong tháng) chia đều cho số ngày còn lại của tháng
+        """
+        shift_hours = self.layout.staff_shift_hours
+        target = np.zeros(len(monthly))
+        for month_start in range(start - start % MONTH_DAYS, stop, MONTH_DAYS):
+            month_stop = min(month_start + MONTH_DAYS, self.config.days)
+            # Tháng cuối có thể ngắn hơn MONTH_DAYS: chỉ tiêu quy theo số ngày
+            due = monthly * (month_stop - month_start) / MONTH_DAYS
+            first = max(start, month_start)
+            done = self.day_load[month_start:first].sum(axis=0) * shift_hours
+            share = (min(stop, month_stop) - first) / (month_stop - first)
+            target += np.maximum(due - done, 0) * share
+        return np.ceil(target).astype(np.int64)
+
+    def history(self, start: int) -> np.ndarray:
+        """Ngày làm của max_consecutive_shifts ngày đã chốt ngay trước start (ngày, S)"""
+        length = self.config.max_consecutive_shifts
+        worked = np.zeros((length, len(self.config.staff)), dtype=bool)
+        if length > 0 and start > 0:
+            recent = self.day_load[max(0, start - length):start] > 0
+            worked[length - len(recent):] = recent
+        return worked
+
+    def block_request(self, index: int, start: int, stop: int, min_hours: np.ndarray) -> ScheduleRequest:
+        """Request của 1 khối: số ngày của khối, GA tuần tự 1 quần thể, ngân sách chia đều cho các khối còn lại"""
+        update = {
+            "days": stop - start,
+            "seed": None if self.config.seed is None else self.config.seed + index,
+            # Chỉ để tham khảo: evaluator, repair và khởi tạo dùng mảng min_hours theo nhân viên
+            "min_hours_per_month": int(np.median(min_hours)) if len(min_hours) else 0,
+            "rolling_block_days": 0,
+            "islands": 1,
+            "parallelism": 1,
+            "decompose": False,
+            "multi_objective": False,
+            "cache": False,
+            "warm_start_schedules": [],
+        }
+        if self.deadline is not None:
+            remaining = len(self.blocks) - index
+            update["time_limit_seconds"] = max(0.0, (self.deadline - time.time()) / remaining)
+        if hasattr(self.config, 'model_copy'):
+            return self.config.model_copy(update=update)
+        return self.config.copy(update=update)
+
+    def solve_block(self, index: int, block: Block, seed_genome: np.ndarray) -> Individual:
+        """Giải 1 khối, chốt các ngày [start, commit); trả về cá thể tốt nhất của khối"""
+        start, commit, stop = block
+        min_hours = self.block_targets(self.monthly_min_hours, start, stop)
+        expected = self.block_targets(self.monthly_expected_hours, start, stop)
+        config = self.block_request(index, start, stop, min_hours)
+
+        self._active = BlockScheduler(config, self.history(start), min_hours, expected, seed_genome)
+        best = self._active.evolve()
+        scheduler, self._active = self._active, None
+
+        self.genome[start:commit] = best.genome[:commit - start]
+        self.day_load[start:commit] = best.day_load[:commit - start]
+        self.fitness_history.extend(scheduler.fitness_history[1:] or scheduler.fitness_history)
+        self.block_results.append({
+            "days": (start, commit),
+            "fitness": best.fitness_score,
+            "hard_violations": best.hard_violations,
+            "generations": len(scheduler.fitness_history) - 1,
+            "mean_fitness": scheduler.mean_fitness(),
+            "stop_reason": scheduler.stop_reason,
+            "profile": (scheduler.profiler.totals, scheduler.profiler.counts),
+        })
+        return best
+
+    def evolve(self) -> Individual:
+        """
+        Giải lần lượt các khối rồi chấm lịch cả horizon
+        Returns: Cá thể của cả horizon (các ngày chưa giải khi bị hủy giữa chừng để trống)
+        """
+        start_time = time.time()
+        self.start_clock(start_time)
+        if self.verbose:
+            print(f"Rolling horizon: {len(self.blocks)} khối {self.config.rolling_block_days} ngày "
+                  f"(gối đầu {self.config.rolling_overlap_days} ngày)")
+
+        seed_genome = None
+        for index, block in enumerate(self.blocks):
+            if self._stop_requested:
+                break
+            start, commit, stop = block
+            best = self.solve_block(index, block, seed_genome)
+            if self.verbose:
+                print(f"Khối {index + 1}/{len(self.blocks)} (ngày {start}-{commit - 1}): "
+                      f"Best Fitness = {best.fitness_score:.2f}, Violations = {best.hard_violations}")
+
+            # Phần gối đầu chưa chốt làm lịch khởi tạo ấm cho khối sau
+            seed_genome = best.genome[commit - start:].copy() if stop > commit else None
+
+            self.best_individual = best
+            self.notify(len(self.fitness_history), start_time)
+
+        self.best_individual = Individual(
+            self.config.staff, self.config.departments, self.config.shifts, self.config.days,
+            layout=self.layout
+        )
+        self.best_individual.genome[...] = self.genome
+        self.best_individual.rebuild_counters()
+        self.fitness_evaluator.evaluate_population([self.best_individual])
+        # stats có thể dùng chung với bản sao (copy_into) → gán dict mới, không sửa tại chỗ
+        self.best_individual.stats = {**self.best_individual.stats,
+                                      "months_below_min_hours": self.months_below_min_hours()}
+        self.fitness_history.append(self.best_individual.fitness_score)
+
+        self.profiler.combine([result["profile"][0] for result in self.block_results],
+                              [result["profile"][1] for result in self.block_results])
+        self.stop_reason = self.stop_reason_of()
+
+        computation_time = time.time() - start_time
+        if self.verbose:
+            print(f"Cả horizon: Best Fitness = {self.best_individual.fitness_score:.2f}, "
+                  f"Violations = {self.best_individual.hard_violations}")
+            print(f"\n✓ Hoàn thành trong {computation_time:.2f} giây")
+        return self.best_individual
+
+    def months_below_min_hours(self) -> int:
+        """Số cặp (nhân viên, tháng) dưới min_hours_per_month (tháng cuối ngắn quy theo số ngày)"""
+        hours = self.day_load * self.layout.staff_shift_hours
+        count = 0
+        for month_start in range(0, self.config.days, MONTH_DAYS):
+            month_stop = min(month_start + MONTH_DAYS, self.config.days)
+            due = self.monthly_min_hours * (month_stop - month_start) / MONTH_DAYS
+            count += int((hours[month_start:month_stop].sum(axis=0) < due).sum())
+        return count
+
+    def stop_reason_of(self) -> str:
+        """Lý do dừng chung: hủy / hết giờ nếu có khối như vậy, ngược lại xét lịch cả horizon"""
+        if self._stop_requested:
+            return "cancelled"
+        reasons = [result["stop_reason"] for result in self.block_results]
+        if "time_limit" in reasons:
+            return "time_limit"
+        best = self.best_individual
+        if best.hard_violations == 0 and best.fitness_score >= self.config.target_fitness:
+            return "solved"
+        return "max_generations"
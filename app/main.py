@@ -1,6 +1,11 @@
-from fastapi import FastAPI
+import time
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse
 from fastapi.staticfiles import StaticFiles
+from app.config import METRICS_ENABLED
 from app.routers import web, api
+from app.dependencies import get_job_manager, get_metrics, get_batch_runner
+from app.utils.metrics import route_template
 
 app = FastAPI(
     title="ShiftGenix",
@@ -13,6 +18,28 @@ app.mount("/static", StaticFiles(directory="app/static"), name="static")
 app.include_router(web.router)
 app.include_router(api.router, prefix="/api/v1")
 
+if METRICS_ENABLED:
+    @app.middleware("http")
+    async def record_request_metrics(request: Request, call_next):
+        """Đếm request và đo thời gian theo route (dạng mẫu, vd. /api/v1/staff/{staff_id})"""
+        start = time.perf_counter()
+        response = await call_next(request)
+        get_metrics().record_request(request.method, route_template(request.scope),
+                                     response.status_code, time.perf_counter() - start)
+        return response
+
+    @app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+    def metrics():
+        """Số liệu dạng Prometheus text format"""
+        get_job_manager()  # Đăng ký gauge hàng đợi job
+        return PlainTextResponse(get_metrics().render(), media_type="text/plain; version=0.0.4")
+
+@app.on_event("shutdown")
+def shutdown_jobs():
+    """Hủy các job xếp lịch còn chạy và đóng pool xếp lịch theo lô khi tắt server"""
+    get_job_manager().shutdown()
+    get_batch_runner().shutdown()
+
 @app.get("/health")
 def health_check():
     return {"status": "ok"}
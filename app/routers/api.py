@@ -1,12 +1,37 @@
-from fastapi import APIRouter
-from app.schemas.schedule import ScheduleRequest, ScheduleResponse
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import Response, StreamingResponse
+from app.config import BATCH_MAX_ITEMS
+from app.schemas.schedule import (ScheduleRequest, ScheduleResponse, JobStatus, FeasibilityReport, BatchRequest,
+                                  RescheduleRequest, RescheduleResponse)
 from app.engine.ga_scheduler import generate_schedule
-from app.utils.data_loader import load_staff_from_csv, load_departments_from_csv
+from app.engine.feasibility import check_feasibility, InfeasibleScheduleError
+from app.engine.reschedule import reschedule
+from app.utils.jobs import JobManager, QueueFullError
+from app.utils.result_cache import ResultCache
+from app.utils.repository import DataRepository
+from app.utils.metrics import MetricsRegistry
+from app.utils.batch import BatchRunner, to_json_line
+from app.dependencies import get_job_manager, get_result_cache, get_repository, get_metrics, get_batch_runner
 
 router = APIRouter(tags=["Scheduler"])
 
+def _infeasible(e: InfeasibleScheduleError) -> HTTPException:
+    """422 kèm báo cáo khả thi để client biết ràng buộc nào không thể thỏa"""
+    report = e.report.model_dump() if hasattr(e.report, 'model_dump') else e.report.dict()
+    return HTTPException(status_code=422, detail={"message": str(e), "feasibility": report})
+
+@router.post("/schedule/check", response_model=FeasibilityReport)
+def check_schedule_feasibility(payload: ScheduleRequest):
+    """
+    Kiểm tra khả thi mà không chạy GA (vài ms)
+    Trả về các ràng buộc cứng chắc chắn bị vi phạm và cận dưới số vi phạm cứng
+    """
+    return check_feasibility(payload)
+
 @router.post("/schedule/generate", response_model=ScheduleResponse)
-def generate_shift_schedule(payload: ScheduleRequest):
+def generate_shift_schedule(payload: ScheduleRequest, cache: ResultCache = Depends(get_result_cache),
+                            metrics: MetricsRegistry = Depends(get_metrics)):
     """
     Tạo lịch trực tự động sử dụng Genetic Algorithm
     
@@ -17,85 +42,127 @@ def generate_shift_schedule(payload: ScheduleRequest):
       "shifts": [...],
       "days": 30,
       "population_size": 100,
-      "max_generations": 200
+      "max_generations": 200,
+      "seed": 42
     }
+    Request có seed (hoặc "cache": true) giống hệt lần trước được trả ngay từ cache
+    "feasibility_check": "reject" → 422 ngay nếu chắc chắn không thỏa được ràng buộc cứng
     """
-    result = generate_schedule(payload)
+    try:
+        result = generate_schedule(payload, cache=cache, metrics=metrics)
+    except InfeasibleScheduleError as e:
+        raise _infeasible(e)
     return result
 
+@router.post("/schedule/reschedule", response_model=RescheduleResponse)
+def reschedule_disruptions(payload: RescheduleRequest):
+    """
+    Xếp lại lịch có sẵn khi nhân viên vắng đột xuất, không chạy lại cả tháng
+    Body: các trường của /schedule/generate cùng "schedule" (lịch hiện tại) và
+    "disruptions": [{"staff_id": "S00012", "days": [11], "shifts": ["night"]}]
+    Chỉ các ngày trong window_margin quanh ngày bị ảnh hưởng được thay đổi; trả về lịch mới và danh sách thay đổi
+    """
+    try:
+        return reschedule(payload)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+@router.post("/schedule/batch")
+def run_schedule_batch(payload: BatchRequest, runner: BatchRunner = Depends(get_batch_runner)):
+    """
+    Chạy nhiều request xếp lịch đồng thời trên pool tiến trình dùng chung (request lớn chạy trước)
+    Trả về NDJSON: mỗi dòng 1 BatchItemResult {index, status, result, error, elapsed}, gửi ngay khi request đó xong;
+    request lỗi có status "failed" và không ảnh hưởng các request khác
+    """
+    if len(payload.requests) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Lô tối đa {BATCH_MAX_ITEMS} request")
+    lines = (to_json_line(item) for item in runner.run(payload.requests))
+    return StreamingResponse(lines, media_type="application/x-ndjson")
+
+@router.post("/schedule/jobs", response_model=JobStatus, status_code=202)
+def submit_schedule_job(payload: ScheduleRequest, jobs: JobManager = Depends(get_job_manager)):
+    """
+    Tạo lịch trực chạy nền, trả về job_id ngay
+    Theo dõi bằng GET /schedule/jobs/{job_id}, lấy kết quả tại /schedule/jobs/{job_id}/result
+    """
+    if payload.feasibility_check == "reject":
+        report = check_feasibility(payload)
+        if not report.feasible:
+            raise _infeasible(InfeasibleScheduleError(report))
+    try:
+        job = jobs.submit(payload)
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    return job.to_status()
+
+@router.get("/schedule/jobs/{job_id}", response_model=JobStatus)
+def get_schedule_job(job_id: str, jobs: JobManager = Depends(get_job_manager)):
+    """Trạng thái và tiến trình của job (thế hệ, fitness tốt nhất, thời gian đã chạy)"""
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Không tìm thấy job {job_id}")
+    return job.to_status()
+
+@router.get("/schedule/jobs/{job_id}/events")
+def stream_schedule_job(job_id: str, jobs: JobManager = Depends(get_job_manager)):
+    """
+    Theo dõi tiến trình job qua Server-Sent Events
+    Sự kiện "progress": generation, best_fitness, mean_fitness (null nếu không có quần thể), hard_violations,
+    generation_time, elapsed
+    Sự kiện "done": trạng thái cuối của job
+    """
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Không tìm thấy job {job_id}")
+    return StreamingResponse(
+        job.stream_events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/schedule/jobs/{job_id}/result", response_model=ScheduleResponse)
+def get_schedule_job_result(job_id: str, jobs: JobManager = Depends(get_job_manager)):
+    """Kết quả của job đã xong (job bị hủy trả về lịch tốt nhất tới lúc dừng)"""
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Không tìm thấy job {job_id}")
+    if job.result is None:
+        raise HTTPException(status_code=409, detail=f"Job {job_id} chưa có kết quả ({job.status})")
+    return job.result
+
+@router.delete("/schedule/jobs/{job_id}", response_model=JobStatus)
+def cancel_schedule_job(job_id: str, jobs: JobManager = Depends(get_job_manager)):
+    """Hủy job đang chờ hoặc đang chạy"""
+    job = jobs.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Không tìm thấy job {job_id}")
+    return job.to_status()
+
 @router.get("/staff")
-def get_staff_list():
-    """Lấy danh sách nhân viên từ CSV"""
-    staff_list = load_staff_from_csv("data/staff.csv")
-    
-    # Tương thích với cả Pydantic v1 và v2
-    data = []
-    for staff in staff_list:
-        if hasattr(staff, 'model_dump'):
-            data.append(staff.model_dump())
-        else:
-            data.append(staff.dict())
-    
-    return {
-        "success": True,
-        "count": len(data),
-        "data": data
-    }
+def get_staff_list(offset: int = Query(0, ge=0), limit: Optional[int] = Query(None, ge=1),
+                   repo: DataRepository = Depends(get_repository)):
+    """Lấy danh sách nhân viên (từ kho dữ liệu đã nạp sẵn); limit: chỉ lấy 1 trang từ offset"""
+    snapshot = repo.snapshot()
+    if offset == 0 and limit is None:
+        return Response(snapshot.staff_json(), media_type="application/json")
+    return Response(snapshot.staff_page_json(offset, limit), media_type="application/json")
 
 @router.get("/departments")
-def get_departments_list():
-    """Lấy danh sách khoa/phòng ban từ CSV"""
-    departments_list = load_departments_from_csv("data/departments.csv")
-    
-    # Tương thích với cả Pydantic v1 và v2
-    data = []
-    for department in departments_list:
-        if hasattr(department, 'model_dump'):
-            data.append(department.model_dump())
-        else:
-            data.append(department.dict())
-    
-    return {
-        "success": True,
-        "count": len(data),
-        "data": data
-    }
+def get_departments_list(repo: DataRepository = Depends(get_repository)):
+    """Lấy danh sách khoa/phòng ban"""
+    return Response(repo.snapshot().departments_json(), media_type="application/json")
 
 @router.get("/staff-by-department")
-def get_staff_by_department():
+def get_staff_by_department(repo: DataRepository = Depends(get_repository)):
     """Lấy danh sách nhân viên theo từng khoa"""
-    staff_list = load_staff_from_csv("data/staff.csv")
-    
-    department_map = {}
-    for staff in staff_list:
-        dept = staff.department
-        
-        if dept not in department_map:
-            department_map[dept] = []
-        
-        # Serialize staff object
-        if hasattr(staff, 'model_dump'):
-            department_map[dept].append(staff.model_dump())
-        else:
-            department_map[dept].append(staff.dict())
-    
-    return {
-        "success": True,
-        "departments": list(department_map.keys()),
-        "data": department_map
-    }
+    return Response(repo.snapshot().staff_by_department_json(), media_type="application/json")
 
 @router.get("/staff/{staff_id}")
-def get_staff_by_id(staff_id: str):
-    """Lấy thông tin chi tiết 1 nhân viên"""
-    staff_list = load_staff_from_csv("data/staff.csv")
-    
-    for staff in staff_list:
-        if staff.staff_id == staff_id:
-            if hasattr(staff, 'model_dump'):
-                return {"success": True, "data": staff.model_dump()}
-            else:
-                return {"success": True, "data": staff.dict()}
+def get_staff_by_id(staff_id: str, repo: DataRepository = Depends(get_repository)):
+    """Lấy thông tin chi tiết 1 nhân viên (tra chỉ mục theo staff_id)"""
+    body = repo.snapshot().staff_detail_json(staff_id)
+    if body is not None:
+        return Response(body, media_type="application/json")
     
     return {
         "success": False,
@@ -103,40 +170,9 @@ def get_staff_by_id(staff_id: str):
     }
 
 @router.get("/statistics")
-def get_statistics():
-    """Thống kê tổng quan"""
-    staff_list = load_staff_from_csv("data/staff.csv")
-    departments_list = load_departments_from_csv("data/departments.csv")
-    
-    # Thống kê theo vai trò
-    role_count = {}
-    for staff in staff_list:
-        role = staff.role
-        role_count[role] = role_count.get(role, 0) + 1
-    
-    # Thống kê theo khoa
-    dept_count = {}
-    for staff in staff_list:
-        dept = staff.department
-        dept_count[dept] = dept_count.get(dept, 0) + 1
-    
-    # Thống kê kinh nghiệm
-    total_experience = sum(s.years_of_experience for s in staff_list)
-    avg_experience = total_experience / len(staff_list) if staff_list else 0
-    
-    # Thống kê hài lòng
-    total_satisfaction = sum(s.satisfaction_score for s in staff_list)
-    avg_satisfaction = total_satisfaction / len(staff_list) if staff_list else 0
-    
-    return {
-        "success": True,
-        "total_staff": len(staff_list),
-        "total_departments": len(departments_list),
-        "by_role": role_count,
-        "by_department": dept_count,
-        "average_experience": round(avg_experience, 1),
-        "average_satisfaction": round(avg_satisfaction, 2)
-    }
+def get_statistics(repo: DataRepository = Depends(get_repository)):
+    """Thống kê tổng quan (tính sẵn khi nạp dữ liệu)"""
+    return Response(repo.snapshot().statistics_json(), media_type="application/json")
 
 @router.get("/health")
 def health_check():
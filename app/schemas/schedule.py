@@ -1,5 +1,16 @@
 from pydantic import BaseModel, Field
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Literal
+try:
+    from pydantic import model_validator
+except ImportError:  # pydantic v1
+    from pydantic import root_validator
+    model_validator = None
+
+
+def check_rolling_overlap(block_days: int, overlap_days: int):
+    """Phần gối đầu phải ngắn hơn khối (khối sau phải tiến lên); block_days = 0 là tắt rolling horizon"""
+    if block_days > 0 and overlap_days >= block_days:
+        raise ValueError(f"rolling_overlap_days ({overlap_days}) phải nhỏ hơn rolling_block_days ({block_days})")
 
 class Staff(BaseModel):
     """Nhân viên y tế - Schema đơn giản"""
@@ -33,6 +44,13 @@ class Shift(BaseModel):
     end_time: str  # "15:00"
     duration_hours: int = 8
 
+class DaySchedule(BaseModel):
+    """Lịch trực của 1 ngày"""
+    date: str
+    day_of_week: str
+    is_weekend: bool
+    shifts: Dict[str, Dict[str, List[str]]]  # {shift_name: {department: [staff_ids]}}
+
 class ScheduleRequest(BaseModel):
     """Request để tạo lịch trực"""
     staff: List[Staff]
@@ -45,6 +63,53 @@ class ScheduleRequest(BaseModel):
     max_generations: int = 500
     mutation_rate: float = 0.1
     crossover_rate: float = 0.8
+    seed: Optional[int] = None  # Cố định seed để kết quả lặp lại được
+    
+    # Điều kiện dừng (ngoài max_generations)
+    time_limit_seconds: Optional[float] = Field(None, gt=0)  # Ngân sách thời gian; hết giờ trả về lịch tốt nhất hiện có
+    stagnation_generations: Optional[int] = Field(None, ge=1)  # Dừng nếu N thế hệ không cải thiện quá stagnation_epsilon
+    stagnation_epsilon: float = 0.0
+    target_fitness: float = 950  # Không vi phạm cứng và đạt fitness này → dừng sớm
+    # Dùng cache kết quả: None = tự động (chỉ khi có seed), True/False = bật/tắt hẳn
+    cache: Optional[bool] = None
+    parallelism: int = Field(1, ge=1)  # Số tiến trình đánh giá fitness (1 = tuần tự)
+    initializer: Literal["greedy", "random"] = "greedy"  # Khởi tạo quần thể: tham lam có nhiễu hoặc ngẫu nhiên
+    initializer_noise: float = Field(1.0, ge=0)  # Nhiễu của khởi tạo tham lam (đơn vị: số ca)
+    repair_fraction: float = Field(0.2, ge=0, le=1)  # Tỉ lệ cá thể mỗi thế hệ được sửa vi phạm cứng (0 = tắt)
+    
+    # Pha memetic: leo đồi trên memetic_top_k cá thể tốt nhất mỗi memetic_interval thế hệ
+    memetic_top_k: int = Field(0, ge=0)  # 0 = tắt
+    memetic_interval: int = Field(1, ge=1)
+    memetic_steps: int = Field(100, ge=0)  # Số bước thử tối đa cho mỗi cá thể
+    memetic_time_budget: float = Field(0.05, ge=0)  # Giây tối đa cho pha memetic mỗi thế hệ
+    
+    # Mô hình đảo: mỗi đảo là 1 quần thể population_size chạy trên 1 tiến trình
+    islands: int = Field(1, ge=1)  # Số đảo (1 = 1 quần thể duy nhất)
+    migration_interval: int = Field(10, ge=1)  # Số thế hệ giữa 2 lần di cư
+    migration_size: int = Field(2, ge=0)  # Số cá thể tốt nhất mỗi đảo gửi đi
+    migration_topology: Literal["ring", "random"] = "ring"
+    
+    # Giải tách theo khoa: mỗi nhóm khoa độc lập chạy 1 GA con (song song nếu parallelism > 1)
+    decompose: bool = False
+    decomposition_refine_generations: int = Field(0, ge=0)  # Số thế hệ GA toàn cục chạy thêm sau khi ghép (0 = không)
+    
+    # Rolling horizon cho lịch dài (90-365 ngày): giải lần lượt từng khối rolling_block_days ngày
+    # (cộng rolling_overlap_days ngày gối đầu giải lại ở khối sau), các khối trước giữ cố định
+    rolling_block_days: int = Field(0, ge=0)  # 0 = tắt (giải cả lịch 1 lần)
+    rolling_overlap_days: int = Field(7, ge=0)  # Phải nhỏ hơn rolling_block_days khi bật
+    
+    # Đa mục tiêu (NSGA-II): tối ưu đồng thời 4 điểm mềm, trả về tập Pareto thay vì 1 lịch theo weights
+    # (bỏ qua islands, decompose và pha memetic)
+    multi_objective: bool = False
+    pareto_max_solutions: int = Field(10, ge=1)  # Số lịch tối đa của tập Pareto (giữ các lịch trải đều nhất)
+    
+    # Kiểm tra khả thi trước khi chạy: "off", "warn" (chạy tiếp, báo trong response) hoặc "reject" (trả lỗi 422)
+    feasibility_check: Literal["off", "warn", "reject"] = "warn"
+    
+    # Khởi tạo ấm: dựng 1 phần quần thể ban đầu từ lịch có sẵn (tháng trước, kết quả cũ...)
+    warm_start_schedules: List[List[DaySchedule]] = []
+    warm_start_fraction: float = Field(0.5, ge=0, le=1)  # Tỉ lệ quần thể dựng từ lịch có sẵn
+    warm_start_perturbation: float = Field(0.02, ge=0, le=1)  # Tỉ lệ slot bị thay ngẫu nhiên ở mỗi bản sao
     
     # Ràng buộc đơn giản
     min_hours_per_month: int = 160  # Tối thiểu 160 giờ/tháng
@@ -57,13 +122,38 @@ class ScheduleRequest(BaseModel):
         "experience_distribution": 0.20, # Phân bổ kinh nghiệm
         "minimize_overtime": 0.10        # Giảm làm thêm
     }
+    
+    if model_validator is not None:
+        @model_validator(mode="after")
+        def check_rolling(self):
+            check_rolling_overlap(self.rolling_block_days, self.rolling_overlap_days)
+            return self
+    else:
+        @root_validator(skip_on_failure=True)
+        def check_rolling(cls, values):
+            check_rolling_overlap(values["rolling_block_days"], values["rolling_overlap_days"])
+            return values
 
-class DaySchedule(BaseModel):
-    """Lịch trực của 1 ngày"""
-    date: str
-    day_of_week: str
-    is_weekend: bool
-    shifts: Dict[str, Dict[str, List[str]]]  # {shift_name: {department: [staff_ids]}}
+class FeasibilityIssue(BaseModel):
+    """1 ràng buộc cứng chắc chắn bị vi phạm"""
+    constraint: str  # HC1, HC2, HC3
+    department: Optional[str] = None
+    message: str
+    required: int  # Nhu cầu (giờ, người-ngày, người/ca...)
+    available: int  # Khả năng đáp ứng tối đa
+
+class FeasibilityReport(BaseModel):
+    """Kết quả kiểm tra khả thi trước khi chạy GA"""
+    feasible: bool
+    min_hard_violations: int = 0  # Cận dưới số vi phạm cứng của mọi lịch
+    issues: List[FeasibilityIssue] = []
+
+class ParetoSolution(BaseModel):
+    """1 lịch trong tập Pareto (chế độ multi_objective)"""
+    schedule: List[DaySchedule]
+    scores: Dict[str, float]  # 4 điểm mềm (0-1), chọn lại trọng số bằng tổng có trọng số của các điểm này
+    fitness_score: float  # Theo weights của request
+    hard_violations: int
 
 class ScheduleResponse(BaseModel):
     """Response trả về lịch trực"""
@@ -73,4 +163,65 @@ class ScheduleResponse(BaseModel):
     soft_violations: int
     statistics: Dict[str, Any]
     generation: int
-    computation_time: float
\ No newline at end of file
+    computation_time: float
+    # Lý do dừng: solved, max_generations, time_limit, stagnation, lower_bound, cancelled
+    stop_reason: Optional[str] = None
+    cache_hit: bool = False  # True nếu lấy từ cache, không chạy GA
+    # Thời gian theo pha và số lần đánh giá / sao chép (None nếu tắt PROFILING_ENABLED)
+    profile: Optional[Dict[str, Any]] = None
+    # Kết quả kiểm tra khả thi (None nếu feasibility_check = "off")
+    feasibility: Optional[FeasibilityReport] = None
+    # Tập Pareto không bị trội (chỉ khi multi_objective); schedule ở trên là lịch tốt nhất theo weights
+    pareto_front: Optional[List[ParetoSolution]] = None
+
+class JobStatus(BaseModel):
+    """Trạng thái job xếp lịch chạy nền"""
+    job_id: str
+    status: str  # queued, running, completed, failed, cancelled
+    generation: int = 0
+    max_generations: int = 0
+    best_fitness: Optional[float] = None
+    hard_violations: Optional[int] = None
+    elapsed: float = 0.0  # Giây kể từ khi bắt đầu chạy
+    error: Optional[str] = None
+
+class Disruption(BaseModel):
+    """Nhân viên không thể làm (ốm, nghỉ phép...) trong các ngày / ca cho trước"""
+    staff_id: str
+    days: List[int]  # Chỉ số ngày trong lịch (0 = ngày đầu)
+    shifts: List[str] = []  # Tên ca; rỗng = cả ngày
+
+class RescheduleRequest(ScheduleRequest):
+    """Xếp lại cục bộ lịch đã có khi có thay đổi đột xuất (các trường GA khác không dùng)"""
+    schedule: List[DaySchedule]  # Lịch hiện tại
+    disruptions: List[Disruption]
+    window_margin: int = Field(2, ge=0)  # Số ngày trước/sau mỗi ngày bị ảnh hưởng được phép thay đổi
+    change_penalty: float = 10.0  # Điểm fitness (thang 0-1000) trừ cho mỗi slot khác lịch hiện tại
+    search_steps: int = Field(5000, ge=0)  # Số bước thử tối đa của tìm kiếm cục bộ
+    time_limit_seconds: Optional[float] = Field(0.5, gt=0)
+
+class ScheduleChange(BaseModel):
+    """1 slot bị thay đổi so với lịch hiện tại"""
+    day: int
+    date: str
+    shift: str
+    department: str
+    removed: Optional[str] = None  # Nhân viên bị bỏ khỏi slot (None = slot đang trống)
+    added: Optional[str] = None  # Nhân viên thay vào (None = để trống)
+
+class RescheduleResponse(ScheduleResponse):
+    """Lịch sau khi xếp lại và danh sách thay đổi"""
+    window: List[int]  # Các ngày được phép thay đổi
+    changes: List[ScheduleChange]
+
+class BatchRequest(BaseModel):
+    """Nhiều request xếp lịch chạy đồng thời (nhiều cơ sở / nhiều tháng)"""
+    requests: List[ScheduleRequest]
+
+class BatchItemResult(BaseModel):
+    """Kết quả 1 request trong lô (trả về ngay khi request đó xong)"""
+    index: int  # Vị trí trong BatchRequest.requests
+    status: str  # completed, failed, cancelled
+    result: Optional[ScheduleResponse] = None
+    error: Optional[str] = None
+    elapsed: float = 0.0  # Giây kể từ khi lô bắt đầu
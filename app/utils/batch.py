@@ -0,0 +1,195 @@
+"""
+Xếp lịch theo lô: nhiều request (nhiều cơ sở / nhiều tháng) chạy đồng thời
+trên 1 pool tiến trình dùng chung, giới hạn số worker.
+Request lớn (ước lượng theo kích thước genome × số lần đánh giá) được gửi trước để các worker
+xong gần cùng lúc; kết quả trả về ngay khi từng request xong, lỗi của 1 request không ảnh hưởng các request khác.
+
+Chạy từ dòng lệnh:
+  python -m app.utils.batch requests.json --output results.ndjson --workers 8
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, Future, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterator, List, Optional
+from app.config import PROCESS_START_METHOD, BATCH_MAX_WORKERS
+from app.schemas.schedule import ScheduleRequest, BatchRequest, BatchItemResult
+from app.engine.ga_scheduler import generate_schedule
+from app.utils.result_cache import ResultCache, request_key, is_cacheable
+from app.utils.metrics import MetricsRegistry
+
+
+def estimate_cost(payload: ScheduleRequest) -> float:
+    """Chi phí tương đối của 1 request: (số slot genome + số nhân viên) × số lần đánh giá"""
+    slots = sum(department.required_staff_per_shift for department in payload.departments)
+    genome = payload.days * len(payload.shifts) * max(1, slots)
+    evaluations = payload.population_size * max(1, payload.max_generations) * max(1, payload.islands)
+    return float((genome + len(payload.staff)) * evaluations)
+
+
+def _run_item(payload: ScheduleRequest) -> Dict:
+    """Chạy 1 request trong tiến trình worker (không in log); lỗi trả về dạng chuỗi để không phải pickle exception"""
+    try:
+        return {"result": generate_schedule(payload, verbose=False)}
+    except Exception as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+
+
+def _copy(payload: ScheduleRequest, update: Dict) -> ScheduleRequest:
+    if hasattr(payload, 'model_copy'):
+        return payload.model_copy(update=update)
+    return payload.copy(update=update)
+
+
+class BatchRunner:
+    """Pool tiến trình dùng chung cho mọi lô (tạo lười, tạo lại nếu worker chết)"""
+
+    def __init__(self, max_workers: Optional[int] = BATCH_MAX_WORKERS, cache: ResultCache = None,
+                 metrics: MetricsRegistry = None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.cache = cache
+        self.metrics = metrics
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                context = multiprocessing.get_context(PROCESS_START_METHOD)
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+            return self._executor
+
+    def _discard(self, executor: ProcessPoolExecutor):
+        """Bỏ pool bị hỏng (worker chết giữa chừng), lô sau sẽ tạo pool mới"""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def run(self, payloads: List[ScheduleRequest]) -> Iterator[BatchItemResult]:
+        """
+        Chạy các request, trả về kết quả theo thứ tự xong (không theo thứ tự gửi)
+        Dừng đọc giữa chừng (client ngắt kết nối) thì các request chưa chạy bị hủy
+        """
+        start = time.time()
+        cached: List[BatchItemResult] = []
+        keys: Dict[int, str] = {}
+        pending = []
+        for index, payload in enumerate(payloads):
+            if self.cache is not None and is_cacheable(payload):
+                keys[index] = request_key(payload)
+                response = self.cache.get(keys[index])
+                if response is not None:
+                    if self.metrics is not None:
+                        self.metrics.record_cache_hit()
+                    cached.append(BatchItemResult(index=index, status="completed",
+                                                  result=_copy(response, {"cache_hit": True})))
+                    continue
+            pending.append(index)
+
+        # Request lớn trước; trong lô, mỗi request chạy tuần tự (pool đã song song theo request)
+        pending.sort(key=lambda i: -estimate_cost(payloads[i]))
+        executor = self.executor()
+        futures: Dict[Future, int] = {}
+        try:
+            for index in pending:
+                futures[executor.submit(_run_item, _copy(payloads[index], {"parallelism": 1}))] = index
+        except BrokenProcessPool:
+            self._discard(executor)
+            raise
+
+        try:
+            for item in cached:
+                item.elapsed = time.time() - start
+                yield item
+
+            for future in as_completed(futures):
+                index = futures[future]
+                yield self._collect(future, index, payloads[index], keys.get(index), start, executor)
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def _collect(self, future: Future, index: int, payload: ScheduleRequest, key: Optional[str],
+                 start: float, executor: ProcessPoolExecutor) -> BatchItemResult:
+        elapsed = time.time() - start
+        try:
+            outcome = future.result()
+        except BrokenProcessPool as e:
+            self._discard(executor)
+            outcome = {"error": f"Worker bị dừng đột ngột: {e}"}
+        except Exception as e:
+            outcome = {"error": f"{type(e).__name__}: {e}"}
+
+        if "error" in outcome:
+            return BatchItemResult(index=index, status="failed", error=outcome["error"], elapsed=elapsed)
+
+        response = outcome["result"]
+        if self.metrics is not None:
+            self.metrics.record_run(response.stop_reason, response.computation_time, response.profile)
+        if key is not None and response.stop_reason != "cancelled":
+            self.cache.put(key, response)
+        return BatchItemResult(index=index, status="completed", result=response, elapsed=elapsed)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def to_json_line(item: BatchItemResult) -> str:
+    """1 dòng NDJSON"""
+    data = item.model_dump_json() if hasattr(item, 'model_dump_json') else item.json()
+    return data + "\n"
+
+
+def read_batch(path: str) -> BatchRequest:
+    """Đọc file JSON: danh sách ScheduleRequest hoặc {"requests": [...]}"""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, list):
+        data = {"requests": data}
+    if hasattr(BatchRequest, 'model_validate'):
+        return BatchRequest.model_validate(data)
+    return BatchRequest.parse_obj(data)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Xếp lịch theo lô trên pool tiến trình dùng chung")
+    parser.add_argument("input", help="File JSON: danh sách ScheduleRequest hoặc {\"requests\": [...]}")
+    parser.add_argument("--output", help="Ghi kết quả NDJSON ra file (mặc định: stdout)")
+    parser.add_argument("--workers", type=int, default=BATCH_MAX_WORKERS,
+                        help="Số tiến trình (mặc định: số lõi CPU)")
+    args = parser.parse_args(argv)
+
+    batch = read_batch(args.input)
+    runner = BatchRunner(max_workers=args.workers)
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    failed = 0
+    try:
+        for item in runner.run(batch.requests):
+            out.write(to_json_line(item))
+            out.flush()
+            failed += item.status != "completed"
+            if args.output:
+                detail = (f"fitness = {item.result.fitness_score:.2f}" if item.result is not None
+                          else item.error)
+                print(f"[{item.elapsed:7.2f}s] #{item.index} {item.status}: {detail}")
+    finally:
+        runner.shutdown()
+        if args.output:
+            out.close()
+
+    if args.output:
+        print(f"\n✓ {len(batch.requests) - failed}/{len(batch.requests)} request thành công, ghi {args.output}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
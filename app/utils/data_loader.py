@@ -1,35 +1,203 @@
 import csv
+import gc
+import json
+import mmap
+import os
+import struct
+import time
+from contextlib import contextmanager
+from itertools import islice
 from pathlib import Path
-from typing import List
+from typing import List, Dict, Iterator, Optional, Tuple
+import numpy as np
+from pydantic import ValidationError
+from app.config import CSV_BATCH_SIZE, DATA_SNAPSHOT_ENABLED
 from app.schemas.schedule import Staff, Department
 
-def load_staff_from_csv(filepath: str = "data/staff.csv") -> List[Staff]:
-    """Đọc danh sách nhân viên từ file CSV"""
-    staff_list = []
+try:
+    # Pydantic v2: kiểm tra cả lô trong 1 lần gọi (nhanh hơn Staff(**row) từng dòng)
+    from pydantic import TypeAdapter
+    _STAFF_BATCH = TypeAdapter(List[Staff])
+except ImportError:
+    _STAFF_BATCH = None
+
+# Cột của staff.csv và kiểu dữ liệu (role không bắt buộc)
+STAFF_COLUMNS = {
+    'staff_id': str,
+    'department': str,
+    'shift_duration_hours': int,
+    'patient_load': int,
+    'workdays_per_month': int,
+    'satisfaction_score': float,
+    'overtime_hours': int,
+    'years_of_experience': int,
+    'previous_satisfaction_rating': float,
+    'absenteeism_days': int,
+}
+
+DEPARTMENT_COLUMNS = {
+    'id': str,
+    'name': str,
+    'required_staff_per_shift': int,
+    'max_patient_load': int,
+}
+
+
+class LoadReport:
+    """Kết quả 1 lần đọc CSV: số dòng, lỗi theo dòng, tốc độ"""
     
+    def __init__(self):
+        self.rows = 0
+        self.loaded = 0
+        self.errors: List[Tuple[int, str]] = []  # (số dòng trong file, thông báo)
+        self.seconds = 0.0
+    
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+    
+    def __repr__(self):
+        return (f"LoadReport(rows={self.rows}, loaded={self.loaded}, errors={len(self.errors)}, "
+                f"rows_per_second={self.rows_per_second:.0f})")
+
+
+def _convert_column(values: Tuple[str, ...], kind: type, column: str, first_line: int,
+                    bad: Dict[int, str]) -> list:
+    """Đổi kiểu cả cột 1 lần; nếu lỗi mới dò từng ô để ghi lỗi theo dòng"""
+    if kind is str:
+        return list(values)
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                # Parse eligible departments (mặc định chỉ làm khoa của mình)
-                eligible_departments = [row['department']]
+        return list(map(kind, values))
+    except ValueError:
+        converted = []
+        for i, value in enumerate(values):
+            try:
+                converted.append(kind(value))
+            except ValueError:
+                converted.append(None)
+                bad.setdefault(i, f"dòng {first_line + i}: cột {column} = {value!r} không phải {kind.__name__}")
+        return converted
+
+
+@contextmanager
+def _gc_paused():
+    """Tắt GC khi tạo hàng loạt đối tượng (GC chạy lặp lại vô ích trên các list lớn vừa tạo)"""
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _build_staff(records: List[Tuple[int, Dict]], first_line: int, trusted: bool,
+                 bad: Dict[int, str]) -> List[Staff]:
+    """
+    records: (vị trí trong lô, giá trị đã đổi kiểu) → Staff
+    Dòng không qua kiểm tra được ghi vào bad, các dòng còn lại vẫn được nạp
+    """
+    if _STAFF_BATCH is None:
+        if trusted:
+            return [Staff.construct(**values) for _, values in records]
+        batch = []
+        for i, values in records:
+            try:
+                batch.append(Staff(**values))
+            except ValueError as e:
+                bad[i] = f"dòng {first_line + i}: {e}"
+        return batch
+
+    # v2: model_construct chậm hơn kiểm tra theo lô nên trusted dùng chung đường này
+    try:
+        return _STAFF_BATCH.validate_python([values for _, values in records])
+    except ValidationError as e:
+        failed = set()
+        for error in e.errors():
+            pos, field = error['loc'][0], error['loc'][-1]
+            failed.add(pos)
+            i = records[pos][0]
+            bad.setdefault(i, f"dòng {first_line + i}: cột {field}: {error['msg']}")
+        # Kiểm tra lại phần còn lại (chỉ xảy ra với lô có lỗi)
+        return _STAFF_BATCH.validate_python([values for pos, (_, values) in enumerate(records)
+                                             if pos not in failed])
+
+
+def iter_staff_batches(filepath: str, batch_size: int = CSV_BATCH_SIZE, trusted: bool = False,
+                       report: Optional[LoadReport] = None) -> Iterator[List[Staff]]:
+    """
+    Đọc staff.csv theo lô batch_size dòng, đổi kiểu theo cột
+    trusted=True: dữ liệu tin cậy, bỏ qua kiểm tra Pydantic từng dòng (Pydantic v1: construct)
+    Dòng lỗi bị bỏ qua và ghi vào report.errors, không dừng cả file
+    """
+    report = report if report is not None else LoadReport()
+    start = time.perf_counter()
+    names = list(STAFF_COLUMNS)
+    department = names.index('department')
+    
+    with open(filepath, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        missing = [column for column in STAFF_COLUMNS if column not in header]
+        if missing:
+            raise ValueError(f"{filepath} thiếu cột: {', '.join(missing)}")
+        
+        index = {column: header.index(column) for column in header}
+        width = len(header)
+        line = 2  # Dòng 1 là header
+        
+        while True:
+            rows = list(islice(reader, batch_size))
+            if not rows:
+                break
+            
+            first_line = line
+            line += len(rows)
+            report.rows += len(rows)
+            bad: Dict[int, str] = {}
+            
+            with _gc_paused():
+                # Dòng thiếu / thừa cột
+                for i, row in enumerate(rows):
+                    if len(row) != width:
+                        bad[i] = f"dòng {first_line + i}: có {len(row)} cột, cần {width}"
+                        rows[i] = [""] * width
                 
-                staff = Staff(
-                    staff_id=row['staff_id'],
-                    department=row['department'],
-                    shift_duration_hours=int(row['shift_duration_hours']),
-                    patient_load=int(row['patient_load']),
-                    workdays_per_month=int(row['workdays_per_month']),
-                    satisfaction_score=float(row['satisfaction_score']),
-                    overtime_hours=int(row['overtime_hours']),
-                    years_of_experience=int(row['years_of_experience']),
-                    previous_satisfaction_rating=float(row['previous_satisfaction_rating']),
-                    absenteeism_days=int(row['absenteeism_days']),
-                    role=row.get('role', 'Doctor'),
-                    eligible_departments=eligible_departments
-                )
-                staff_list.append(staff)
+                columns = list(zip(*rows))
+                fields = [
+                    _convert_column(columns[index[column]], kind, column, first_line, bad)
+                    for column, kind in STAFF_COLUMNS.items()
+                ]
+                roles = columns[index['role']] if 'role' in index else ("",) * len(rows)
                 
+                records = []
+                for i, values in enumerate(zip(*fields)):
+                    if i in bad:
+                        continue
+                    # Mặc định chỉ làm khoa của mình
+                    records.append((i, dict(zip(names, values), role=roles[i] or "Doctor",
+                                            eligible_departments=[values[department]])))
+                batch = _build_staff(records, first_line, trusted, bad)
+            
+            report.errors.extend((first_line + i, message) for i, message in sorted(bad.items()))
+            report.loaded += len(batch)
+            report.seconds = time.perf_counter() - start
+            
+            if batch:
+                yield batch
+    
+    report.seconds = time.perf_counter() - start
+
+
+def load_staff_from_csv(filepath: str = "data/staff.csv", trusted: bool = False,
+                        report: Optional[LoadReport] = None) -> List[Staff]:
+    """Đọc danh sách nhân viên từ file CSV (dòng lỗi được bỏ qua và in ra)"""
+    report = report if report is not None else LoadReport()
+    staff_list = []
+    
+    try:
+        for batch in iter_staff_batches(filepath, trusted=trusted, report=report):
+            staff_list.extend(batch)
     except FileNotFoundError:
         print(f"❌ File {filepath} không tồn tại")
         return []
@@ -39,6 +207,11 @@ def load_staff_from_csv(filepath: str = "data/staff.csv") -> List[Staff]:
         traceback.print_exc()
         return []
     
+    if report.errors:
+        print(f"⚠ {filepath}: bỏ qua {len(report.errors)} dòng lỗi")
+        for _, message in report.errors[:10]:
+            print(f"   {message}")
+    
     return staff_list
 
 
@@ -103,6 +276,208 @@ def save_staff_to_csv(staff_list: List[Staff], filepath: str = "data/staff.csv")
         print(f"❌ Lỗi khi lưu file CSV: {e}")
 
 
+
+# ---------------------------------------------------------------------------
+# Snapshot nhị phân (khởi động / nạp lại nhanh, chia sẻ trang nhớ giữa các worker)
+#
+# Định dạng: MAGIC | độ dài header (uint32) | header JSON | dữ liệu (mỗi khối căn 8 byte)
+# - Cột số: mảng cố định độ rộng (<i4 / <f8), đọc thẳng từ mmap không sao chép
+# - Cột chuỗi: mã <u4 trỏ vào bảng chuỗi dùng chung (mỗi chuỗi chỉ lưu 1 lần)
+# - header["source"]: (mtime_ns, kích thước) các file CSV lúc ghi → khác thì ghi lại
+# ---------------------------------------------------------------------------
+
+SNAPSHOT_MAGIC = b"HSNAP001"
+_DTYPES = {int: "<i4", float: "<f8", str: "<u4"}
+_TABLE_COLUMNS = {
+    "staff": {**STAFF_COLUMNS, "role": str},
+    "departments": DEPARTMENT_COLUMNS,
+}
+
+
+def _source_version(paths: List[str]) -> List[List[int]]:
+    """(mtime_ns, kích thước) của từng file nguồn"""
+    version = []
+    for path in paths:
+        stat = os.stat(path)
+        version.append([stat.st_mtime_ns, stat.st_size])
+    return version
+
+
+def snapshot_path_for(staff_path: str) -> str:
+    """File snapshot mặc định: cạnh staff.csv, đuôi .snap"""
+    return os.path.splitext(staff_path)[0] + ".snap"
+
+
+def encode_snapshot(staff: List[Staff], departments: List[Department], source: List[List[int]]) -> List[bytes]:
+    """Các khối bytes của snapshot theo thứ tự (ghi nối tiếp ra file hoặc ghép lại trong bộ nhớ)"""
+    strings: Dict[str, int] = {}
+    
+    def intern(value: str) -> int:
+        if "\x00" in value:
+            raise ValueError(f"Chuỗi chứa ký tự NUL: {value!r}")
+        return strings.setdefault(value, len(strings))
+    
+    blocks = []
+    tables = {}
+    offset = 0
+    for table, items in (("staff", staff), ("departments", departments)):
+        columns = {}
+        for column, kind in _TABLE_COLUMNS[table].items():
+            values = [getattr(item, column) for item in items]
+            if kind is str:
+                values = [intern(value) for value in values]
+            data = np.asarray(values, dtype=_DTYPES[kind]).tobytes()
+            columns[column] = {"dtype": _DTYPES[kind], "offset": offset, "string": kind is str}
+            blocks.append(data + b"\x00" * (-len(data) % 8))
+            offset += len(blocks[-1])
+        tables[table] = {"rows": len(items), "columns": columns}
+    
+    text = "\x00".join(strings).encode("utf-8")
+    header = json.dumps({
+        "source": source,
+        "tables": tables,
+        "strings": {"offset": offset, "length": len(text), "count": len(strings)},
+    }).encode("utf-8")
+    prefix = SNAPSHOT_MAGIC + struct.pack("<I", len(header)) + header
+    prefix += b"\x00" * (-len(prefix) % 8)
+    return [prefix, *blocks, text]
+
+
+def write_snapshot(path: str, staff: List[Staff], departments: List[Department], source: List[List[int]]):
+    """Ghi snapshot (file tạm rồi đổi tên: worker khác không bao giờ đọc phải file dở dang)"""
+    chunks = encode_snapshot(staff, departments, source)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        for chunk in chunks:
+            f.write(chunk)
+    os.replace(tmp_path, path)
+
+
+class DataSnapshot:
+    """Snapshot đã mmap (chỉ đọc); cột số là view numpy trên trang nhớ của file"""
+    
+    def __init__(self, path: Optional[str] = None, buffer: Optional[bytes] = None):
+        # buffer: snapshot trong bộ nhớ (khi không dùng / không ghi được file snapshot)
+        self._mmap = None
+        if buffer is None:
+            with open(path, "rb") as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            buffer = self._mmap
+        self._buffer = buffer
+        
+        if buffer[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+            raise ValueError(f"{path} không phải file snapshot")
+        header_size, = struct.unpack_from("<I", buffer, len(SNAPSHOT_MAGIC))
+        header_start = len(SNAPSHOT_MAGIC) + 4
+        header = json.loads(bytes(buffer[header_start:header_start + header_size]))
+        base = header_start + header_size
+        base += -base % 8
+        
+        self.source: List[List[int]] = header["source"]
+        self.tables: Dict[str, Dict] = header["tables"]
+        self._base = base
+        self._strings_info = header["strings"]
+        self._strings: Optional[List[str]] = None
+    
+    @classmethod
+    def from_models(cls, staff: List[Staff], departments: List[Department]) -> "DataSnapshot":
+        """Snapshot trong bộ nhớ từ danh sách đã nạp (cùng giao diện với snapshot trên file)"""
+        return cls(buffer=b"".join(encode_snapshot(staff, departments, [])))
+    
+    def rows(self, table: str) -> int:
+        return self.tables[table]["rows"]
+    
+    def column(self, table: str, column: str) -> np.ndarray:
+        """Cột số (hoặc mã chuỗi) dạng view numpy, không sao chép"""
+        info = self.tables[table]["columns"][column]
+        return np.frombuffer(self._buffer, dtype=info["dtype"], count=self.rows(table),
+                             offset=self._base + info["offset"])
+    
+    @property
+    def strings(self) -> List[str]:
+        """Bảng chuỗi (giải mã 1 lần khi cần)"""
+        if self._strings is None:
+            info = self._strings_info
+            start = self._base + info["offset"]
+            text = self._buffer[start:start + info["length"]].decode("utf-8")
+            self._strings = text.split("\x00") if info["count"] else []
+        return self._strings
+    
+    def values(self, table: str, column: str, rows: Optional[np.ndarray] = None) -> list:
+        """Giá trị Python của 1 cột (chuỗi đã tra bảng); rows: chỉ lấy các dòng này"""
+        data = self.column(table, column)
+        data = (data if rows is None else data[rows]).tolist()
+        if self.tables[table]["columns"][column]["string"]:
+            strings = self.strings
+            return [strings[code] for code in data]
+        return data
+    
+    def staff(self, rows: Optional[np.ndarray] = None) -> List[Staff]:
+        """Staff của mọi dòng, hoặc chỉ các dòng rows (không dựng đối tượng cho phần còn lại)"""
+        names = list(_TABLE_COLUMNS["staff"])
+        columns = [self.values("staff", column, rows) for column in names]
+        department = names.index("department")
+        with _gc_paused():
+            records = [
+                (i, dict(zip(names, values), eligible_departments=[values[department]]))
+                for i, values in enumerate(zip(*columns))
+            ]
+            return _build_staff(records, 0, True, {})
+    
+    def departments(self) -> List[Department]:
+        names = list(DEPARTMENT_COLUMNS)
+        columns = [self.values("departments", column) for column in names]
+        return [Department(**dict(zip(names, values))) for values in zip(*columns)]
+    
+    def close(self):
+        """Bỏ mmap; nếu còn view numpy đang được dùng, trang nhớ được giải phóng khi view cuối cùng bị thu hồi"""
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                pass
+
+
+def open_snapshot(staff_path: str, departments_path: str,
+                  snapshot_path: Optional[str] = None) -> DataSnapshot:
+    """Mở snapshot; tạo lại từ CSV nếu chưa có hoặc CSV đã thay đổi từ lần ghi trước"""
+    snapshot_path = snapshot_path or snapshot_path_for(staff_path)
+    source = _source_version([staff_path, departments_path])
+    
+    if os.path.exists(snapshot_path):
+        try:
+            snapshot = DataSnapshot(snapshot_path)
+            if snapshot.source == source:
+                return snapshot
+            snapshot.close()
+        except (ValueError, KeyError, struct.error) as e:
+            print(f"⚠ Snapshot {snapshot_path} hỏng, tạo lại: {e}")
+    
+    start = time.perf_counter()
+    staff = load_staff_from_csv(staff_path)
+    departments = load_departments_from_csv(departments_path)
+    write_snapshot(snapshot_path, staff, departments, source)
+    print(f"✓ Đã ghi snapshot {snapshot_path} ({len(staff)} nhân viên, "
+          f"{time.perf_counter() - start:.2f}s)")
+    return DataSnapshot(snapshot_path)
+
+
+def load_data(staff_path: str, departments_path: str,
+              use_snapshot: bool = DATA_SNAPSHOT_ENABLED) -> DataSnapshot:
+    """
+    Nhân viên + khoa dạng snapshot (cột numpy, Staff dựng lười theo dòng)
+    Qua file snapshot nếu bật; tắt hoặc lỗi ghi snapshot → đọc thẳng CSV vào snapshot trong bộ nhớ
+    Người gọi giữ snapshot và close() khi không dùng nữa
+    """
+    if use_snapshot:
+        try:
+            return open_snapshot(staff_path, departments_path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"⚠ Không dùng được snapshot: {e}")
+    return DataSnapshot.from_models(load_staff_from_csv(staff_path), load_departments_from_csv(departments_path))
+
 # Test function
 if __name__ == "__main__":
     print("="*60)
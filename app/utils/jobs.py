@@ -0,0 +1,207 @@
+"""
+Quản lý job xếp lịch chạy nền
+GA chạy trong thread pool giới hạn, web tier chỉ nhận job và trả trạng thái
+"""
+import json
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Dict, Optional, Iterator, Tuple
+from app.config import (JOB_MAX_WORKERS, JOB_QUEUE_LIMIT, JOB_RETENTION_SECONDS,
+                        PROGRESS_STREAM_INTERVAL, PROGRESS_STREAM_KEEPALIVE)
+from app.schemas.schedule import ScheduleRequest, ScheduleResponse, JobStatus
+from app.engine.ga_scheduler import BaseScheduler, create_scheduler, generate_schedule
+from app.utils.result_cache import ResultCache
+from app.utils.metrics import MetricsRegistry
+
+
+class QueueFullError(Exception):
+    """Hàng đợi job đã đầy"""
+
+
+class Job:
+    """1 lần chạy GA nền"""
+
+    def __init__(self, payload: ScheduleRequest):
+        self.job_id = uuid.uuid4().hex
+        self.payload = payload
+        self.status = "queued"
+        self.progress: Dict = {}
+        self.result: Optional[ScheduleResponse] = None
+        self.error: Optional[str] = None
+        self.scheduler: Optional[BaseScheduler] = None
+        self.future: Optional[Future] = None
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._cancel_requested = False
+        # Tăng mỗi khi có tiến trình mới hoặc job kết thúc (cho luồng SSE)
+        self.version = 0
+        self._changed = threading.Condition()
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in ("completed", "failed", "cancelled")
+
+    def on_generation(self, event: Dict):
+        """Listener của scheduler: lưu tiến trình mới nhất"""
+        with self._changed:
+            self.progress = event
+            self.version += 1
+            self._changed.notify_all()
+
+    def finish(self, status: str):
+        """Đánh dấu job kết thúc và đánh thức các luồng đang chờ"""
+        with self._changed:
+            self.status = status
+            self.finished_at = time.time()
+            self.version += 1
+            self._changed.notify_all()
+
+    def wait_for_update(self, version: int, timeout: float) -> Tuple[int, bool]:
+        """Chờ tới khi version thay đổi (hoặc hết timeout); trả về (version, đã kết thúc)"""
+        with self._changed:
+            self._changed.wait_for(lambda: self.version != version or self.is_finished, timeout)
+            return self.version, self.is_finished
+
+    def stream_events(self, min_interval: float = PROGRESS_STREAM_INTERVAL,
+                      keepalive: float = PROGRESS_STREAM_KEEPALIVE) -> Iterator[str]:
+        """
+        Luồng Server-Sent Events: "progress" mỗi thế hệ, "done" khi kết thúc
+        Giới hạn tối đa 1 sự kiện / min_interval; các thế hệ ở giữa được gộp (chỉ gửi bản mới nhất)
+        """
+        version = -1
+        while True:
+            new_version, finished = self.wait_for_update(version, keepalive)
+
+            if new_version == version and not finished:
+                yield ": keep-alive\n\n"
+                continue
+
+            version = new_version
+            if self.progress:
+                yield f"event: progress\ndata: {json.dumps(self.progress)}\n\n"
+
+            if finished:
+                status = self.to_status()
+                data = status.model_dump_json() if hasattr(status, 'model_dump_json') else status.json()
+                yield f"event: done\ndata: {data}\n\n"
+                return
+
+            time.sleep(min_interval)
+
+    def to_status(self) -> JobStatus:
+        if self.started_at is None:
+            elapsed = 0.0
+        else:
+            elapsed = (self.finished_at or time.time()) - self.started_at
+
+        return JobStatus(
+            job_id=self.job_id,
+            status=self.status,
+            generation=self.progress.get("generation", 0),
+            max_generations=self.payload.max_generations,
+            best_fitness=self.progress.get("best_fitness"),
+            hard_violations=self.progress.get("hard_violations"),
+            elapsed=elapsed,
+            error=self.error
+        )
+
+
+class JobManager:
+    """Nhận job, chạy trong executor giới hạn, theo dõi trạng thái và hủy"""
+
+    def __init__(self, max_workers: int = JOB_MAX_WORKERS, queue_limit: int = JOB_QUEUE_LIMIT,
+                 retention_seconds: float = JOB_RETENTION_SECONDS, cache: ResultCache = None,
+                 metrics: MetricsRegistry = None):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="schedule-job")
+        self.queue_limit = queue_limit
+        self.retention_seconds = retention_seconds
+        self.cache = cache
+        self.metrics = metrics
+        self.jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+        
+        if metrics is not None:
+            metrics.register_gauge("shiftgenix_jobs", "Số job theo trạng thái (độ sâu hàng đợi)",
+                                   lambda: {(("status", status),): count
+                                            for status, count in self.status_counts().items()})
+
+    def active_count(self) -> int:
+        """Số job đang chờ hoặc đang chạy"""
+        return sum(1 for job in self.jobs.values() if not job.is_finished)
+
+    def status_counts(self) -> Dict[str, int]:
+        """Số job đang chờ / đang chạy"""
+        counts = {"queued": 0, "running": 0}
+        for job in list(self.jobs.values()):
+            if job.status in counts:
+                counts[job.status] += 1
+        return counts
+    
+    def submit(self, payload: ScheduleRequest) -> Job:
+        """Đưa job vào hàng đợi; QueueFullError nếu đã đủ queue_limit job chưa xong"""
+        with self._lock:
+            self._prune()
+            if self.active_count() >= self.queue_limit:
+                raise QueueFullError(f"Hàng đợi đã đầy ({self.queue_limit} job)")
+
+            job = Job(payload)
+            self.jobs[job.job_id] = job
+            job.future = self.executor.submit(self._run, job)
+
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """Hủy job: bỏ khỏi hàng đợi nếu chưa chạy, hoặc dừng ở cuối thế hệ hiện tại"""
+        job = self.jobs.get(job_id)
+        if job is None or job.is_finished:
+            return job
+
+        job._cancel_requested = True
+        if job.future.cancel():
+            job.finish("cancelled")
+        elif job.scheduler is not None:
+            job.scheduler.request_stop()
+
+        return job
+
+    def _run(self, job: Job):
+        job.started_at = time.time()
+        job.status = "running"
+
+        try:
+            job.scheduler = create_scheduler(job.payload)
+            job.scheduler.add_listener(job.on_generation)
+            if job._cancel_requested:
+                job.scheduler.request_stop()
+
+            job.result = generate_schedule(job.payload, scheduler=job.scheduler, cache=self.cache,
+                                           metrics=self.metrics)
+            job.finish("cancelled" if job.scheduler.stop_reason == "cancelled" else "completed")
+        except Exception as e:
+            job.error = str(e)
+            job.finish("failed")
+            traceback.print_exc()
+        finally:
+            # Giải phóng quần thể, chỉ giữ kết quả
+            job.scheduler = None
+
+    def _prune(self):
+        """Xóa job đã xong quá thời gian lưu giữ"""
+        now = time.time()
+        expired = [
+            job_id for job_id, job in self.jobs.items()
+            if job.is_finished and now - job.finished_at > self.retention_seconds
+        ]
+        for job_id in expired:
+            del self.jobs[job_id]
+
+    def shutdown(self):
+        for job in list(self.jobs.values()):
+            self.cancel(job.job_id)
+        self.executor.shutdown(wait=False, cancel_futures=True)
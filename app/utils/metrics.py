@@ -0,0 +1,186 @@
+"""
+Số liệu vận hành dạng Prometheus (GET /metrics)
+Bộ đếm / gauge / histogram tối giản, xuất ra text format 0.0.4, không cần thư viện ngoài
+Khi tắt (METRICS_ENABLED = False) mọi hàm record_* trả về ngay
+"""
+import threading
+from typing import Callable, Dict, Iterator, Optional, Tuple
+from app.config import METRICS_ENABLED
+
+# Mốc histogram thời gian (giây): request HTTP ngắn và lần chạy GA dài
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+RUN_BUCKETS = (0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _format_labels(labels: Labels, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def route_template(scope: Dict) -> str:
+    """Route dạng mẫu của request (vd. /api/v1/staff/{staff_id}) để nhãn không bùng nổ theo tham số"""
+    route = scope.get("route")
+    if route is None or not hasattr(route, "path_regex"):
+        return "unmatched"
+    path = scope["path"]
+    if route.path_regex.match(path):
+        return route.path
+    # Route của router con có thể không mang prefix → tìm prefix bằng cách khớp phần đuôi
+    for i, char in enumerate(path):
+        if char == "/" and i > 0 and route.path_regex.match(path[i:]):
+            return path[:i] + route.path
+    return route.path
+
+
+class Metric:
+    """1 metric có nhãn: giá trị theo bộ nhãn"""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self.values: Dict[Labels, float] = {}
+
+    def samples(self) -> Iterator[str]:
+        for labels, value in self.values.items():
+            yield f"{self.name}{_format_labels(labels)} {_format_value(value)}"
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, labels: Labels = (), amount: float = 1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+
+class Gauge(Metric):
+    """Gauge đọc giá trị lúc xuất qua hàm callback (vd. độ dài hàng đợi job)"""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, read: Callable[[], Dict[Labels, float]] = None):
+        super().__init__(name, help_text)
+        self.read = read
+
+    def samples(self) -> Iterator[str]:
+        if self.read is not None:
+            self.values = dict(self.read())
+        return super().samples()
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, buckets: Tuple[float, ...]):
+        super().__init__(name, help_text)
+        self.buckets = tuple(buckets) + (float("inf"),)
+        # nhãn → (số đếm theo mốc, tổng, số lần)
+        self.series: Dict[Labels, list] = {}
+
+    def observe(self, value: float, labels: Labels = ()):
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [[0] * len(self.buckets), 0.0, 0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[0][i] += 1
+                break
+        series[1] += value
+        series[2] += 1
+
+    def samples(self) -> Iterator[str]:
+        for labels, (counts, total, count) in self.series.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}"
+            yield f"{self.name}_count{_format_labels(labels)} {count}"
+
+
+class MetricsRegistry:
+    """Các metric của server (HTTP, hàng đợi job, lần chạy GA và thời gian theo pha)"""
+
+    def __init__(self, enabled: bool = METRICS_ENABLED):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.metrics: Dict[str, Metric] = {}
+
+        self.http_requests = self.add(Counter(
+            "shiftgenix_http_requests_total", "Số request HTTP theo method, route và mã trạng thái"))
+        self.http_latency = self.add(Histogram(
+            "shiftgenix_http_request_duration_seconds", "Thời gian xử lý request HTTP theo route",
+            REQUEST_BUCKETS))
+        self.runs = self.add(Counter(
+            "shiftgenix_schedule_runs_total", "Số lần chạy GA theo lý do dừng"))
+        self.cache_hits = self.add(Counter(
+            "shiftgenix_schedule_cache_hits_total", "Số request xếp lịch trả từ cache"))
+        self.run_duration = self.add(Histogram(
+            "shiftgenix_schedule_duration_seconds", "Thời gian 1 lần chạy GA", RUN_BUCKETS))
+        self.generations = self.add(Counter(
+            "shiftgenix_ga_generations_total", "Tổng số thế hệ đã chạy"))
+        self.phase_seconds = self.add(Counter(
+            "shiftgenix_ga_phase_seconds_total", "Thời gian GA cộng dồn theo pha"))
+        self.operations = self.add(Counter(
+            "shiftgenix_ga_operations_total", "Số lần đánh giá fitness / sao chép cá thể"))
+
+    def add(self, metric: Metric) -> Metric:
+        self.metrics[metric.name] = metric
+        return metric
+
+    def register_gauge(self, name: str, help_text: str, read: Callable[[], Dict[Labels, float]]):
+        """Gauge tính lúc xuất (read trả về {nhãn: giá trị})"""
+        self.add(Gauge(name, help_text, read))
+
+    def record_request(self, method: str, path: str, status: int, seconds: float):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.http_requests.inc((("method", method), ("path", path), ("status", str(status))))
+            self.http_latency.observe(seconds, (("path", path),))
+
+    def record_cache_hit(self):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.cache_hits.inc()
+
+    def record_run(self, stop_reason: Optional[str], seconds: float, profile: Optional[Dict]):
+        """1 lần chạy GA xong; profile = ScheduleResponse.profile (None nếu tắt profiling)"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.runs.inc((("stop_reason", stop_reason or "unknown"),))
+            self.run_duration.observe(seconds)
+            if profile:
+                self.generations.inc(amount=profile["generations"])
+                for phase, times in profile["phases"].items():
+                    self.phase_seconds.inc((("phase", phase),), times["total"])
+                for name, count in profile["counts"].items():
+                    self.operations.inc((("operation", name),), count)
+
+    def render(self) -> str:
+        """Toàn bộ metric theo Prometheus text format"""
+        lines = []
+        with self._lock:
+            for metric in self.metrics.values():
+                lines.append(f"# HELP {metric.name} {metric.help_text}")
+                lines.append(f"# TYPE {metric.name} {metric.kind}")
+                lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
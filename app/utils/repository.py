@@ -0,0 +1,183 @@
+"""
+Kho dữ liệu nhân viên / khoa trong bộ nhớ
+Nạp CSV 1 lần (qua snapshot nhị phân), tự nạp lại khi mtime của file thay đổi; giữ sẵn chỉ mục,
+thống kê và JSON đã serialize để các GET lặp lại không phải parse hay model_dump.
+Chỉ mục và thống kê tính trên cột numpy của snapshot; Staff chỉ được dựng khi cần (theo id / theo trang)
+"""
+import json
+import os
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+from app.config import STAFF_CSV_PATH, DEPARTMENTS_CSV_PATH
+from app.schemas.schedule import Staff, Department
+from app.utils.data_loader import DataSnapshot, load_data
+
+# Số Staff dựng mỗi lần khi serialize cả danh sách (giới hạn số đối tượng Pydantic sống cùng lúc)
+PAGE_SIZE = 5000
+
+
+def _dump(model) -> dict:
+    return model.model_dump() if hasattr(model, 'model_dump') else model.dict()
+
+
+def _version(path: str) -> Optional[Tuple[int, int]]:
+    """(mtime, kích thước) của file; None nếu không tồn tại"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _encode(body: Dict) -> bytes:
+    # Cùng định dạng với JSONResponse của FastAPI
+    return json.dumps(body, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def _groups(codes: np.ndarray) -> List[Tuple[int, np.ndarray]]:
+    """(mã, các dòng mang mã đó) theo thứ tự xuất hiện đầu tiên của mỗi mã"""
+    order = np.argsort(codes, kind="stable")
+    values, starts = np.unique(codes[order], return_index=True)
+    groups = np.split(order, starts[1:])
+    return sorted(zip(values.tolist(), groups), key=lambda group: group[1][0])
+
+
+class RepositorySnapshot:
+    """Dữ liệu của 1 phiên bản file CSV (chỉ đọc, dùng chung giữa các request); snapshot được giải phóng khi không còn request nào giữ"""
+
+    def __init__(self, data: DataSnapshot):
+        self.data = data
+        self.departments: List[Department] = data.departments()
+        self.staff_count = data.rows("staff")
+        strings = data.strings
+
+        # Chỉ mục: staff_id → dòng, khoa → các dòng (không dựng Staff)
+        self.staff_rows: Dict[str, int] = {
+            staff_id: row for row, staff_id in enumerate(data.values("staff", "staff_id"))
+        }
+        self.department_rows: Dict[str, np.ndarray] = {
+            strings[code]: rows for code, rows in _groups(data.column("staff", "department"))
+        }
+
+        self.statistics = self.compute_statistics()
+        # Response đã serialize: khóa → bytes JSON
+        self._responses: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def compute_statistics(self) -> Dict:
+        """Thống kê tổng quan trên cột numpy (tính 1 lần khi nạp)"""
+        data, count = self.data, self.staff_count
+        strings = data.strings
+        role_count = {strings[code]: len(rows) for code, rows in _groups(data.column("staff", "role"))}
+        avg_experience = float(data.column("staff", "years_of_experience").mean()) if count else 0
+        avg_satisfaction = float(data.column("staff", "satisfaction_score").mean()) if count else 0
+
+        return {
+            "total_staff": count,
+            "total_departments": len(self.departments),
+            "by_role": role_count,
+            "by_department": {dept: len(rows) for dept, rows in self.department_rows.items()},
+            "average_experience": round(avg_experience, 1),
+            "average_satisfaction": round(avg_satisfaction, 2)
+        }
+
+    def staff_at(self, rows: np.ndarray) -> List[Staff]:
+        """Dựng Staff của các dòng rows từ snapshot"""
+        return self.data.staff(rows)
+
+    def get_staff(self, staff_id: str) -> Optional[Staff]:
+        row = self.staff_rows.get(staff_id)
+        return None if row is None else self.staff_at(np.array([row]))[0]
+
+    def staff_page(self, offset: int = 0, limit: Optional[int] = None) -> List[Staff]:
+        """Staff theo trang [offset, offset + limit); limit=None: tới hết danh sách"""
+        stop = self.staff_count if limit is None else min(offset + limit, self.staff_count)
+        return self.staff_at(np.arange(offset, stop)) if offset < stop else []
+
+    def dump_rows(self, rows: np.ndarray) -> List[Dict]:
+        """Dict của các dòng rows, dựng Staff theo từng trang PAGE_SIZE"""
+        return [_dump(s) for start in range(0, len(rows), PAGE_SIZE)
+                for s in self.staff_at(rows[start:start + PAGE_SIZE])]
+
+    def response(self, key: str, build: Callable[[], Dict]) -> bytes:
+        """JSON của response (build chỉ chạy lần đầu với mỗi khóa)"""
+        body = self._responses.get(key)
+        if body is None:
+            body = _encode(build())
+            with self._lock:
+                self._responses[key] = body
+        return body
+
+    def staff_json(self) -> bytes:
+        return self.response("staff", lambda: {
+            "success": True,
+            "count": self.staff_count,
+            "data": self.dump_rows(np.arange(self.staff_count))
+        })
+
+    def staff_page_json(self, offset: int, limit: int) -> bytes:
+        """1 trang danh sách nhân viên (không lưu lại: mỗi trang chỉ dựng limit Staff)"""
+        page = self.staff_page(offset, limit)
+        return _encode({
+            "success": True,
+            "count": len(page),
+            "total": self.staff_count,
+            "offset": offset,
+            "data": [_dump(s) for s in page]
+        })
+
+    def departments_json(self) -> bytes:
+        return self.response("departments", lambda: {
+            "success": True,
+            "count": len(self.departments),
+            "data": [_dump(d) for d in self.departments]
+        })
+
+    def staff_by_department_json(self) -> bytes:
+        return self.response("staff-by-department", lambda: {
+            "success": True,
+            "departments": list(self.department_rows.keys()),
+            "data": {dept: self.dump_rows(rows) for dept, rows in self.department_rows.items()}
+        })
+
+    def staff_detail_json(self, staff_id: str) -> Optional[bytes]:
+        if staff_id not in self.staff_rows:
+            return None
+        return self.response(f"staff/{staff_id}", lambda: {"success": True, "data": _dump(self.get_staff(staff_id))})
+
+    def statistics_json(self) -> bytes:
+        return self.response("statistics", lambda: {"success": True, **self.statistics})
+
+
+class DataRepository:
+    """Nạp lười và nạp lại khi file CSV thay đổi"""
+
+    def __init__(self, staff_path: str = STAFF_CSV_PATH, departments_path: str = DEPARTMENTS_CSV_PATH):
+        self.staff_path = staff_path
+        self.departments_path = departments_path
+        self._snapshot: Optional[RepositorySnapshot] = None
+        self._versions: Optional[Tuple] = None
+        self._lock = threading.Lock()
+
+    def snapshot(self) -> RepositorySnapshot:
+        """Dữ liệu hiện tại; chỉ stat 2 file nếu không có gì thay đổi"""
+        versions = (_version(self.staff_path), _version(self.departments_path))
+        if self._snapshot is not None and versions == self._versions:
+            return self._snapshot
+
+        with self._lock:
+            if self._snapshot is None or versions != self._versions:
+                # Không đóng snapshot cũ: request đang giữ vẫn đọc được, mmap được bỏ khi tham chiếu cuối bị thu hồi
+                self._snapshot = RepositorySnapshot(load_data(self.staff_path, self.departments_path))
+                self._versions = versions
+            return self._snapshot
+
+    @property
+    def staff(self) -> List[Staff]:
+        """Toàn bộ Staff (dựng mới mỗi lần gọi; API dùng chỉ mục / trang thay vì thuộc tính này)"""
+        return self.snapshot().staff_page()
+
+    @property
+    def departments(self) -> List[Department]:
+        return self.snapshot().departments
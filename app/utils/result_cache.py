@@ -0,0 +1,165 @@
+"""
+Cache kết quả xếp lịch theo nội dung request
+Khóa = sha256 của request (dạng JSON chuẩn hóa, gồm cả seed);
+lưu trong bộ nhớ (LRU + TTL), tùy chọn ghi thêm ra đĩa để giữ qua lần khởi động lại
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Tuple
+from app.config import (RESULT_CACHE_SIZE, RESULT_CACHE_TTL_SECONDS, RESULT_CACHE_DIR,
+                        RESULT_CACHE_UNSEEDED)
+from app.schemas.schedule import ScheduleRequest, ScheduleResponse
+
+# Trường không ảnh hưởng tới kết quả (cùng seed → cùng lịch với mọi parallelism)
+IGNORED_FIELDS = {"parallelism", "cache"}
+
+
+def _dump(model) -> dict:
+    return model.model_dump() if hasattr(model, 'model_dump') else model.dict()
+
+
+def _parse(data: dict) -> ScheduleResponse:
+    if hasattr(ScheduleResponse, 'model_validate'):
+        return ScheduleResponse.model_validate(data)
+    return ScheduleResponse.parse_obj(data)
+
+
+def request_key(payload: ScheduleRequest) -> str:
+    """Hash chuẩn hóa của request: thứ tự khóa dict không ảnh hưởng"""
+    data = {k: v for k, v in _dump(payload).items() if k not in IGNORED_FIELDS}
+    canonical = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def is_cacheable(payload: ScheduleRequest, unseeded_default: bool = RESULT_CACHE_UNSEEDED) -> bool:
+    """
+    Request có seed: dùng cache trừ khi cache=False
+    Request không seed: kết quả ngẫu nhiên → chỉ dùng cache khi cache=True (hoặc mặc định cấu hình)
+    Request có time_limit_seconds: lịch phụ thuộc tốc độ máy lúc chạy nên không lặp lại được
+    dù có seed → chỉ dùng cache khi cache=True
+    """
+    if payload.cache is not None:
+        return payload.cache
+    if payload.time_limit_seconds is not None:
+        return False
+    return payload.seed is not None or unseeded_default
+
+
+class ResultCache:
+    """LRU + TTL trong bộ nhớ, tùy chọn ghi ra thư mục (mỗi kết quả 1 file JSON)"""
+
+    def __init__(self, max_size: int = RESULT_CACHE_SIZE, ttl_seconds: float = RESULT_CACHE_TTL_SECONDS,
+                 directory: Optional[str] = RESULT_CACHE_DIR):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.directory = Path(directory) if directory else None
+        # key → (thời điểm tạo, response)
+        self._entries: "OrderedDict[str, Tuple[float, ScheduleResponse]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        if self.directory is not None:
+            try:
+                self.directory.mkdir(parents=True, exist_ok=True)
+            except OSError as e:
+                print(f"Không tạo được thư mục cache {self.directory}, chỉ cache trong bộ nhớ: {e}")
+                self.directory = None
+
+    def _expired(self, created: float) -> bool:
+        return self.ttl_seconds is not None and time.time() - created > self.ttl_seconds
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, key: str) -> Optional[ScheduleResponse]:
+        """Lấy kết quả còn hạn (bộ nhớ trước, rồi tới đĩa)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry[0]):
+                del self._entries[key]
+                entry = None
+
+            if entry is None:
+                entry = self._load(key)
+                if entry is not None:
+                    self._store(key, entry)
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: str, response: ScheduleResponse):
+        """
+        Lưu kết quả (và ghi ra đĩa nếu có thư mục)
+        Lỗi ghi đĩa (đầy, chỉ đọc...) chỉ được log: kết quả GA vẫn được trả về và giữ trong bộ nhớ
+        """
+        entry = (time.time(), response)
+        with self._lock:
+            self._store(key, entry)
+            try:
+                self._save(key, entry)
+            except OSError as e:
+                print(f"Không ghi được cache ra đĩa ({self._path(key)}): {e}")
+
+    def _store(self, key: str, entry: Tuple[float, ScheduleResponse]):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def _load(self, key: str) -> Optional[Tuple[float, ScheduleResponse]]:
+        if self.directory is None:
+            return None
+
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            entry = (data["created"], _parse(data["response"]))
+        except FileNotFoundError:
+            return None
+        except (ValueError, KeyError) as e:
+            print(f"Bỏ qua file cache hỏng {path}: {e}")
+            path.unlink(missing_ok=True)
+            return None
+
+        if self._expired(entry[0]):
+            path.unlink(missing_ok=True)
+            return None
+        return entry
+
+    def _save(self, key: str, entry: Tuple[float, ScheduleResponse]):
+        if self.directory is None:
+            return
+
+        # Ghi file tạm rồi đổi tên → không để lại file dở dang
+        path = self._path(key)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"created": entry[0], "response": _dump(entry[1])}, f)
+            os.replace(tmp_path, path)
+        except OSError:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+    def clear(self):
+        """Xóa toàn bộ cache (cả trên đĩa)"""
+        with self._lock:
+            self._entries.clear()
+            if self.directory is not None:
+                for path in self.directory.glob("*.json"):
+                    path.unlink(missing_ok=True)
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,46 @@
+"""
+Benchmark giải tách theo khoa: GA toàn cục vs GA con theo từng khoa (tuần tự / song song)
+So sánh ở cùng số thế hệ và cùng ngân sách thời gian
+Chạy: python -m benchmarks.bench_decomposition [staff] [departments] [days] [generations] [workers]
+"""
+import contextlib
+import io
+import sys
+import time
+from app.engine.ga_scheduler import generate_schedule
+from benchmarks.synthetic import make_request
+
+
+def run(num_staff: int, num_departments: int, days: int, **kwargs):
+    payload = make_request(num_staff, num_departments, days, seed=3, population_size=40,
+                           min_hours_per_month=0, cache=False, **kwargs)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = generate_schedule(payload)
+    return time.perf_counter() - start, result
+
+
+def bench(num_staff: int, num_departments: int, days: int, generations: int, workers: int):
+    print(f"{num_staff} nhân viên, {num_departments} khoa, {days} ngày")
+    modes = {
+        "toàn cục": {},
+        "tách, tuần tự": {"decompose": True},
+        f"tách, {workers} tiến trình": {"decompose": True, "parallelism": workers},
+    }
+    print(f"{'chế độ':<22} {'giới hạn':>14} {'giây':>7} {'fitness':>9} {'vi phạm':>8}")
+    for name, options in modes.items():
+        elapsed, result = run(num_staff, num_departments, days, max_generations=generations, **options)
+        print(f"{name:<22} {f'{generations} thế hệ':>14} {elapsed:>7.2f} {result.fitness_score:>9.2f} "
+              f"{result.hard_violations:>8}")
+    for name, options in modes.items():
+        for limit in (1.0, 3.0):
+            elapsed, result = run(num_staff, num_departments, days, max_generations=100000,
+                                  time_limit_seconds=limit, **options)
+            print(f"{name:<22} {f'{limit:.0f} giây':>14} {elapsed:>7.2f} {result.fitness_score:>9.2f} "
+                  f"{result.hard_violations:>8}")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    defaults = [400, 20, 30, 60, 4]
+    bench(*(args + defaults[len(args):]))
@@ -0,0 +1,64 @@
+"""
+Benchmark khởi tạo quần thể: ngẫu nhiên đều vs tham lam có ràng buộc
+So sánh số vi phạm cứng ở thế hệ 0 và thời gian / số thế hệ tới khi hết vi phạm
+Chạy: python -m benchmarks.bench_initializer [staff] [departments] [days] [population] [max_generations]
+"""
+import sys
+import time
+from app.engine.ga_scheduler import GeneticScheduler
+from benchmarks.synthetic import make_request
+
+
+def run(initializer: str, num_staff: int, num_departments: int, days: int,
+        population_size: int, max_generations: int, seed: int) -> dict:
+    payload = make_request(num_staff, num_departments, days, seed=seed,
+                           population_size=population_size, max_generations=max_generations,
+                           min_hours_per_month=0, initializer=initializer)
+    scheduler = GeneticScheduler(payload, verbose=False)
+
+    start = time.perf_counter()
+    scheduler.start()
+    init_time = time.perf_counter() - start
+    violations = [individual.hard_violations for individual in scheduler.population]
+
+    result = {
+        "init_time": init_time,
+        "best_violations": min(violations),
+        "mean_violations": sum(violations) / len(violations),
+        "feasible_generation": None,
+        "feasible_time": None,
+    }
+
+    generation = 0
+    while True:
+        if scheduler.best_individual.hard_violations == 0:
+            result["feasible_generation"] = generation
+            result["feasible_time"] = time.perf_counter() - start
+            break
+        if generation >= max_generations:
+            break
+        scheduler.step()
+        generation += 1
+
+    return result
+
+
+def bench(num_staff: int, num_departments: int, days: int, population_size: int,
+          max_generations: int, seeds: int = 3):
+    print(f"{num_staff} nhân viên, {num_departments} khoa, {days} ngày, quần thể {population_size}")
+    print(f"{'khởi tạo':>9} {'seed':>5} {'t khởi tạo':>11} {'VP tốt nhất':>12} {'VP TB':>8} "
+          f"{'thế hệ→0':>9} {'giây→0':>8}")
+
+    for initializer in ("random", "greedy"):
+        for seed in range(seeds):
+            r = run(initializer, num_staff, num_departments, days, population_size, max_generations, seed)
+            generation = "-" if r["feasible_generation"] is None else r["feasible_generation"]
+            seconds = "-" if r["feasible_time"] is None else f"{r['feasible_time']:.2f}"
+            print(f"{initializer:>9} {seed:>5} {r['init_time']:>11.3f} {r['best_violations']:>12} "
+                  f"{r['mean_violations']:>8.1f} {generation:>9} {seconds:>8}")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    defaults = [200, 20, 30, 50, 300]
+    bench(*(args + defaults[len(args):]))
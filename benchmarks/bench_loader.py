@@ -0,0 +1,115 @@
+"""
+Benchmark đọc staff.csv lớn: loader cũ (DictReader + Staff từng dòng) vs loader theo lô vs snapshot nhị phân
+Chạy: python -m benchmarks.bench_loader [rows]
+"""
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from app.schemas.schedule import Staff
+from app.utils.data_loader import (STAFF_COLUMNS, DataSnapshot, iter_staff_batches, load_staff_from_csv,
+                                   open_snapshot)
+from app.utils.repository import RepositorySnapshot
+
+
+def write_csv(path: str, rows: int, seed: int = 0):
+    """Sinh file staff.csv giả lập"""
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(list(STAFF_COLUMNS) + ["role"])
+        for i in range(rows):
+            writer.writerow([
+                f"S{i + 1:06d}", f"Department{i % 50 + 1:03d}", rng.choice([8, 10, 12]),
+                rng.randint(5, 20), rng.randint(15, 22), round(rng.uniform(1, 5), 2),
+                rng.randint(0, 20), rng.randint(0, 30), round(rng.uniform(1, 5), 2),
+                rng.randint(0, 5), rng.choice(["Doctor", "Nurse"]),
+            ])
+
+
+def legacy_load(path: str):
+    """Loader trước đây: DictReader, int()/float() từng ô, Staff từng dòng"""
+    staff_list = []
+    with open(path, "r", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            staff_list.append(Staff(
+                staff_id=row['staff_id'],
+                department=row['department'],
+                shift_duration_hours=int(row['shift_duration_hours']),
+                patient_load=int(row['patient_load']),
+                workdays_per_month=int(row['workdays_per_month']),
+                satisfaction_score=float(row['satisfaction_score']),
+                overtime_hours=int(row['overtime_hours']),
+                years_of_experience=int(row['years_of_experience']),
+                previous_satisfaction_rating=float(row['previous_satisfaction_rating']),
+                absenteeism_days=int(row['absenteeism_days']),
+                role=row.get('role', 'Doctor'),
+                eligible_departments=[row['department']]
+            ))
+    return staff_list
+
+
+def stream_count(path: str, trusted: bool):
+    """Chỉ duyệt các lô, không giữ toàn bộ danh sách"""
+    return sum(len(batch) for batch in iter_staff_batches(path, trusted=trusted))
+
+
+def snapshot_columns(path: str) -> int:
+    """Mở mmap và tính 1 thống kê trên cột số (không tạo đối tượng Staff)"""
+    snapshot = DataSnapshot(path)
+    snapshot.column("staff", "years_of_experience").mean()
+    rows = snapshot.rows("staff")
+    snapshot.close()
+    return rows
+
+
+def repository_load(path: str) -> int:
+    """Kho dữ liệu của API: chỉ mục + thống kê trên cột, Staff dựng lười"""
+    snapshot = RepositorySnapshot(DataSnapshot(path))
+    snapshot.close()
+    return snapshot.staff_count
+
+
+def measure(name: str, rows: int, fn, repeats: int = 3):
+    """Thời gian tốt nhất sau repeats lần + bộ nhớ đỉnh (lần chạy riêng, tracemalloc làm chậm đáng kể)"""
+    elapsed = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = min(elapsed, time.perf_counter() - start)
+        count = result if isinstance(result, int) else len(result)
+        del result
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<28} {elapsed:>7.2f}s {rows / elapsed:>12,.0f} dòng/s {peak / 2**20:>9.1f} MB  ({count} dòng)")
+
+
+def bench(rows: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "staff.csv")
+        write_csv(path, rows)
+        print(f"{rows} dòng, {os.path.getsize(path) / 2**20:.1f} MB")
+
+        measure("cũ (DictReader)", rows, lambda: legacy_load(path))
+        measure("theo lô, kiểm tra", rows, lambda: load_staff_from_csv(path))
+        measure("theo lô, trusted", rows, lambda: load_staff_from_csv(path, trusted=True))
+        measure("stream, trusted", rows, lambda: stream_count(path, trusted=True))
+
+        departments = "app/data/departments.csv"
+        snapshot_path = os.path.join(tmp, "staff.snap")
+        start = time.perf_counter()
+        open_snapshot(path, departments, snapshot_path).close()
+        print(f"ghi snapshot: {time.perf_counter() - start:.2f}s, {os.path.getsize(snapshot_path) / 2**20:.1f} MB")
+        measure("snapshot: mở + cột số", rows, lambda: snapshot_columns(snapshot_path))
+        measure("snapshot: → Staff", rows, lambda: DataSnapshot(snapshot_path).staff())
+        measure("kho dữ liệu (lười)", rows, lambda: repository_load(snapshot_path))
+
+
+if __name__ == "__main__":
+    bench(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
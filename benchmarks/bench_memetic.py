@@ -0,0 +1,42 @@
+"""
+Benchmark pha memetic: GA thuần vs GA + leo đồi trên top-k
+So sánh fitness tốt nhất theo thời gian chạy
+Chạy: python -m benchmarks.bench_memetic [staff] [departments] [days] [population] [generations] [top_k]
+"""
+import sys
+import time
+from app.engine.ga_scheduler import GeneticScheduler
+from benchmarks.synthetic import make_request
+
+
+def run(num_staff: int, num_departments: int, days: int, population_size: int,
+        generations: int, top_k: int, checkpoints=(0.25, 0.5, 1.0)):
+    payload = make_request(num_staff, num_departments, days, population_size=population_size,
+                           max_generations=generations, min_hours_per_month=0,
+                           memetic_top_k=top_k)
+    scheduler = GeneticScheduler(payload, verbose=False)
+
+    start = time.perf_counter()
+    scheduler.start()
+    trace = []
+    for generation in range(1, generations + 1):
+        scheduler.step()
+        if generation in [int(c * generations) for c in checkpoints]:
+            trace.append((generation, time.perf_counter() - start, scheduler.best_individual.fitness_score))
+    return trace
+
+
+def bench(num_staff: int, num_departments: int, days: int, population_size: int,
+          generations: int, top_k: int):
+    print(f"{num_staff} nhân viên, {num_departments} khoa, {days} ngày, quần thể {population_size}")
+    print(f"{'top_k':>6} {'thế hệ':>7} {'giây':>8} {'fitness':>9}")
+    for k in (0, top_k):
+        for generation, elapsed, fitness in run(num_staff, num_departments, days,
+                                                population_size, generations, k):
+            print(f"{k:>6} {generation:>7} {elapsed:>8.2f} {fitness:>9.2f}")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    defaults = [400, 20, 30, 50, 200, 3]
+    bench(*(args + defaults[len(args):]))
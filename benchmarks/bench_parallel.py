@@ -0,0 +1,46 @@
+"""
+Benchmark GA song song: evolve() đầy đủ với 1 → N worker
+Đo tổng thời gian và thời gian pha đánh giá (khởi tạo, lai ghép, sửa lỗi vẫn chạy tuần tự);
+cùng seed nên mọi số worker phải cho cùng lịch sử fitness
+Chạy: python -m benchmarks.bench_parallel [staff] [departments] [days] [population] [generations] [max_workers]
+"""
+import os
+import sys
+import time
+from app.engine.ga_scheduler import GeneticScheduler
+from benchmarks.synthetic import make_request
+
+
+def bench(num_staff: int, num_departments: int, days: int, population_size: int, generations: int,
+          max_workers: int):
+    print(f"{num_staff} nhân viên, {num_departments} khoa, {days} ngày, quần thể {population_size}, "
+          f"{generations} thế hệ")
+    print(f"{'workers':>8} {'giây':>8} {'tăng tốc':>9} {'đánh giá (s)':>13} {'tăng tốc':>9}")
+
+    baseline = None
+    history = None
+    workers = 1
+    while workers <= max_workers:
+        payload = make_request(num_staff, num_departments, days, seed=1, population_size=population_size,
+                               max_generations=generations, min_hours_per_month=0, parallelism=workers)
+        scheduler = GeneticScheduler(payload, verbose=False)
+        start = time.perf_counter()
+        scheduler.evolve()
+        elapsed = time.perf_counter() - start
+        evaluation = scheduler.profiler.totals["evaluation"]
+
+        if history is None:
+            history = scheduler.fitness_history
+        elif scheduler.fitness_history != history:
+            print(f"⚠ {workers} worker cho lịch sử fitness khác chạy tuần tự")
+
+        baseline = baseline or (elapsed, evaluation)
+        print(f"{workers:>8} {elapsed:>8.2f} {baseline[0] / elapsed:>8.2f}x "
+              f"{evaluation:>13.3f} {baseline[1] / evaluation:>8.2f}x")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    defaults = [2000, 50, 90, 100, 20, os.cpu_count() or 1]
+    bench(*(args + defaults[len(args):]))
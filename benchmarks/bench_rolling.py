@@ -0,0 +1,53 @@
+"""
+Benchmark rolling horizon cho lịch dài: GA trên cả horizon vs giải lần lượt từng khối
+So sánh thời gian, bộ nhớ đỉnh (tracemalloc) và chất lượng ở cùng số thế hệ mỗi lần giải
+(rolling chấm HC1 theo từng tháng, toàn cục chấm min_hours_per_month 1 lần cho cả horizon nên fitness không so trực tiếp)
+Chạy: python -m benchmarks.bench_rolling [staff] [departments] [generations] [block_days] [overlap_days]
+"""
+import contextlib
+import io
+import sys
+import time
+import tracemalloc
+from app.engine.ga_scheduler import generate_schedule
+from benchmarks.synthetic import make_request
+
+
+def run(num_staff: int, num_departments: int, days: int, **kwargs):
+    # min_hours_per_month đạt được theo từng tháng với dữ liệu giả lập (1-3 người/ca, 20 người/khoa)
+    payload = make_request(num_staff, num_departments, days, seed=3, population_size=40,
+                           min_hours_per_month=24, cache=False, **kwargs)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = generate_schedule(payload)
+    elapsed = time.perf_counter() - start
+
+    # Bộ nhớ đỉnh đo ở lần chạy riêng (tracemalloc làm chậm vài lần)
+    tracemalloc.start()
+    with contextlib.redirect_stdout(io.StringIO()):
+        generate_schedule(payload)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak / 2 ** 20, result
+
+
+def bench(num_staff: int, num_departments: int, generations: int, block_days: int, overlap_days: int):
+    print(f"{num_staff} nhân viên, {num_departments} khoa, {generations} thế hệ mỗi lần giải")
+    modes = {
+        "toàn cục": {},
+        f"rolling {block_days}+{overlap_days} ngày": {"rolling_block_days": block_days,
+                                                     "rolling_overlap_days": overlap_days},
+    }
+    print(f"{'chế độ':<22} {'ngày':>5} {'giây':>7} {'MB':>7} {'fitness':>10} {'vi phạm':>8} {'tháng thiếu giờ':>16}")
+    for days in (90, 180, 365):
+        for name, options in modes.items():
+            elapsed, peak, result = run(num_staff, num_departments, days, max_generations=generations, **options)
+            below = result.statistics.get("months_below_min_hours", "-")
+            print(f"{name:<22} {days:>5} {elapsed:>7.2f} {peak:>7.1f} {result.fitness_score:>10.2f} "
+                  f"{result.hard_violations:>8} {below:>16}")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    defaults = [100, 5, 30, 14, 7]
+    bench(*(args + defaults[len(args):]))
@@ -0,0 +1,160 @@
+"""
+Bộ benchmark hiệu năng GA ở nhiều kích thước (seed cố định)
+Đo: initialize_random, copy, evaluate (từng cá thể / cả quần thể), crossover, mutate, evolve
+Kết quả ghi ra JSON; so với baseline đã lưu, báo lỗi (exit 1) nếu chậm hơn quá ngưỡng
+
+Chạy:
+  python -m benchmarks.suite --output bench.json
+  python -m benchmarks.suite --scales small,medium --baseline bench.json --threshold 0.2
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+from typing import Callable, Dict
+import numpy as np
+from app.engine.ga_scheduler import GeneticScheduler
+from benchmarks.synthetic import make_request
+
+# Tên → (nhân viên, khoa, ngày, số thế hệ cho evolve)
+SCALES = {
+    "small": (20, 5, 7, 50),
+    "medium": (200, 20, 30, 20),
+    "large": (2000, 50, 90, 5),
+}
+POPULATION_SIZE = 20
+SEED = 42
+
+
+def timed(fn: Callable[[], object], min_time: float = 0.2, repeats: int = 7) -> float:
+    """
+    Thời gian tốt nhất / 1 lần gọi qua repeats lượt (mỗi lượt gọi fn đủ nhiều lần để kéo dài ≥ min_time / repeats)
+    Lấy min thay vì trung bình: nhiễu từ máy chỉ làm chậm đi, không làm nhanh lên
+    """
+    start = time.perf_counter()
+    fn()
+    once = time.perf_counter() - start
+    number = max(1, int(min_time / repeats / max(once, 1e-9)))
+
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) / number)
+    return min(samples)
+
+
+def bench_scale(name: str) -> Dict[str, float]:
+    """Các phép đo cho 1 kích thước; giá trị là giây / lần gọi (evolve: giây / lần chạy)"""
+    num_staff, num_departments, days, generations = SCALES[name]
+    payload = make_request(num_staff, num_departments, days, seed=SEED,
+                           population_size=POPULATION_SIZE, max_generations=generations,
+                           min_hours_per_month=0, mutation_rate=1.0, crossover_rate=1.0)
+    scheduler = GeneticScheduler(payload, verbose=False)
+    rng = scheduler.random
+    evaluator = scheduler.fitness_evaluator
+
+    population = [scheduler.new_individual() for _ in range(POPULATION_SIZE)]
+    for individual in population:
+        individual.initialize_random(rng)
+    evaluator.evaluate_population(population, incremental=False)
+    parent1, parent2 = population[0], population[1]
+    child1, child2 = scheduler.new_individual(), scheduler.new_individual()
+    mutant = parent1.copy()
+
+    def evaluate():
+        parent1.invalidate()
+        evaluator.evaluate(parent1)
+
+    def mutate():
+        scheduler.mutate(mutant)
+        mutant.clear_changes()
+
+    results = {
+        "initialize_random": timed(lambda: child1.initialize_random(rng)),
+        "copy": timed(parent1.copy),
+        "evaluate": timed(evaluate),
+        "evaluate_population": timed(lambda: evaluator.evaluate_population(population, incremental=False)),
+        "crossover": timed(lambda: scheduler.crossover(parent1, parent2, child1, child2)),
+        "mutate": timed(mutate),
+    }
+
+    # evolve chạy 1 lần đầy đủ với seed cố định (fitness để kiểm tra kết quả không đổi)
+    scheduler = GeneticScheduler(payload, verbose=False)
+    start = time.perf_counter()
+    best = scheduler.evolve()
+    results["evolve"] = time.perf_counter() - start
+    results["evolve_best_fitness"] = round(best.fitness_score, 4)
+    return results
+
+
+def compare(results: Dict, baseline: Dict, threshold: float) -> bool:
+    """In bảng so sánh; False nếu có phép đo chậm hơn baseline quá threshold"""
+    ok = True
+    print(f"\n{'kích thước':<10} {'phép đo':<20} {'baseline':>12} {'hiện tại':>12} {'tỉ lệ':>7}")
+    for scale, timings in results.items():
+        base_timings = baseline.get(scale, {})
+        for op, seconds in timings.items():
+            base = base_timings.get(op)
+            if base is None or op.endswith("_fitness"):
+                continue
+            ratio = seconds / base if base > 0 else float("inf")
+            regressed = ratio > 1 + threshold
+            ok = ok and not regressed
+            flag = "  ✗ CHẬM HƠN" if regressed else ""
+            print(f"{scale:<10} {op:<20} {base * 1e3:>10.3f}ms {seconds * 1e3:>10.3f}ms {ratio:>7.2f}{flag}")
+
+        base_fitness = base_timings.get("evolve_best_fitness")
+        if base_fitness is not None and base_fitness != timings.get("evolve_best_fitness"):
+            print(f"{scale:<10} ⚠ fitness evolve khác baseline: {base_fitness} → {timings['evolve_best_fitness']}")
+    return ok
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark hiệu năng GA")
+    parser.add_argument("--scales", default=",".join(SCALES), help="Danh sách kích thước, cách nhau bởi dấu phẩy")
+    parser.add_argument("--output", help="Ghi kết quả ra file JSON")
+    parser.add_argument("--baseline", help="File JSON kết quả trước đó để so sánh")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Ngưỡng chậm hơn cho phép (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for scale in args.scales.split(","):
+        if scale not in SCALES:
+            parser.error(f"Kích thước không hợp lệ: {scale} (chọn trong {', '.join(SCALES)})")
+        num_staff, num_departments, days, _ = SCALES[scale]
+        print(f"{scale}: {num_staff} nhân viên, {num_departments} khoa, {days} ngày")
+        results[scale] = bench_scale(scale)
+        for op, value in results[scale].items():
+            print(f"  {op:<20} {value:.4f}" if op.endswith("_fitness") else f"  {op:<20} {value * 1e3:10.3f}ms")
+
+    if args.output:
+        report = {
+            "meta": {
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "python": platform.python_version(),
+                "numpy": np.__version__,
+                "machine": platform.machine(),
+                "population_size": POPULATION_SIZE,
+                "seed": SEED,
+            },
+            "results": results,
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✓ Đã ghi {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        if not compare(results, baseline, args.threshold):
+            print(f"\n❌ Có phép đo chậm hơn baseline quá {args.threshold:.0%}")
+            return 1
+        print("\n✓ Không có phép đo nào chậm hơn ngưỡng")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
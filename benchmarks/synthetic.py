@@ -0,0 +1,55 @@
+"""
+Sinh dữ liệu giả lập cho benchmark
+"""
+import random
+from app.schemas.schedule import ScheduleRequest, Staff, Department, Shift
+
+SHIFTS = [
+    Shift(id=1, name="morning", start_time="07:00", end_time="15:00", duration_hours=8),
+    Shift(id=2, name="afternoon", start_time="15:00", end_time="23:00", duration_hours=8),
+    Shift(id=3, name="night", start_time="23:00", end_time="07:00", duration_hours=8)
+]
+
+
+def make_departments(num_departments: int, rng: random.Random):
+    """Tạo danh sách khoa, mỗi khoa cần 1-3 người/ca"""
+    return [
+        Department(
+            id=f"DEPT{i + 1:03d}",
+            name=f"Department{i + 1:03d}",
+            required_staff_per_shift=rng.randint(1, 3),
+            max_patient_load=rng.randint(50, 150)
+        )
+        for i in range(num_departments)
+    ]
+
+
+def make_staff(num_staff: int, departments, rng: random.Random):
+    """Tạo danh sách nhân viên phân bổ đều vào các khoa"""
+    staff = []
+    for i in range(num_staff):
+        department = departments[i % len(departments)]
+        staff.append(Staff(
+            staff_id=f"S{i + 1:05d}",
+            department=department.name,
+            shift_duration_hours=rng.choice([8, 10, 12]),
+            patient_load=rng.randint(5, 20),
+            workdays_per_month=rng.randint(15, 22),
+            satisfaction_score=round(rng.uniform(1.0, 5.0), 2),
+            overtime_hours=rng.randint(0, 20),
+            years_of_experience=rng.randint(0, 30),
+            previous_satisfaction_rating=round(rng.uniform(1.0, 5.0), 2),
+            absenteeism_days=rng.randint(0, 5),
+            role=rng.choice(["Doctor", "Nurse"]),
+            eligible_departments=[department.name]
+        ))
+    return staff
+
+
+def make_request(num_staff: int, num_departments: int, days: int, seed: int = 0, **kwargs) -> ScheduleRequest:
+    """Tạo ScheduleRequest giả lập với kích thước cho trước"""
+    rng = random.Random(seed)
+    departments = make_departments(num_departments, rng)
+    staff = make_staff(num_staff, departments, rng)
+    return ScheduleRequest(staff=staff, departments=departments, shifts=SHIFTS,
+                           days=days, seed=seed, **kwargs)
@@ -2,10 +2,16 @@
 Script test Genetic Algorithm
 Chạy: python test_ga.py
 """
-from app.utils.data_loader import load_staff_from_csv, load_positions_from_csv
+from app.utils.data_loader import load_staff_from_csv, load_departments_from_csv
 from app.schemas.schedule import ScheduleRequest, Shift
 from app.engine.ga_scheduler import generate_schedule
 
+SHIFTS = [
+    Shift(id=1, name="morning", start_time="07:00", end_time="15:00", duration_hours=8),
+    Shift(id=2, name="afternoon", start_time="15:00", end_time="23:00", duration_hours=8),
+    Shift(id=3, name="night", start_time="23:00", end_time="07:00", duration_hours=8)
+]
+
 def test_simple():
     """Test với dữ liệu đơn giản"""
     print("="*60)
@@ -14,25 +20,21 @@ def test_simple():
     
     # Load data
     staff = load_staff_from_csv("app/data/staff.csv")
-    positions = load_positions_from_csv("app/data/positions.csv")
+    departments = load_departments_from_csv("app/data/departments.csv")
     
-    if not staff or not positions:
+    if not staff or not departments:
         print("❌ Không load được dữ liệu từ CSV!")
-        print("   Đảm bảo file data/staff.csv và data/positions.csv tồn tại")
+        print("   Đảm bảo file app/data/staff.csv và app/data/departments.csv tồn tại")
         return
     
     print(f"✓ Loaded {len(staff)} nhân viên")
-    print(f"✓ Loaded {len(positions)} vị trí")
+    print(f"✓ Loaded {len(departments)} khoa")
     
     # Tạo payload
     payload = ScheduleRequest(
         staff=staff[:10],  # Chỉ lấy 10 nhân viên đầu
-        positions=positions[:2],  # Chỉ lấy 2 vị trí đầu
-        shifts=[
-            Shift(id=1, name="morning", start_time="07:00", end_time="15:00", duration_hours=8),
-            Shift(id=2, name="afternoon", start_time="15:00", end_time="23:00", duration_hours=8),
-            Shift(id=3, name="night", start_time="23:00", end_time="07:00", duration_hours=8)
-        ],
+        departments=departments[:2],  # Chỉ lấy 2 khoa đầu
+        shifts=SHIFTS,
         days=7,  # Chỉ 7 ngày để test nhanh
         population_size=30,
         max_generations=50,
@@ -65,8 +67,8 @@ def test_simple():
         for shift_name in ["morning", "afternoon", "night"]:
             shift_data = day.shifts.get(shift_name, {})
             print(f"  {shift_name}:")
-            for position, staff_list in shift_data.items():
-                print(f"    {position}: {', '.join(staff_list) if staff_list else 'Chưa xếp'}")
+            for department, staff_list in shift_data.items():
+                print(f"    {department}: {', '.join(staff_list) if staff_list else 'Chưa xếp'}")
     
     if result.hard_violations == 0:
         print("\n✓ ✓ ✓ THÀNH CÔNG: Lịch trực hợp lệ!")
@@ -80,21 +82,17 @@ def test_full():
     print("="*60)
     
     # Load full data
-    staff = load_staff_from_csv("data/staff.csv")
-    positions = load_positions_from_csv("data/positions.csv")
+    staff = load_staff_from_csv("app/data/staff.csv")
+    departments = load_departments_from_csv("app/data/departments.csv")
     
     print(f"✓ Loaded {len(staff)} nhân viên")
-    print(f"✓ Loaded {len(positions)} vị trí")
+    print(f"✓ Loaded {len(departments)} khoa")
     
     # Full payload
     payload = ScheduleRequest(
         staff=staff,
-        positions=positions,
-        shifts=[
-            Shift(id=1, name="morning", start_time="07:00", end_time="15:00", duration_hours=8),
-            Shift(id=2, name="afternoon", start_time="15:00", end_time="23:00", duration_hours=8),
-            Shift(id=3, name="night", start_time="23:00", end_time="07:00", duration_hours=8)
-        ],
+        departments=departments,
+        shifts=SHIFTS,
         days=30,
         population_size=100,
         max_generations=200,
@@ -120,14 +118,11 @@ def test_full():
         
         # Phân tích chi tiết
         print("\nPHÂN TÍCH CHI TIẾT:")
-        shift_counts = list(result.statistics['shift_per_staff'].values())
+        shift_counts = list(result.statistics['shifts_per_staff'].values())
         print(f"  - Ca trực min: {min(shift_counts)}")
         print(f"  - Ca trực max: {max(shift_counts)}")
         print(f"  - Ca trực trung bình: {sum(shift_counts)/len(shift_counts):.1f}")
-        
-        night_counts = list(result.statistics['night_shifts_per_staff'].values())
-        print(f"  - Ca đêm min: {min(night_counts)}")
-        print(f"  - Ca đêm max: {max(night_counts)}")
+
     else:
         print(f"\n⚠️ Có {result.hard_violations} vi phạm ràng buộc cứng")
 
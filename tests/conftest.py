@@ -0,0 +1,37 @@
+"""
+Fixture dùng chung cho các test theo module (tests/test_*.py)
+"""
+import os
+import shutil
+from pathlib import Path
+import pytest
+from app.utils.data_loader import load_staff_from_csv, load_departments_from_csv
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "app" / "data"
+
+
+@pytest.fixture
+def data_files(tmp_path):
+    """Bản sao staff.csv / departments.csv trong thư mục tạm (test được sửa file, đổi mtime)"""
+    staff_path, departments_path = tmp_path / "staff.csv", tmp_path / "departments.csv"
+    shutil.copy(DATA_DIR / "staff.csv", staff_path)
+    shutil.copy(DATA_DIR / "departments.csv", departments_path)
+    return staff_path, departments_path
+
+
+@pytest.fixture(scope="session")
+def csv_data():
+    """staff.csv / departments.csv mẫu đã nạp (chỉ đọc, dùng chung cho cả phiên test)"""
+    return (load_staff_from_csv(str(DATA_DIR / "staff.csv")),
+            load_departments_from_csv(str(DATA_DIR / "departments.csv")))
+
+
+@pytest.fixture
+def drop_last_row():
+    """Bỏ dòng cuối của file CSV và đẩy mtime về sau (để snapshot / kho dữ liệu thấy file đã đổi); trả về số dòng dữ liệu còn lại"""
+    def drop(path: Path) -> int:
+        lines = path.read_text(encoding="utf-8").splitlines(keepends=True)
+        path.write_text("".join(lines[:-1]), encoding="utf-8")
+        os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 10**9))
+        return len(lines) - 2
+    return drop
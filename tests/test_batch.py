@@ -0,0 +1,38 @@
+"""
+Test xếp lịch theo lô trên pool tiến trình dùng chung (app/utils/batch.py)
+"""
+from app.utils.batch import BatchRunner, estimate_cost, _run_item
+from app.utils.result_cache import ResultCache
+from benchmarks.synthetic import make_request
+
+def test_batch_runner():
+    """Lỗi của 1 request không làm hỏng cả lô; kết quả đã chạy được lấy lại từ cache ở lô sau"""
+    small = make_request(20, 2, 7, seed=7, population_size=10, max_generations=5, min_hours_per_month=0)
+    large = make_request(40, 3, 14, seed=8, population_size=10, max_generations=5, min_hours_per_month=0)
+    assert estimate_cost(large) > estimate_cost(small)
+    broken = make_request(2, 1, 7, seed=9, min_hours_per_month=1000, feasibility_check="reject")
+    broken.departments[0].required_staff_per_shift = 3
+    
+    cache = ResultCache(directory=None)
+    runner = BatchRunner(max_workers=2, cache=cache)
+    try:
+        items = {item.index: item for item in runner.run([small, broken, large])}
+        assert sorted(items) == [0, 1, 2]
+        assert items[1].status == "failed" and "InfeasibleScheduleError" in items[1].error
+        assert items[0].status == items[2].status == "completed"
+        assert items[2].result.schedule and not items[2].result.cache_hit
+        
+        # Lô sau dùng cache cho request đã chạy
+        again = list(runner.run([small]))
+        assert again[0].result.cache_hit
+    finally:
+        runner.shutdown()
+
+def test_batch_item_silent(capfd):
+    """Worker của lô chạy generate_schedule với verbose=False: mọi bộ xếp lịch đều không in log"""
+    base = dict(seed=3, population_size=10, max_generations=3, min_hours_per_month=0, cache=False)
+    modes = [{}, {"decompose": True}, {"rolling_block_days": 7, "rolling_overlap_days": 2},
+             {"multi_objective": True}, {"islands": 2, "migration_interval": 2}]
+    for mode in modes:
+        assert "result" in _run_item(make_request(20, 2, 14, **base, **mode))
+    assert capfd.readouterr().out == ""
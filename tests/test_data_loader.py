@@ -0,0 +1,38 @@
+"""
+Test nạp CSV theo lô và snapshot nhị phân (app/utils/data_loader.py)
+"""
+import os
+from app.utils.data_loader import load_staff_from_csv, load_departments_from_csv, open_snapshot, LoadReport
+
+def test_staff_loader_row_errors(data_files):
+    """Dòng lỗi (sai kiểu, thiếu cột) được ghi vào LoadReport theo số dòng, các dòng khác vẫn được nạp"""
+    staff_path, _ = data_files
+    lines = staff_path.read_text(encoding="utf-8").splitlines()
+    header, rows = lines[0], lines[1:6]
+    bad_int = rows[1].split(",")
+    bad_int[header.split(",").index("patient_load")] = "abc"
+    path = staff_path.parent / "broken.csv"
+    path.write_text("\n".join([header, rows[0], ",".join(bad_int), rows[2], "S99999,Surgery", *rows[3:]]) + "\n",
+                    encoding="utf-8")
+    
+    report = LoadReport()
+    staff = load_staff_from_csv(str(path), report=report)
+    assert [line for line, _ in report.errors] == [3, 5]
+    assert report.rows == 6 and report.loaded == len(staff) == 4
+    expected = load_staff_from_csv(str(staff_path))
+    assert staff == [expected[0], *expected[2:5]]
+    assert load_staff_from_csv(str(path), trusted=True) == staff
+
+def test_data_snapshot(data_files, drop_last_row):
+    """Snapshot khớp dữ liệu đọc từ CSV, được dùng lại khi CSV không đổi và ghi lại khi CSV thay đổi"""
+    staff_path, departments_path = data_files
+    snapshot = open_snapshot(str(staff_path), str(departments_path))
+    assert snapshot.staff() == load_staff_from_csv(str(staff_path))
+    assert snapshot.departments() == load_departments_from_csv(str(departments_path))
+    snap_path = staff_path.parent / "staff.snap"
+    written = os.stat(snap_path).st_mtime_ns
+    assert open_snapshot(str(staff_path), str(departments_path)).rows("staff") == len(snapshot.staff())
+    assert os.stat(snap_path).st_mtime_ns == written
+    
+    remaining = drop_last_row(staff_path)
+    assert open_snapshot(str(staff_path), str(departments_path)).rows("staff") == remaining
@@ -0,0 +1,82 @@
+"""
+Test giải tách theo khoa (app/engine/decomposition.py)
+"""
+import threading
+import time
+import numpy as np
+import pytest
+from app.engine import decomposition
+from app.engine.decomposition import DecomposedScheduler, find_components
+from app.engine.fitness import FitnessEvaluator
+from app.engine.genome import GenomeLayout, EMPTY_SLOT
+from app.engine.individual import Individual
+from benchmarks.synthetic import make_request
+
+def test_decomposition():
+    """Lịch ghép từ các GA con theo khoa: chấm lại toàn cục, mỗi khoa chỉ dùng nhân viên của mình, lịch sử theo thế hệ"""
+    payload = make_request(40, 4, 7, seed=2, population_size=20, max_generations=10,
+                           min_hours_per_month=0, decompose=True)
+    scheduler = DecomposedScheduler(payload)
+    assert len(scheduler.components) == 4
+    events = []
+    scheduler.add_listener(events.append)
+    best = scheduler.evolve()
+    # Lịch ghép không có quần thể → sự kiện không có fitness trung bình
+    assert [event["mean_fitness"] for event in events] == [None]
+    
+    # Lịch ghép được chấm lại trên toàn bộ request
+    check = Individual(payload.staff, payload.departments, payload.shifts, payload.days)
+    check.genome[...] = best.genome
+    check.rebuild_counters()
+    FitnessEvaluator(min_hours_per_month=0).evaluate_population([check])
+    assert check.fitness_score == pytest.approx(best.fitness_score)
+    # Lịch sử ghép theo thế hệ của các GA con, thế hệ cuối là điểm chấm lại
+    generations = max(result["generations"] for result in scheduler.component_results)
+    assert len(scheduler.fitness_history) == generations + 1
+    assert scheduler.fitness_history[-1] == best.fitness_score
+    assert "unsolved_departments" not in best.stats
+    
+    # Mỗi khoa chỉ có nhân viên của chính khoa đó
+    for members, slots in zip(scheduler.layout.eligible, scheduler.layout.department_slots):
+        assigned = best.genome[:, :, slots]
+        assert np.isin(assigned[assigned >= 0], members).all()
+    
+    # Khoa trùng tên dùng chung nhân viên → cùng 1 thành phần
+    twin = payload.departments[0].model_copy(update={"id": "TWIN"})
+    layout = GenomeLayout(payload.staff, payload.departments + [twin], payload.shifts, payload.days)
+    assert len(find_components(layout)) == 4
+
+def test_decomposition_cancel(monkeypatch):
+    """Hủy sau thành phần đầu: lịch ghép báo các khoa chưa giải (để trống) và dừng với lý do cancelled"""
+    payload = make_request(40, 4, 7, seed=2, population_size=10, max_generations=5,
+                           min_hours_per_month=0, decompose=True)
+    scheduler = DecomposedScheduler(payload)
+    run = decomposition._run
+    
+    def run_then_cancel(component):
+        result = run(component)
+        scheduler.request_stop()
+        return result
+    
+    monkeypatch.setattr(decomposition, "_run", run_then_cancel)
+    best = scheduler.evolve()
+    assert scheduler.stop_reason == "cancelled" and len(scheduler.component_results) == 1
+    
+    unsolved = [d for departments, _ in scheduler.components[1:] for d in departments]
+    assert best.stats["unsolved_departments"] == [payload.departments[d].id for d in unsolved]
+    for d in unsolved:
+        assert (best.genome[:, :, scheduler.layout.department_slots[d]] == EMPTY_SLOT).all()
+
+def test_decomposition_cancel_pool():
+    """Hủy khi các GA con chạy trên pool: worker đang chạy dừng ở thế hệ kế tiếp, evolve trả về ngay"""
+    payload = make_request(40, 4, 7, seed=2, population_size=10, max_generations=100000,
+                           min_hours_per_month=0, target_fitness=2000, decompose=True, parallelism=2)
+    scheduler = DecomposedScheduler(payload)
+    worker = threading.Thread(target=scheduler.evolve)
+    worker.start()
+    
+    time.sleep(3)
+    scheduler.request_stop()
+    worker.join(timeout=10)
+    assert not worker.is_alive()
+    assert scheduler.stop_reason == "cancelled" and len(scheduler.component_results) < 4
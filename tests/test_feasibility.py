@@ -0,0 +1,56 @@
+"""
+Test kiểm tra khả thi trước khi chạy GA (app/engine/feasibility.py)
+"""
+import numpy as np
+import pytest
+from pydantic import ValidationError
+from app.engine.feasibility import check_feasibility, max_working_days, horizon_min_hours, InfeasibleScheduleError
+from app.engine.ga_scheduler import generate_schedule
+from benchmarks.synthetic import make_request
+
+def test_feasibility_check():
+    """Cận dưới số vi phạm cứng; "reject" trả lỗi, "warn" vẫn chạy và dừng khi đạt cận dưới"""
+    assert max_working_days(7, 2) == 5 and max_working_days(30, 2) == 20
+    
+    with pytest.raises(ValidationError):
+        make_request(2, 1, 7, feasibility_check="error")
+    
+    feasible = make_request(40, 4, 7, seed=3, min_hours_per_month=0)
+    report = check_feasibility(feasible)
+    assert report.feasible and report.min_hard_violations == 0
+    
+    # 1 khoa cần 3 người/ca nhưng chỉ có 2 nhân viên, 1000 giờ trong 7 ngày là không thể
+    payload = make_request(2, 1, 7, seed=4, population_size=10, max_generations=20,
+                           min_hours_per_month=1000, feasibility_check="reject")
+    payload.departments[0].required_staff_per_shift = 3
+    report = check_feasibility(payload)
+    assert not report.feasible
+    assert {issue.constraint for issue in report.issues} == {"HC1", "HC3"}
+    # Mọi ô đều thiếu người (21) và không ai đủ giờ (2)
+    assert report.min_hard_violations == 21 + 2
+    with pytest.raises(InfeasibleScheduleError):
+        generate_schedule(payload)
+    
+    # "warn": vẫn chạy, dừng ngay khi đạt cận dưới
+    payload.feasibility_check = "warn"
+    result = generate_schedule(payload)
+    assert result.feasibility.min_hard_violations == 23
+    assert result.hard_violations >= 23
+    if result.hard_violations == 23:
+        assert result.stop_reason == "lower_bound"
+
+def test_feasibility_uses_evaluator_targets():
+    """Cận dưới HC1 dùng cùng chỉ tiêu giờ với evaluator: rolling horizon quy theo số ngày, hoặc mảng theo nhân viên"""
+    payload = make_request(30, 3, 14, seed=3, min_hours_per_month=160)
+    rolling = payload.model_copy(update={"rolling_block_days": 7})
+    scaled = horizon_min_hours(160, 14)
+    assert scaled == 75
+    assert check_feasibility(rolling) == check_feasibility(payload, min_hours=scaled)
+    assert check_feasibility(rolling).min_hard_violations < check_feasibility(payload).min_hard_violations
+    
+    # Mảng theo nhân viên: chỉ tiêu 0 không bao giờ vi phạm
+    per_staff = np.zeros(30, dtype=np.int64)
+    assert check_feasibility(payload, min_hours=per_staff).min_hard_violations == 0
+    per_staff[:5] = 1000
+    report = check_feasibility(payload, min_hours=per_staff)
+    assert report.min_hard_violations == 5 and {issue.constraint for issue in report.issues} == {"HC1"}
@@ -0,0 +1,72 @@
+"""
+Test đánh giá fitness theo lô và tăng dần (app/engine/fitness.py)
+"""
+import random
+from app.schemas.schedule import ScheduleRequest
+from app.engine.fitness import FitnessEvaluator
+from app.engine.ga_scheduler import GeneticScheduler
+from app.engine.genome import GenomeLayout
+from app.engine.individual import Individual
+from benchmarks.synthetic import SHIFTS
+
+def test_batch_fitness_parity(csv_data):
+    """evaluate_population phải cho cùng kết quả với evaluate từng cá thể"""
+    random.seed(42)
+    staff, departments = csv_data
+    layout = GenomeLayout(staff, departments, SHIFTS, 30)
+    
+    # Cấu hình nới lỏng để có cả cá thể hợp lệ (tính điểm mềm) lẫn vi phạm
+    for min_hours, max_consecutive in [(160, 2), (0, 30), (40, 5)]:
+        evaluator = FitnessEvaluator(min_hours_per_month=min_hours,
+                                     max_consecutive_shifts=max_consecutive)
+        population = [Individual(staff, departments, SHIFTS, 30, layout=layout) for _ in range(50)]
+        for individual in population:
+            individual.initialize_random()
+        
+        expected = []
+        for individual in population:
+            evaluator.evaluate(individual)
+            expected.append((individual.fitness_score, individual.hard_violations, individual.stats))
+        
+        evaluator.evaluate_population(population)
+        
+        for individual, (score, violations, stats) in zip(population, expected):
+            assert abs(individual.fitness_score - score) < 1e-9
+            assert individual.hard_violations == violations
+            assert individual.stats == stats
+
+
+def test_incremental_fitness_parity(csv_data):
+    """Đánh giá tăng dần (delta) phải khớp đánh giá đầy đủ"""
+    random.seed(11)
+    staff, departments = csv_data
+    payload = ScheduleRequest(staff=staff, departments=departments, shifts=SHIFTS,
+                              days=14, population_size=20, mutation_rate=1.0,
+                              min_hours_per_month=40, max_consecutive_shifts=3)
+    scheduler = GeneticScheduler(payload)
+    scheduler.initialize_population()
+    evaluator = scheduler.fitness_evaluator
+    population = scheduler.population
+    evaluator.evaluate_population(population)
+    
+    for _ in range(10):
+        children = []
+        for _ in range(10):
+            child1, child2 = scheduler.crossover(*random.sample(population, 2))
+            for _ in range(random.randint(0, 5)):
+                scheduler.mutate(child1)
+            children.extend([child1, child2])
+        
+        evaluator.evaluate_population(children)
+        
+        fresh = [child.copy() for child in children]
+        for child in fresh:
+            child.discard_components()
+        evaluator.evaluate_population(fresh)
+        
+        for child, expected in zip(children, fresh):
+            assert abs(child.fitness_score - expected.fitness_score) < 1e-9
+            assert child.hard_violations == expected.hard_violations
+            assert (child.long_windows == expected.long_windows).all()
+            assert (child.diverse == expected.diverse).all()
+        population = children
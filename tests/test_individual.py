@@ -0,0 +1,41 @@
+"""
+Test bộ đếm theo nhân viên và khởi tạo tham lam của cá thể (app/engine/individual.py)
+"""
+import random
+from app.schemas.schedule import ScheduleRequest
+from app.engine.ga_scheduler import GeneticScheduler
+from benchmarks.synthetic import SHIFTS, make_request
+
+def test_counters_follow_genome(csv_data):
+    """Bộ đếm theo nhân viên phải khớp với genome sau lai ghép và đột biến"""
+    random.seed(7)
+    staff, departments = csv_data
+    payload = ScheduleRequest(staff=staff, departments=departments, shifts=SHIFTS,
+                              days=14, population_size=20, mutation_rate=1.0)
+    scheduler = GeneticScheduler(payload)
+    scheduler.initialize_population()
+    
+    for _ in range(20):
+        parent1, parent2 = random.sample(scheduler.population, 2)
+        child1, child2 = scheduler.crossover(parent1, parent2)
+        scheduler.mutate(child1)
+        
+        expected = child1.copy()
+        expected.rebuild_counters()
+        assert (child1.day_load == expected.day_load).all()
+        assert (child1.shift_counts == expected.shift_counts).all()
+
+
+def test_greedy_initializer():
+    """Khởi tạo tham lam: đủ người mỗi ca và không ai làm quá số ngày liên tiếp"""
+    payload = make_request(120, 6, 14, population_size=10, min_hours_per_month=0)
+    scheduler = GeneticScheduler(payload, verbose=False)
+    scheduler.start()
+    
+    for individual in scheduler.population:
+        assert individual.hard_violations == 0
+    assert len({individual.genome.tobytes() for individual in scheduler.population}) == 10
+    
+    random_start = GeneticScheduler(payload.model_copy(update={"initializer": "random"}), verbose=False)
+    random_start.start()
+    assert random_start.best_individual.hard_violations > 0
@@ -0,0 +1,43 @@
+"""
+Test mô hình đảo trên nhiều tiến trình (app/engine/islands.py)
+"""
+import threading
+import time
+from app.schemas.schedule import ScheduleRequest
+from app.engine.islands import IslandScheduler
+from benchmarks.synthetic import SHIFTS, make_request
+
+def test_island_model(csv_data):
+    """Mô hình đảo trả về cá thể tốt nhất toàn cục và lịch sử đã gộp"""
+    staff, departments = csv_data
+    payload = ScheduleRequest(staff=staff, departments=departments, shifts=SHIFTS,
+                              days=7, population_size=20, max_generations=12,
+                              min_hours_per_month=0, seed=5, islands=2,
+                              migration_interval=5, migration_topology="random")
+    
+    scheduler = IslandScheduler(payload)
+    best = scheduler.evolve()
+    
+    assert len(scheduler.fitness_history) == 13
+    assert scheduler.fitness_history == sorted(scheduler.fitness_history)
+    assert best.fitness_score == scheduler.fitness_history[-1]
+
+
+def test_island_cancel_within_epoch():
+    """Hủy giữa chặng di cư dài: các đảo dừng ngay ở thế hệ kế tiếp, không chạy hết migration_interval"""
+    payload = make_request(60, 3, 14, seed=4, population_size=20, max_generations=100000,
+                           min_hours_per_month=0, target_fitness=2000, islands=2,
+                           migration_interval=100000)
+    scheduler = IslandScheduler(payload)
+    started = threading.Event()
+    scheduler.add_listener(lambda event: started.set())
+    worker = threading.Thread(target=scheduler.evolve)
+    worker.start()
+    
+    assert started.wait(timeout=60)
+    time.sleep(0.5)
+    scheduler.request_stop()
+    worker.join(timeout=10)
+    assert not worker.is_alive()
+    assert scheduler.stop_reason == "cancelled"
+    assert 0 < len(scheduler.fitness_history) - 1 < 100000
@@ -0,0 +1,95 @@
+"""
+Test job xếp lịch chạy nền và luồng tiến trình SSE (app/utils/jobs.py)
+"""
+import json
+import time
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.dependencies import get_job_manager
+from app.utils.jobs import JobManager, Job
+from benchmarks.synthetic import make_request
+
+@pytest.fixture
+def job_client():
+    """TestClient với JobManager riêng (1 worker, hàng đợi 2 job, không cache) thay cho bản dùng chung"""
+    manager = JobManager(max_workers=1, queue_limit=2)
+    app.dependency_overrides[get_job_manager] = lambda: manager
+    try:
+        # Không dùng "with": bỏ qua sự kiện startup/shutdown của app (tắt JobManager dùng chung)
+        yield TestClient(app)
+    finally:
+        manager.shutdown()
+        app.dependency_overrides.pop(get_job_manager, None)
+
+
+def wait_for_job(client, job_id: str, statuses, timeout: float = 30.0) -> dict:
+    """Hỏi trạng thái job tới khi thuộc statuses"""
+    deadline = time.time() + timeout
+    while True:
+        status = client.get(f"/api/v1/schedule/jobs/{job_id}").json()
+        if status["status"] in statuses or time.time() > deadline:
+            return status
+        time.sleep(0.05)
+
+
+def test_job_api(job_client):
+    """Job nền: gửi → hỏi trạng thái → lấy kết quả; hủy job đang chạy; hàng đợi đầy trả 429"""
+    quick = make_request(20, 2, 7, seed=1, population_size=10, max_generations=5,
+                         min_hours_per_month=0, cache=False).model_dump()
+    endless = {**quick, "max_generations": 100000, "target_fitness": 2000}
+    
+    response = job_client.post("/api/v1/schedule/jobs", json=quick)
+    assert response.status_code == 202 and response.json()["status"] in ("queued", "running")
+    job_id = response.json()["job_id"]
+    status = wait_for_job(job_client, job_id, ("completed", "failed"))
+    assert status["status"] == "completed" and status["generation"] == 5
+    result = job_client.get(f"/api/v1/schedule/jobs/{job_id}/result").json()
+    assert len(result["schedule"]) == 7 and result["stop_reason"] == "max_generations"
+    assert job_client.get("/api/v1/schedule/jobs/unknown").status_code == 404
+    
+    # 1 job chạy + 1 job chờ = đầy hàng đợi
+    running = job_client.post("/api/v1/schedule/jobs", json=endless).json()["job_id"]
+    assert wait_for_job(job_client, running, ("running",))["status"] == "running"
+    assert job_client.get(f"/api/v1/schedule/jobs/{running}/result").status_code == 409
+    queued = job_client.post("/api/v1/schedule/jobs", json=endless).json()["job_id"]
+    assert job_client.post("/api/v1/schedule/jobs", json=quick).status_code == 429
+    
+    # Job đang chờ bị hủy ngay; job đang chạy dừng ở cuối thế hệ và vẫn có lịch tốt nhất
+    assert job_client.delete(f"/api/v1/schedule/jobs/{queued}").json()["status"] == "cancelled"
+    job_client.delete(f"/api/v1/schedule/jobs/{running}")
+    assert wait_for_job(job_client, running, ("cancelled", "completed", "failed"))["status"] == "cancelled"
+    result = job_client.get(f"/api/v1/schedule/jobs/{running}/result").json()
+    assert result["stop_reason"] == "cancelled" and len(result["schedule"]) == 7
+
+
+def test_job_progress_stream(job_client):
+    """Luồng SSE: keep-alive khi im lặng, gộp các thế hệ thành sự kiện mới nhất, kết thúc bằng sự kiện done"""
+    payload = make_request(20, 2, 7, seed=1, population_size=10, max_generations=5,
+                           min_hours_per_month=0, cache=False)
+    job = Job(payload)
+    events = job.stream_events(min_interval=0.0, keepalive=0.05)
+    assert next(events) == ": keep-alive\n\n"
+    job.on_generation({"generation": 1, "best_fitness": -10.0})
+    job.on_generation({"generation": 2, "best_fitness": -5.0})
+    assert next(events) == 'event: progress\ndata: {"generation": 2, "best_fitness": -5.0}\n\n'
+    job.finish("completed")
+    assert next(events).startswith("event: progress")
+    done = next(events)
+    assert done.startswith("event: done\ndata: ")
+    assert json.loads(done.split("data: ", 1)[1])["status"] == "completed"
+    assert list(events) == []
+    
+    job_id = job_client.post("/api/v1/schedule/jobs", json=payload.model_dump()).json()["job_id"]
+    received = []
+    with job_client.stream("GET", f"/api/v1/schedule/jobs/{job_id}/events") as response:
+        assert response.headers["content-type"].startswith("text/event-stream")
+        for block in response.iter_text():
+            received.append(block)
+    messages = [m for m in "".join(received).split("\n\n") if m.startswith("event: ")]
+    kinds = [m.split("\n", 1)[0][len("event: "):] for m in messages]
+    data = [json.loads(m.split("data: ", 1)[1]) for m in messages]
+    assert kinds[-1] == "done" and set(kinds[:-1]) == {"progress"}
+    assert data[-1]["status"] == "completed" and data[-1]["generation"] == 5
+    assert data[-2]["generation"] == 5 and "best_fitness" in data[-2] and "elapsed" in data[-2]
+    assert job_client.get("/api/v1/schedule/jobs/unknown/events").status_code == 404
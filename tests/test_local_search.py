@@ -0,0 +1,28 @@
+"""
+Test leo đồi của pha memetic (app/engine/local_search.py)
+"""
+import pytest
+from app.engine.ga_scheduler import GeneticScheduler
+from benchmarks.synthetic import make_request
+
+def test_local_search():
+    """Leo đồi không làm giảm fitness và fitness tăng dần khớp đánh giá đầy đủ"""
+    payload = make_request(120, 6, 14, population_size=10, min_hours_per_month=0,
+                           memetic_top_k=3, memetic_time_budget=10.0)
+    scheduler = GeneticScheduler(payload, verbose=False)
+    scheduler.start()
+    
+    before = [individual.fitness_score for individual in scheduler.population[:3]]
+    for individual in scheduler.population[:3]:
+        scheduler.local_search.improve(individual, 50, float("inf"))
+    assert all(i.fitness_score >= b for i, b in zip(scheduler.population[:3], before))
+    
+    full = [individual.copy() for individual in scheduler.population[:3]]
+    for individual in full:
+        individual.rebuild_counters()
+    scheduler.fitness_evaluator.evaluate_population(full)
+    assert [i.fitness_score for i in full] == pytest.approx(
+        [i.fitness_score for i in scheduler.population[:3]])
+    
+    scheduler.step()
+    assert scheduler.fitness_history[-1] >= scheduler.fitness_history[0]
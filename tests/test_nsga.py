@@ -0,0 +1,33 @@
+"""
+Test chế độ đa mục tiêu NSGA-II (app/engine/nsga.py)
+"""
+import numpy as np
+import pytest
+from pydantic import ValidationError
+from app.engine.ga_scheduler import generate_schedule
+from app.engine.nsga import non_dominated_fronts, crowding_distance
+from benchmarks.synthetic import make_request
+
+def test_nsga_pareto_front():
+    """Xếp hạng front ưu tiên lịch hợp lệ; tập Pareto trả về không có lịch nào trội hơn lịch khác"""
+    objectives = np.array([[1.0, 0.0], [0.0, 1.0], [0.5, 0.5], [0.4, 0.4], [0.9, 0.9]])
+    fronts = non_dominated_fronts(objectives, np.array([0, 0, 0, 0, 1]))
+    # Lịch vi phạm luôn đứng sau lịch hợp lệ dù điểm mềm cao hơn
+    assert [sorted(f.tolist()) for f in fronts] == [[0, 1, 2], [3], [4]]
+    assert np.isinf(crowding_distance(objectives[:3])[[0, 1]]).all()
+    
+    payload = make_request(30, 3, 7, seed=6, population_size=20, max_generations=15,
+                           min_hours_per_month=0, multi_objective=True, pareto_max_solutions=5)
+    result = generate_schedule(payload)
+    front = result.pareto_front
+    assert 1 <= len(front) <= 5
+    for solution in front:
+        weighted = 1000 * sum(payload.weights[name] * score for name, score in solution.scores.items())
+        assert solution.hard_violations > 0 or solution.fitness_score == pytest.approx(weighted)
+        for other in front:
+            a, b = list(solution.scores.values()), list(other.scores.values())
+            assert not (all(x >= y for x, y in zip(a, b)) and any(x > y for x, y in zip(a, b)))
+    assert result.fitness_score >= max(solution.fitness_score for solution in front)
+    
+    with pytest.raises(ValidationError):
+        make_request(30, 3, 7, multi_objective=True, pareto_max_solutions=0)
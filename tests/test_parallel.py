@@ -0,0 +1,61 @@
+"""
+Test đánh giá fitness song song trên pool tiến trình (app/engine/parallel.py)
+"""
+import numpy as np
+from app.config import PARALLEL_MIN_BATCH
+from app.schemas.schedule import ScheduleRequest
+from app.engine.ga_scheduler import GeneticScheduler
+from app.engine.parallel import ParallelEvaluator
+from benchmarks.synthetic import SHIFTS, make_request
+
+
+def test_pool_uses_scheduler_evaluator():
+    """Worker chấm với lịch sử HC2 và chỉ tiêu giờ theo nhân viên của evaluator, thế hệ sau cũng qua pool"""
+    payload = make_request(20, 2, 7, seed=5, population_size=10, max_generations=3, min_hours_per_month=0,
+                           max_consecutive_shifts=2, mutation_rate=1.0)
+    scheduler = GeneticScheduler(payload, verbose=False)
+    evaluator = scheduler.fitness_evaluator
+    evaluator.history = np.ones((2, 20), dtype=bool)
+    evaluator.min_hours_per_month = np.arange(20) * 4
+    scheduler.initialize_population()
+    genomes = np.stack([individual.genome for individual in scheduler.population])
+    day_load = np.stack([individual.day_load for individual in scheduler.population])
+
+    with ParallelEvaluator(payload, 2, evaluator) as pool:
+        pooled = pool.compute_components(genomes, day_load)
+
+        serial = scheduler.fitness_evaluator.compute_components(scheduler.layout, genomes, day_load)
+        for name, values in serial.items():
+            assert (pooled[name] == values).all()
+
+        # Thế hệ sau (đột biến + lai ghép) được đánh giá trên pool, cùng kết quả với cập nhật delta
+        calls = []
+        compute = pool.compute_components
+        pool.compute_components = lambda *args: calls.append(len(args[0])) or compute(*args)
+        evaluator.pool = pool
+        scheduler.evaluate_population()
+        scheduler.step()
+        evaluator.pool = None
+        assert len(calls) == 2 and calls[1] >= PARALLEL_MIN_BATCH
+
+    fresh = [individual.copy() for individual in scheduler.population]
+    for individual in fresh:
+        individual.discard_components()
+    evaluator.evaluate_population(fresh)
+    assert [i.fitness_score for i in scheduler.population] == [i.fitness_score for i in fresh]
+
+
+def test_parallel_evaluation_reproducible(csv_data):
+    """Cùng seed thì chạy tuần tự hay song song đều cho cùng kết quả"""
+    staff, departments = csv_data
+    histories = []
+    
+    for parallelism in (1, 2):
+        payload = ScheduleRequest(staff=staff, departments=departments, shifts=SHIFTS,
+                                  days=7, population_size=20, max_generations=10,
+                                  min_hours_per_month=0, seed=123, parallelism=parallelism)
+        scheduler = GeneticScheduler(payload)
+        best = scheduler.evolve()
+        histories.append((scheduler.fitness_history, best.genome.tolist()))
+    
+    assert histories[0] == histories[1]
@@ -0,0 +1,40 @@
+"""
+Test vùng nhớ quần thể dùng chung (app/engine/population.py)
+"""
+import random
+import numpy as np
+from app.engine.genome import GenomeLayout
+from app.engine.population import PopulationArena
+from benchmarks.synthetic import SHIFTS
+
+def test_arena_buffers_not_aliased(csv_data):
+    """Sau swap, sửa con ở thế hệ mới không được làm đổi cha mẹ ở thế hệ cũ (không dùng chung bộ nhớ)"""
+    rng = random.Random(3)
+    staff, departments = csv_data
+    layout = GenomeLayout(staff, departments, SHIFTS, 7)
+    arena = PopulationArena(layout, 4)
+    
+    for parent in arena.front:
+        parent.initialize_random(rng)
+    parents = arena.front
+    saved = [(parent.genome.copy(), parent.day_load.copy(), parent.shift_counts.copy()) for parent in parents]
+    for parent, child in zip(parents, arena.back):
+        parent.copy_into(child)
+    arena.swap()
+    
+    for child, parent in zip(arena.front, parents):
+        assert child is not parent
+        for name, array in child._storage.items():
+            assert not np.shares_memory(array, parent._storage[name])
+        
+        # Đổi toàn bộ slot của con sang người khác
+        for day_idx, shift_idx, slot in np.ndindex(child.genome.shape):
+            dept_idx = int(layout.slot_department[slot])
+            child.set_slot(day_idx, shift_idx, slot, int(rng.choice(layout.eligible[dept_idx])))
+        assert (child.genome != parent.genome).any()
+    
+    for parent, (genome, day_load, shift_counts) in zip(parents, saved):
+        assert (parent.genome == genome).all()
+        assert (parent.day_load == day_load).all()
+        assert (parent.shift_counts == shift_counts).all()
+    assert arena.back == parents
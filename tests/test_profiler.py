@@ -0,0 +1,22 @@
+"""
+Test profile theo pha của GA (app/engine/profiler.py) và chỉ số Prometheus (app/utils/metrics.py)
+"""
+from app.engine.ga_scheduler import generate_schedule
+from app.utils.metrics import MetricsRegistry
+from benchmarks.synthetic import make_request
+
+def test_profile_and_metrics():
+    """Profile theo pha nằm trong response; các chỉ số Prometheus được ghi sau mỗi lần xếp lịch"""
+    payload = make_request(40, 4, 7, seed=1, population_size=20, max_generations=5, min_hours_per_month=0)
+    metrics = MetricsRegistry(enabled=True)
+    result = generate_schedule(payload, metrics=metrics)
+    
+    profile = result.profile
+    assert profile["generations"] == 5
+    assert sum(p["total"] for p in profile["phases"].values()) <= result.computation_time
+    assert profile["counts"]["evaluations"] >= 20 and profile["counts"]["copies"] > 0
+    
+    text = metrics.render()
+    assert 'shiftgenix_schedule_runs_total{stop_reason="max_generations"} 1' in text
+    assert "shiftgenix_ga_generations_total 5" in text
+    assert 'shiftgenix_schedule_duration_seconds_bucket{le="+Inf"} 1' in text
@@ -0,0 +1,32 @@
+"""
+Test sửa vi phạm cứng (app/engine/repair.py)
+"""
+from app.engine.ga_scheduler import GeneticScheduler
+from benchmarks.synthetic import make_request
+
+def test_repair_operator():
+    """Sửa chữa giảm vi phạm cứng, giữ bộ đếm đúng và fitness tăng dần khớp đánh giá đầy đủ"""
+    payload = make_request(120, 6, 14, population_size=10, min_hours_per_month=40,
+                           initializer="random")
+    scheduler = GeneticScheduler(payload, verbose=False)
+    scheduler.start()
+    
+    for individual in scheduler.population:
+        before = scheduler.repair_operator.count_violations(individual)
+        fixed = scheduler.repair_operator.repair(individual)
+        after = scheduler.repair_operator.count_violations(individual)
+        assert sum(after.values()) < sum(before.values())
+        assert all(fixed[name] >= before[name] - after[name] for name in fixed)
+        
+        expected = individual.copy()
+        expected.rebuild_counters()
+        assert (individual.day_load == expected.day_load).all()
+        assert (individual.shift_counts == expected.shift_counts).all()
+    
+    incremental = [individual.copy() for individual in scheduler.population]
+    scheduler.fitness_evaluator.evaluate_population(incremental)
+    full = [individual.copy() for individual in scheduler.population]
+    for individual in full:
+        individual.rebuild_counters()
+    scheduler.fitness_evaluator.evaluate_population(full)
+    assert [i.fitness_score for i in incremental] == [i.fitness_score for i in full]
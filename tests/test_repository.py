@@ -0,0 +1,23 @@
+"""
+Test kho dữ liệu nhân viên / khoa cho API (app/utils/repository.py)
+"""
+from app.utils.repository import DataRepository
+
+def test_repository_reloads_on_change(data_files, drop_last_row):
+    """Kho dữ liệu dùng lại snapshot cho tới khi file CSV thay đổi"""
+    staff_path, departments_path = data_files
+    repo = DataRepository(str(staff_path), str(departments_path))
+    
+    snapshot = repo.snapshot()
+    assert repo.snapshot() is snapshot
+    assert snapshot.get_staff("S00001").staff_id == "S00001" and snapshot.get_staff("UNKNOWN") is None
+    assert snapshot.statistics["total_staff"] == snapshot.staff_count == len(repo.staff)
+    assert [s.staff_id for s in snapshot.staff_page(2, 2)] == [s.staff_id for s in repo.staff[2:4]]
+    assert snapshot.staff_json() is snapshot.staff_json()
+    
+    drop_last_row(staff_path)
+    assert repo.snapshot().statistics["total_staff"] == snapshot.staff_count - 1
+    # Request còn giữ snapshot cũ vẫn đọc được dữ liệu cũ sau khi nạp lại
+    assert snapshot.get_staff("S00001").staff_id == "S00001"
+    assert len(snapshot.staff_page()) == snapshot.staff_count
+    assert snapshot.staff_json()
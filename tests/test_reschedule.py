@@ -0,0 +1,41 @@
+"""
+Test xếp lại lịch trong cửa sổ bị xáo trộn (app/engine/reschedule.py)
+"""
+import pytest
+from pydantic import ValidationError
+from app.engine.ga_scheduler import generate_schedule
+from app.engine.reschedule import reschedule
+from app.schemas.schedule import RescheduleRequest
+from benchmarks.synthetic import make_request
+
+def test_reschedule_disruption():
+    """Chỉ cửa sổ quanh ngày bị xáo trộn thay đổi; người vắng được thay, không sinh vi phạm mới"""
+    payload = make_request(40, 4, 30, seed=10, population_size=20, max_generations=20, min_hours_per_month=0)
+    base = generate_schedule(payload)
+    sick = base.schedule[11].shifts["morning"]["Department001"][0]
+    
+    data = payload.model_dump()
+    data.update(schedule=[day.model_dump() for day in base.schedule], window_margin=1,
+                disruptions=[{"staff_id": sick, "days": [11]}])
+    result = reschedule(RescheduleRequest(**data))
+    
+    assert result.window == [10, 11, 12]
+    assert all(sick not in members for members in
+               (staff for shift in result.schedule[11].shifts.values() for staff in shift.values()))
+    # Ngoài cửa sổ giữ nguyên; chỉ thay người vắng, không sinh vi phạm mới
+    for day in list(range(10)) + list(range(13, 30)):
+        assert result.schedule[day] == base.schedule[day]
+    assert {change.day for change in result.changes} <= {10, 11, 12}
+    assert any(change.removed == sick and change.added for change in result.changes)
+    assert result.hard_violations <= base.hard_violations
+    assert result.computation_time < 1.0
+    
+    data["disruptions"] = [{"staff_id": "UNKNOWN", "days": [1]}]
+    with pytest.raises(ValueError):
+        reschedule(RescheduleRequest(**data))
+    
+    # Lề âm, số bước âm, ngân sách thời gian 0 bị từ chối khi kiểm tra request
+    data["disruptions"] = [{"staff_id": sick, "days": [11]}]
+    for update in ({"window_margin": -1}, {"search_steps": -1}, {"time_limit_seconds": 0}):
+        with pytest.raises(ValidationError):
+            RescheduleRequest(**{**data, **update})
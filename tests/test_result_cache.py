@@ -0,0 +1,41 @@
+"""
+Test cache kết quả theo nội dung request (app/utils/result_cache.py)
+"""
+from app.schemas.schedule import ScheduleRequest
+from app.engine.ga_scheduler import generate_schedule
+from app.utils.result_cache import ResultCache
+from benchmarks.synthetic import SHIFTS
+
+def test_result_cache(csv_data, tmp_path):
+    """Request giống hệt (cùng seed) lấy từ cache; cache trên đĩa còn sau khi tạo lại"""
+    staff, departments = csv_data
+    payload = ScheduleRequest(staff=staff[:10], departments=departments[:2], shifts=SHIFTS,
+                              days=7, population_size=10, max_generations=5, seed=3)
+    
+    cache = ResultCache(directory=str(tmp_path))
+    first = generate_schedule(payload, cache=cache)
+    assert not first.cache_hit
+    
+    # parallelism không đổi kết quả → cùng khóa
+    again = generate_schedule(payload.model_copy(update={"parallelism": 2}), cache=cache)
+    assert again.cache_hit and again.fitness_score == first.fitness_score
+    
+    restarted = ResultCache(directory=str(tmp_path))
+    assert generate_schedule(payload, cache=restarted).cache_hit
+    
+    # Không seed → mặc định không dùng cache
+    unseeded = payload.model_copy(update={"seed": None})
+    generate_schedule(unseeded, cache=cache)
+    assert not generate_schedule(unseeded, cache=cache).cache_hit
+    
+    # Dừng theo thời gian thực → không lặp lại được dù có seed
+    timed = payload.model_copy(update={"time_limit_seconds": 5.0})
+    generate_schedule(timed, cache=cache)
+    assert not generate_schedule(timed, cache=cache).cache_hit
+    
+    # Ghi đĩa lỗi (thư mục mất / chỉ đọc) không làm mất kết quả vừa chạy
+    broken = ResultCache(directory=str(tmp_path / "gone"))
+    broken.directory = tmp_path / "gone" / "missing"
+    result = generate_schedule(payload.model_copy(update={"seed": 4}), cache=broken)
+    assert result.schedule and not result.cache_hit
+    assert generate_schedule(payload.model_copy(update={"seed": 4}), cache=broken).cache_hit
@@ -0,0 +1,80 @@
+"""
+Test rolling horizon cho lịch dài (app/engine/rolling.py)
+"""
+import numpy as np
+import pytest
+from pydantic import ValidationError
+from app.engine.fitness import FitnessEvaluator
+from app.engine.ga_scheduler import GeneticScheduler
+from app.engine.individual import Individual
+from app.engine.rolling import BlockScheduler, RollingHorizonScheduler
+from benchmarks.synthetic import make_request
+
+def test_rolling_horizon():
+    """Các khối đã chốt giữ nguyên, HC2 tính qua biên khối và lịch cả horizon được chấm lại"""
+    payload = make_request(20, 2, 40, seed=12, population_size=10, max_generations=10,
+                           min_hours_per_month=80, max_consecutive_shifts=3,
+                           rolling_block_days=14, rolling_overlap_days=5)
+    scheduler = RollingHorizonScheduler(payload)
+    assert scheduler.blocks == [(0, 14, 19), (14, 28, 33), (28, 40, 40)]
+    
+    # Đánh giá tăng dần có lịch sử phía trước phải khớp đánh giá đầy đủ
+    block = GeneticScheduler(scheduler.block_request(1, 14, 33, np.full(20, 40)))
+    block.fitness_evaluator.history = np.random.default_rng(0).random((3, 20)) < 0.7
+    block.initialize_population()
+    block.fitness_evaluator.evaluate_population(block.population)
+    for individual in block.population:
+        for _ in range(5):
+            block.mutate_slot(individual)
+    block.fitness_evaluator.evaluate_population(block.population)
+    fresh = [individual.copy() for individual in block.population]
+    for individual in fresh:
+        individual.discard_components()
+    block.fitness_evaluator.evaluate_population(fresh)
+    for individual, expected in zip(block.population, fresh):
+        assert individual.hard_violations == expected.hard_violations
+        assert (individual.long_windows == expected.long_windows).all()
+    
+    committed = []
+    events = []
+    scheduler.add_listener(lambda event: committed.append(scheduler.genome.copy()))
+    scheduler.add_listener(events.append)
+    best = scheduler.evolve()
+    # Sự kiện mỗi khối: fitness trung bình quần thể của khối, không phải best
+    assert [event["mean_fitness"] for event in events] == [r["mean_fitness"] for r in scheduler.block_results]
+    assert all(event["mean_fitness"] <= event["best_fitness"] + 1e-6 for event in events)
+    assert best.genome.shape[0] == 40 and len(scheduler.block_results) == 3
+    # Khối đã chốt giữ nguyên ở các khối sau
+    assert (committed[0][:14] == best.genome[:14]).all()
+    assert (committed[1][:28] == best.genome[:28]).all()
+    
+    # Lịch cả horizon được chấm lại với min_hours quy theo số ngày; HC2 tính cả chuỗi cắt qua biên khối
+    check = Individual(payload.staff, payload.departments, payload.shifts, payload.days)
+    check.genome[...] = best.genome
+    check.rebuild_counters()
+    FitnessEvaluator(weights=payload.weights, min_hours_per_month=107,
+                     max_consecutive_shifts=3).evaluate_population([check])
+    assert check.hard_violations == best.hard_violations
+    assert "months_below_min_hours" in best.stats
+
+def test_block_initializer_per_staff_targets():
+    """Khởi tạo tham lam của khối dùng chỉ tiêu giờ của từng nhân viên như evaluator và repair"""
+    payload = make_request(20, 2, 14, seed=13, population_size=10, min_hours_per_month=80,
+                           rolling_block_days=14)
+    scheduler = RollingHorizonScheduler(payload)
+    min_hours = np.where(np.arange(20) % 2 == 0, 0, 112)
+    block = BlockScheduler(scheduler.block_request(0, 0, 14, min_hours), scheduler.history(0), min_hours,
+                           scheduler.block_targets(scheduler.monthly_expected_hours, 0, 14))
+    individual = block.new_individual()
+    block.initialize_individual(individual)
+    hours = individual.shift_counts * block.layout.staff_shift_hours
+    assert hours[min_hours > 0].min() > hours[min_hours == 0].max()
+
+def test_rolling_settings_validated():
+    """Khối / phần gối đầu âm và phần gối đầu không ngắn hơn khối bị từ chối; khối 0 (tắt) giữ gối đầu mặc định"""
+    assert make_request(4, 1, 7, rolling_block_days=0).rolling_overlap_days == 7
+    assert make_request(4, 1, 7, rolling_block_days=8).rolling_block_days == 8
+    for update in ({"rolling_block_days": -1}, {"rolling_overlap_days": -1},
+                   {"rolling_block_days": 7}, {"rolling_block_days": 5, "rolling_overlap_days": 5}):
+        with pytest.raises(ValidationError):
+            make_request(4, 1, 7, **update)
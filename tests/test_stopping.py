@@ -0,0 +1,27 @@
+"""
+Test điều kiện dừng: ngân sách thời gian và trì trệ (BaseScheduler.check_stop)
+"""
+import pytest
+from pydantic import ValidationError
+from app.schemas.schedule import ScheduleRequest
+from app.engine.ga_scheduler import generate_schedule
+from benchmarks.synthetic import make_request
+
+def test_stopping_rules():
+    """Hết ngân sách thời gian hoặc trì trệ → trả về lịch tốt nhất kèm lý do dừng"""
+    payload = make_request(60, 3, 7, population_size=10, max_generations=100000,
+                           min_hours_per_month=0, target_fitness=2000, time_limit_seconds=0.5)
+    result = generate_schedule(payload)
+    assert result.stop_reason == "time_limit"
+    assert 0.5 <= result.computation_time < 2.0
+    
+    stagnant = payload.model_copy(update={"time_limit_seconds": None, "stagnation_generations": 5,
+                                          "stagnation_epsilon": 1e9})
+    result = generate_schedule(stagnant)
+    assert result.stop_reason == "stagnation"
+    assert result.generation == 6
+    
+    # Ngân sách 0 / cửa sổ trì trệ 0 bị từ chối ngay khi kiểm tra request
+    for update in ({"time_limit_seconds": 0}, {"stagnation_generations": 0}):
+        with pytest.raises(ValidationError):
+            ScheduleRequest(**{**payload.model_dump(), **update})
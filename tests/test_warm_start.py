@@ -0,0 +1,42 @@
+"""
+Test khởi tạo ấm từ lịch có sẵn (GeneticScheduler.warm_start_genomes, Individual.initialize_from)
+"""
+import numpy as np
+from app.schemas.schedule import ScheduleRequest
+from app.engine.ga_scheduler import GeneticScheduler, generate_schedule
+from app.engine.genome import EMPTY_SLOT
+from benchmarks.synthetic import SHIFTS, make_request
+
+
+def test_warm_start_fill_uses_initializer():
+    """Các nhóm (ngày, ca, khoa) không lấy từ lịch có sẵn được khởi tạo bằng hàm fill (config.initializer)"""
+    payload = make_request(20, 2, 7, seed=3, population_size=4, min_hours_per_month=0)
+    scheduler = GeneticScheduler(payload, verbose=False)
+    reference, greedy, individual = (scheduler.new_individual() for _ in range(3))
+    reference.initialize_random(scheduler.random)
+    scheduler.initialize_individual(greedy)
+    
+    seed_genome = np.full_like(reference.genome, EMPTY_SLOT)
+    seed_genome[0] = reference.genome[0]
+    individual.initialize_from(seed_genome, fill=lambda i: i.genome.__setitem__(Ellipsis, greedy.genome))
+    assert (individual.genome[0] == reference.genome[0]).all()
+    assert (individual.genome[1:] == greedy.genome[1:]).all()
+    assert (individual.shift_counts == np.bincount(individual.genome[individual.genome >= 0], minlength=20)).all()
+
+
+def test_warm_start(csv_data):
+    """Quần thể ban đầu chứa nguyên lịch có sẵn → thế hệ 0 đã đạt fitness của lịch đó"""
+    staff, departments = csv_data
+    payload = ScheduleRequest(staff=staff[:10], departments=departments[:2], shifts=SHIFTS,
+                              days=7, population_size=20, max_generations=20,
+                              min_hours_per_month=0, seed=1)
+    previous = generate_schedule(payload)
+    
+    warm = payload.model_copy(update={"seed": 2, "max_generations": 0,
+                                      "warm_start_schedules": [previous.schedule]})
+    scheduler = GeneticScheduler(warm, verbose=False)
+    scheduler.start()
+    
+    assert scheduler.best_individual.fitness_score >= previous.fitness_score
+    expected = [day.model_dump() for day in previous.schedule]
+    assert any(individual.schedule == expected for individual in scheduler.population)